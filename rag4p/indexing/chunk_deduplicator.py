@@ -0,0 +1,116 @@
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rag4p.rag.model.chunk import Chunk
+
+# Largest prime below 2^32, the hash functions of the MinHash are (a * x + b) mod this prime
+_PRIME = np.uint64(4294967291)
+
+
+class ChunkDeduplicator:
+    """
+    Finds chunks with (almost) the same text as a chunk that was seen before, like repeated descriptions and footers.
+    The text of a chunk is turned into a set of word shingles, the MinHash signature of this set estimates the Jaccard
+    similarity between chunks. Locality sensitive hashing divides the signature into bands, only chunks that share at
+    least one band with the new chunk are compared. The chance that two chunks share a band increases quickly around
+    the similarity (1 / num_bands) ^ (num_bands / num_permutations).
+
+    A chunk is a duplicate when the estimated similarity with a previously seen chunk is at least the threshold. The
+    deduplicator can be used from multiple threads.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_permutations: int = 128, num_bands: int = 32,
+                 shingle_size: int = 3, seed: int = 42):
+        if num_permutations % num_bands != 0:
+            raise ValueError(f"The number of permutations ({num_permutations}) must be a multiple of the number of "
+                             f"bands ({num_bands})")
+        self.threshold = threshold
+        self.num_permutations = num_permutations
+        self.num_bands = num_bands
+        self.rows_per_band = num_permutations // num_bands
+        self.shingle_size = shingle_size
+
+        random = np.random.default_rng(seed)
+        self.__a = random.integers(1, _PRIME, size=num_permutations, dtype=np.uint64)
+        self.__b = random.integers(0, _PRIME, size=num_permutations, dtype=np.uint64)
+
+        self.duplicates: Dict[str, str] = {}
+        self.__signatures: Dict[str, np.ndarray] = {}
+        self.__buckets: Dict[tuple, List[str]] = {}
+        self.__document_chunks: Dict[str, List[str]] = {}
+        self.__document_duplicates: Dict[str, List[str]] = {}
+        self.__lock = threading.Lock()
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Calculates the MinHash signature of the word shingles of the text. Texts with fewer words than the shingle
+        size are one shingle.
+        """
+        words = re.findall(r"\w+", text.lower())
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)} if words else {""}
+        hashes = np.array([zlib.crc32(shingle.encode("utf-8")) for shingle in shingles], dtype=np.uint64)
+
+        # One row per hash function, one column per shingle. The values stay below 2^64 before taking the modulo.
+        permuted = (np.outer(self.__a, hashes) % _PRIME + self.__b[:, np.newaxis]) % _PRIME
+        return permuted.min(axis=1)
+
+    def check(self, chunk: Chunk) -> Optional[str]:
+        """
+        Checks if the chunk is a near duplicate of a chunk that was seen before. Chunks that are not a duplicate are
+        remembered, duplicates are registered in duplicates with the id of the original chunk.
+        :return: The id of the original chunk if the chunk is a duplicate, None otherwise.
+        """
+        signature = self.signature(chunk.chunk_text)
+        bands = [self.__band_key(signature, band) for band in range(self.num_bands)]
+
+        with self.__lock:
+            original_id = self.__find_original(signature, bands)
+            if original_id is not None:
+                self.duplicates[chunk.get_id()] = original_id
+                self.__document_duplicates.setdefault(chunk.document_id, []).append(chunk.get_id())
+                return original_id
+
+            chunk_id = chunk.get_id()
+            self.__signatures[chunk_id] = signature
+            self.__document_chunks.setdefault(chunk.document_id, []).append(chunk_id)
+            for band in bands:
+                self.__buckets.setdefault(band, []).append(chunk_id)
+            return None
+
+    def remove_document(self, document_id: str):
+        """
+        Forgets the chunks of the document, used when the chunks of the document are removed from the store. The links
+        of duplicates to chunks of the document are removed as well.
+        """
+        with self.__lock:
+            removed_ids = set(self.__document_chunks.pop(document_id, []))
+            for chunk_id in removed_ids:
+                signature = self.__signatures.pop(chunk_id)
+                for band in range(self.num_bands):
+                    bucket = self.__buckets.get(self.__band_key(signature, band), [])
+                    if chunk_id in bucket:
+                        bucket.remove(chunk_id)
+
+            for duplicate_id in self.__document_duplicates.pop(document_id, []):
+                self.duplicates.pop(duplicate_id, None)
+            self.duplicates = {duplicate_id: original_id for duplicate_id, original_id in self.duplicates.items()
+                               if original_id not in removed_ids}
+
+    def __band_key(self, signature: np.ndarray, band: int) -> tuple:
+        return band, signature[band * self.rows_per_band:(band + 1) * self.rows_per_band].tobytes()
+
+    def __find_original(self, signature: np.ndarray, bands: list) -> Optional[str]:
+        candidates = dict.fromkeys(chunk_id for band in bands for chunk_id in self.__buckets.get(band, []))
+        best_id = None
+        best_similarity = self.threshold
+        for candidate_id in candidates:
+            similarity = float(np.mean(self.__signatures[candidate_id] == signature))
+            if similarity >= best_similarity:
+                best_id = candidate_id
+                best_similarity = similarity
+        return best_id
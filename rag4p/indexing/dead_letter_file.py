@@ -0,0 +1,75 @@
+import json
+import os
+from typing import List, Tuple
+
+from rag4p.rag.model.chunk import Chunk
+
+
+class DeadLetterFile:
+    """
+    Keeps the chunks that could not be stored in a JSONL file, one chunk per line. Next to the chunk, the error and the
+    number of attempts to store the chunk are written. The chunks can be replayed later using the IndexingService.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def append(self, failed_chunks: List[Tuple[Chunk, str]], attempts: int = 1):
+        """
+        Adds the failed chunks to the end of the file.
+        :param failed_chunks: Tuples with the chunk and the error message.
+        :param attempts: The number of times storing the chunks was tried.
+        """
+        if not failed_chunks:
+            return
+        with open(self.file_path, 'a', encoding='utf-8') as file:
+            for chunk, error in failed_chunks:
+                file.write(json.dumps(self.__to_record(chunk, error, attempts)) + "\n")
+
+    def read(self) -> List[Tuple[Chunk, int]]:
+        """
+        Reads all chunks from the file.
+        :return: Tuples with the chunk and the number of attempts done so far.
+        """
+        if not os.path.exists(self.file_path):
+            return []
+        failed_chunks = []
+        with open(self.file_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                chunk = Chunk(document_id=record["document_id"],
+                              chunk_id=record["chunk_id"],
+                              total_chunks=record["total_chunks"],
+                              chunk_text=record["chunk_text"],
+                              properties=record["properties"])
+                failed_chunks.append((chunk, record["attempts"]))
+        return failed_chunks
+
+    def rewrite(self, failed_chunks: List[Tuple[Chunk, str, int]]):
+        """
+        Replaces the content of the file with the provided chunks, removes the file if there are none left.
+        :param failed_chunks: Tuples with the chunk, the error message and the number of attempts.
+        """
+        if not failed_chunks:
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+            return
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for chunk, error, attempts in failed_chunks:
+                file.write(json.dumps(self.__to_record(chunk, error, attempts)) + "\n")
+        os.replace(temp_path, self.file_path)
+
+    @staticmethod
+    def __to_record(chunk: Chunk, error: str, attempts: int) -> dict:
+        return {
+            "document_id": chunk.document_id,
+            "chunk_id": chunk.chunk_id,
+            "total_chunks": chunk.total_chunks,
+            "chunk_text": chunk.chunk_text,
+            "properties": chunk.properties,
+            "error": str(error),
+            "attempts": attempts,
+        }
@@ -0,0 +1,40 @@
+import json
+import os
+
+
+class IndexingCheckpoint:
+    """
+    Keeps track of the progress of an indexing job. The checkpoint file contains the number of batches read from the
+    content reader and the counters of the job. The state of the content store is written next to it, using the path of
+    the checkpoint with the postfix '_store'.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def checkpoint_file(self) -> str:
+        return f"{self.path}.json"
+
+    def store_path(self) -> str:
+        return f"{self.path}_store"
+
+    def save(self, state: dict):
+        """
+        Writes the state to the checkpoint file. The file is first written to a temporary file and then moved, a crash
+        while writing never leaves a broken checkpoint.
+        :param state: The progress of the job, must be serializable to json.
+        """
+        temp_file = f"{self.checkpoint_file()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(state, file)
+        os.replace(temp_file, self.checkpoint_file())
+
+    def load(self) -> dict:
+        """
+        Reads the state from the checkpoint file.
+        :return: The saved state, or None if there is no checkpoint.
+        """
+        if not os.path.exists(self.checkpoint_file()):
+            return None
+        with open(self.checkpoint_file(), 'r', encoding='utf-8') as file:
+            return json.load(file)
@@ -0,0 +1,241 @@
+import bisect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List
+
+try:
+    import resource
+except ImportError:
+    # The resource module is not available on Windows, peak memory is not reported there
+    resource = None
+
+# Returned by next when an iterator is exhausted, None can be a valid item
+_END_OF_ITERATION = object()
+
+
+class StageMetrics:
+    """
+    The time spent in one stage of indexing: reading, splitting, embedding or storing. When a stage runs in multiple
+    threads or processes, the times of all of them are added up.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.num_items = 0
+
+    def items_per_second(self) -> float:
+        return self.num_items / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "num_items": self.num_items,
+            "items_per_second": self.items_per_second(),
+        }
+
+
+class LatencyHistogram:
+    """
+    Counts latencies in buckets with a fixed upper bound in seconds. Percentiles are estimated using the upper bound of
+    the bucket that contains the percentile.
+    """
+    BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency: float):
+        self.counts[bisect.bisect_left(self.BUCKETS, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Estimates the latency below which the provided percentage of the calls are.
+        :param percentile: Percentage between 0 and 100.
+        :return: The upper bound of the bucket containing the percentile, the max latency for the last bucket.
+        """
+        if self.count == 0:
+            return 0.0
+        threshold = self.count * percentile / 100
+        seen = 0
+        for bucket, count in zip(self.BUCKETS, self.counts):
+            seen += count
+            if seen >= threshold:
+                return min(bucket, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+            "buckets": {str(bucket): count for bucket, count in zip(self.BUCKETS, self.counts)},
+        }
+
+
+class IndexingProgress:
+    """
+    Progress of a running indexing job, sent to the progress callback of the IndexingMetrics.
+    """
+
+    def __init__(self, num_documents: int, num_chunks: int, elapsed_time: float):
+        self.num_documents = num_documents
+        self.num_chunks = num_chunks
+        self.elapsed_time = elapsed_time
+
+    def chunks_per_second(self) -> float:
+        return self.num_chunks / self.elapsed_time if self.elapsed_time > 0 else 0.0
+
+    def __str__(self):
+        return (f"IndexingProgress(num_documents={self.num_documents}, num_chunks={self.num_chunks}, "
+                f"elapsed_time={self.elapsed_time:.2f} sec., chunks_per_second={self.chunks_per_second():.2f})")
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+class IndexingMetrics:
+    """
+    Collects the metrics of an indexing job: the wall and cpu time per stage, the latency of the calls to the embedder,
+    the number of embedded tokens and the peak memory of the process. The IndexingService and the content stores
+    record the metrics, the metrics can be used from multiple threads.
+
+    Tokens are counted using the token_counter, by default the number of words. Use the tokenizer of the embedding
+    model for exact numbers. When a progress_callback is provided, it receives an IndexingProgress at most once every
+    progress_interval seconds.
+    """
+
+    def __init__(self,
+                 token_counter: Callable[[str], int] = count_words,
+                 progress_callback: Callable[[IndexingProgress], None] = None,
+                 progress_interval: float = 10.0):
+        self.token_counter = token_counter
+        self.progress_callback = progress_callback
+        self.progress_interval = progress_interval
+        self.stages: Dict[str, StageMetrics] = {}
+        self.embedding_latency = LatencyHistogram()
+        self.embedding_tokens = 0
+        self.running_time = 0.0
+        self.peak_memory_mb = None
+        self._lock = threading.Lock()
+        self._start_time = time.perf_counter()
+        self._last_progress = self._start_time
+
+    @contextmanager
+    def stage(self, name: str, num_items: int = 0):
+        """
+        Measures the wall time and the cpu time of the current thread for the code in the with block.
+        :param name: The name of the stage.
+        :param num_items: The number of items handled by the code in the block.
+        """
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_stage_time(name, time.perf_counter() - start_wall, time.thread_time() - start_cpu, num_items)
+
+    def add_stage_time(self, name: str, wall_time: float, cpu_time: float, num_items: int = 0):
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = StageMetrics(name)
+            stage.wall_time += wall_time
+            stage.cpu_time += cpu_time
+            stage.num_items += num_items
+
+    def measure_iteration(self, name: str, iterable: Iterable, count: Callable = len) -> Iterable:
+        """
+        Yields the items of the iterable and adds the time needed to produce each item to the stage. Used to measure
+        work that is done by a generator, like reading and streaming splitters.
+        :param name: The name of the stage.
+        :param iterable: The items to measure.
+        :param count: Function returning the number of items to add to the stage for an item, by default its length.
+        """
+        iterator = iter(iterable)
+        while True:
+            start_wall = time.perf_counter()
+            start_cpu = time.thread_time()
+            item = next(iterator, _END_OF_ITERATION)
+            if item is _END_OF_ITERATION:
+                return
+            self.add_stage_time(name, time.perf_counter() - start_wall, time.thread_time() - start_cpu, count(item))
+            yield item
+
+    def record_embedding(self, latency: float, texts: List[str]):
+        """
+        Records one call to the embedder.
+        :param latency: The duration of the call in seconds.
+        :param texts: The texts that were embedded in the call.
+        """
+        num_tokens = sum(self.token_counter(text) for text in texts)
+        with self._lock:
+            self.embedding_latency.record(latency)
+            self.embedding_tokens += num_tokens
+
+    def report_progress(self, num_documents: int, num_chunks: int):
+        """
+        Sends the progress to the callback if the progress interval has passed since the last report.
+        """
+        if self.progress_callback is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        self.progress_callback(IndexingProgress(num_documents, num_chunks, now - self._start_time))
+
+    def finish(self):
+        """
+        Marks the end of the job, records the running time and the peak memory.
+        """
+        self.running_time = time.perf_counter() - self._start_time
+        self.peak_memory_mb = self.__peak_memory_mb()
+
+    def chunks_per_second(self) -> float:
+        store = self.stages.get("store")
+        if store is None or self.running_time == 0:
+            return 0.0
+        return store.num_items / self.running_time
+
+    def embedding_tokens_per_second(self) -> float:
+        embed = self.stages.get("embed")
+        if embed is None or embed.wall_time == 0:
+            return 0.0
+        return self.embedding_tokens / embed.wall_time
+
+    def to_dict(self) -> dict:
+        return {
+            "running_time": self.running_time,
+            "stages": {name: stage.to_dict() for name, stage in self.stages.items()},
+            "chunks_per_second": self.chunks_per_second(),
+            "embedding_tokens": self.embedding_tokens,
+            "embedding_tokens_per_second": self.embedding_tokens_per_second(),
+            "embedding_latency": self.embedding_latency.to_dict(),
+            "peak_memory_mb": self.peak_memory_mb,
+        }
+
+    @staticmethod
+    def __peak_memory_mb():
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports the size in kilobytes, macOS in bytes
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
@@ -1,17 +1,52 @@
 from abc import ABC
 
+from rag4p.indexing.indexing_metrics import IndexingMetrics
+
 
 class IndexingResponse(ABC):
-    def __init__(self, num_documents: int, num_chunks: int, content_reader: str, splitter: str, running_time: float):
+    def __init__(self, num_documents: int, num_chunks: int, content_reader: str, splitter: str, running_time: float,
+                 parallelism: dict = None, num_added: int = None, num_updated: int = None, num_skipped: int = None,
+                 num_failed_chunks: int = 0, metrics: IndexingMetrics = None, num_duplicates: int = None):
         self.num_documents = num_documents
         self.num_chunks = num_chunks
         self.content_reader = content_reader
         self.splitter = splitter
         self.running_time = running_time
+        self.parallelism = parallelism
+        self.num_added = num_added
+        self.num_updated = num_updated
+        self.num_skipped = num_skipped
+        self.num_failed_chunks = num_failed_chunks
+        self.metrics = metrics
+        self.num_duplicates = num_duplicates
+
+    def to_dict(self) -> dict:
+        return {
+            "num_documents": self.num_documents,
+            "num_chunks": self.num_chunks,
+            "num_added": self.num_added,
+            "num_updated": self.num_updated,
+            "num_skipped": self.num_skipped,
+            "num_failed_chunks": self.num_failed_chunks,
+            "num_duplicates": self.num_duplicates,
+            "content_reader": self.content_reader,
+            "splitter": self.splitter,
+            "running_time": self.running_time,
+            "parallelism": self.parallelism,
+            "metrics": self.metrics.to_dict() if self.metrics else None,
+        }
 
     def __str__(self):
+        parallelism = f", parallelism={self.parallelism}" if self.parallelism else ""
+        incremental = (f"num_added={self.num_added}, num_updated={self.num_updated}, "
+                       f"num_skipped={self.num_skipped}, ") if self.num_skipped is not None else ""
+        duplicates = f"num_duplicates={self.num_duplicates}, " if self.num_duplicates is not None else ""
         return (f"IndexingResponse(num_documents={self.num_documents}, "
+                f"{incremental}"
                 f"num_chunks={self.num_chunks}, "
+                f"num_failed_chunks={self.num_failed_chunks}, "
+                f"{duplicates}"
                 f"content_reader={self.content_reader}, "
                 f"splitter={self.splitter}, "
-                f"running_time={self.running_time:.2f} sec.)")
+                f"running_time={self.running_time:.2f} sec."
+                f"{parallelism})")
@@ -1,40 +1,772 @@
+import queue
+import threading
 import time
 from abc import ABC
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
 
+from rag4p.indexing.chunk_deduplicator import ChunkDeduplicator
 from rag4p.indexing.content_reader import ContentReader
+from rag4p.indexing.dead_letter_file import DeadLetterFile
+from rag4p.indexing.indexing_checkpoint import IndexingCheckpoint
+from rag4p.indexing.indexing_metrics import IndexingMetrics
 from rag4p.indexing.indexing_response import IndexingResponse
 from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.parallel_splitter import ParallelSplitter, split_measured
 from rag4p.indexing.splitter import Splitter
 from rag4p.rag.store.content_store import ContentStore
 
+DOCUMENT_HASHES_METADATA_KEY = "document_hashes"
+DUPLICATE_CHUNKS_METADATA_KEY = "duplicate_chunks"
+
+ADDED = "added"
+UPDATED = "updated"
+SKIPPED = "skipped"
+
+# Marks the end of the items in a queue between two stages of the pipeline
+_END_OF_STAGE = object()
+
+
+class _BatchEnd:
+    """
+    Follows the last document of a batch through the stages of the pipeline. When the storing stage receives it, all
+    chunks of the batch are stored and the counters it carries describe the job up to and including the batch.
+    """
+
+    def __init__(self, batch_nr: int, num_documents: int, changes: dict, document_hashes: dict,
+                 replaced_documents: list):
+        self.batch_nr = batch_nr
+        self.num_documents = num_documents
+        self.changes = changes
+        self.document_hashes = document_hashes
+        self.replaced_documents = replaced_documents
+        # Set by the embedding stage
+        self.num_chunks = 0
+        self.num_duplicates = 0
+
+
+class _DocumentText:
+    """
+    The complete text of a document, sent to the storing stage after the chunks of the document.
+    """
+
+    def __init__(self, document_id: str, text: str):
+        self.document_id = document_id
+        self.text = text
+
+
+class _PipelineState:
+    """
+    The state shared by the stages of the pipeline. Each counter is only changed by one of the stages.
+    """
+
+    def __init__(self, progress: dict, document_hashes: dict = None, metrics: IndexingMetrics = None,
+                 checkpoint: IndexingCheckpoint = None, checkpoint_every: int = 10,
+                 dead_letter_file: DeadLetterFile = None):
+        self.metrics = metrics
+        self.stop_event = threading.Event()
+        self.errors = []
+        self.num_documents = progress["num_documents"]
+        self.num_chunks = progress["num_chunks"]
+        self.num_duplicates = progress["num_duplicates"]
+        self.changes = dict(progress["changes"])
+        self.document_hashes = document_hashes
+        self.replaced_documents = set()
+        self.progress = progress
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.dead_letter_file = dead_letter_file
+        # The hashes of the documents of which all chunks are stored, these are written with a checkpoint
+        self.stored_document_hashes = dict(document_hashes) if document_hashes is not None else None
+
+    def fail(self, error: Exception):
+        self.errors.append(error)
+        self.stop_event.set()
+
 
 class IndexingService(ABC):
-    def __init__(self, content_store: ContentStore):
+    def __init__(self, content_store: ContentStore, deduplicator: ChunkDeduplicator = None,
+                 store_document_texts: bool = False):
+        """
+        :param content_store: The store to write the chunks to.
+        :param deduplicator: Optional, finds chunks that are near duplicates of chunks indexed before by this service.
+        The duplicates are not embedded, they are stored using store_duplicates so they can still be fetched by id. The
+        links from the duplicates to the original chunks are kept in the metadata of the content store. When the
+        document of an original chunk is removed, its duplicates are made searchable using promote_duplicates.
+        :param store_document_texts: Store the complete text of each document in the content store, combined from the
+        chunks of the first level. Used by the DocumentRetrievalStrategy, the content store must support it.
+        """
+        if store_document_texts and not content_store.supports_document_texts():
+            raise ValueError(f"{content_store.__class__.__name__} does not support storing document texts")
+
         self.content_store = content_store
+        self.deduplicator = deduplicator
+        self.store_document_texts = store_document_texts
+        self.__duplicate_links = {}
+
+    def index_documents(self, content_reader: ContentReader, splitter: Splitter,
+                        incremental: bool = False,
+                        checkpoint_path: str = None,
+                        checkpoint_every: int = 10,
+                        dead_letter_path: str = None,
+                        batch_size: int = 10,
+                        metrics: IndexingMetrics = None) -> IndexingResponse:
+        """
+        Reads all documents, splits them into chunks and stores the chunks in the content store.
+
+        In incremental mode, a hash of each document and the configuration of the splitter is kept in the metadata of
+        the content store. Documents with the same hash as in the previous run are skipped. For changed documents, the
+        chunks in the store are replaced.
+
+        With a checkpoint path, the progress of the job and the state of the content store are written every
+        checkpoint_every batches. Use resume_index_documents to continue from the last checkpoint after a failure.
+        Chunks that the content store could not store are written to the dead letter file, they can be stored later
+        using replay_dead_letters.
+
+        The time spent reading, splitting, embedding and storing is recorded in the metrics of the response. Provide
+        metrics with a progress callback to receive progress during the job.
+        :param content_reader: Provides the documents to index.
+        :param splitter: The splitter to create chunks from the documents.
+        :param incremental: Only index new and changed documents.
+        :param checkpoint_path: Path to write checkpoints to, without extension. No checkpoints are written if empty.
+        :param checkpoint_every: Number of batches between two checkpoints. The document hashes of the incremental mode
+        are also written every checkpoint_every batches.
+        :param dead_letter_path: File to write the chunks to that could not be stored.
+        :param batch_size: Number of documents to read from the content reader at once.
+        :param metrics: The metrics to record the job in, new metrics are created if empty.
+        :return: The response with the numbers and the metrics of the indexing job.
+        """
+        checkpoint = IndexingCheckpoint(checkpoint_path) if checkpoint_path else None
+        return self.__index_documents(content_reader, splitter, incremental, checkpoint, checkpoint_every,
+                                      dead_letter_path, progress=self.__initial_progress(batch_size),
+                                      metrics=metrics)
+
+    def resume_index_documents(self, content_reader: ContentReader, splitter: Splitter, checkpoint_path: str,
+                               incremental: bool = False,
+                               checkpoint_every: int = 10,
+                               dead_letter_path: str = None,
+                               batch_size: int = 10,
+                               metrics: IndexingMetrics = None) -> IndexingResponse:
+        """
+        Continues an indexing job from the last checkpoint. The content store is restored to the state of the
+        checkpoint and the batches of documents that were already indexed are skipped. The content reader must return
+        the documents in the same order and in batches of the same size as in the original job. Without a checkpoint,
+        the job starts from the beginning.
+        :param content_reader: Provides the documents to index.
+        :param splitter: The splitter to create chunks from the documents.
+        :param checkpoint_path: Path the checkpoints of the original job were written to.
+        :param incremental: Only index new and changed documents.
+        :param checkpoint_every: Number of batches between two checkpoints.
+        :param dead_letter_path: File to write the chunks to that could not be stored.
+        :param batch_size: Number of documents to read from the content reader at once, must be the same as in the
+        original job.
+        :param metrics: The metrics to record the job in, new metrics are created if empty. Only the part after the
+        checkpoint is measured.
+        :return: The response with the numbers of the complete indexing job, including the part before the checkpoint.
+        """
+        checkpoint = IndexingCheckpoint(checkpoint_path)
+        progress = self.__restore_checkpoint(checkpoint, batch_size)
+        return self.__index_documents(content_reader, splitter, incremental, checkpoint, checkpoint_every,
+                                      dead_letter_path, progress, metrics)
+
+    def __restore_checkpoint(self, checkpoint: IndexingCheckpoint, batch_size: int) -> dict:
+        """
+        Loads the progress of the checkpoint and restores the content store to the state of the checkpoint.
+        :return: The progress of the job at the checkpoint, or the initial progress without a checkpoint.
+        """
+        progress = checkpoint.load()
+        if progress is None:
+            print(f"No checkpoint found at {checkpoint.checkpoint_file()}, start indexing from the beginning")
+            return self.__initial_progress(batch_size)
+        if progress["batch_size"] != batch_size:
+            raise ValueError(f"The checkpoint was created with batch size {progress['batch_size']}, "
+                             f"cannot resume with batch size {batch_size}")
+
+        print(f"Resume indexing after batch {progress['num_batches']}")
+        self.content_store.restore_checkpoint(checkpoint.store_path())
+        # Checkpoints written before duplicates were counted do not contain the number of duplicates
+        progress.setdefault("num_duplicates", 0)
+        return progress
+
+    def replay_dead_letters(self, dead_letter_path: str, max_retries: int = 3,
+                            backoff_seconds: float = 1.0) -> (int, int):
+        """
+        Tries to store the chunks in the dead letter file again. Chunks that fail again are retried with an exponential
+        backoff, the chunks that still fail after max_retries are written back to the dead letter file.
+        :param dead_letter_path: The dead letter file written by index_documents.
+        :param max_retries: The number of times to try storing the chunks.
+        :param backoff_seconds: Time to wait before the first retry, doubles with every retry.
+        :return: The number of chunks that were stored and the number of chunks that are still in the dead letter file.
+        """
+        dead_letter_file = DeadLetterFile(dead_letter_path)
+        pending = [(chunk, "", attempts) for chunk, attempts in dead_letter_file.read()]
+        num_chunks = len(pending)
 
-    def index_documents(self, content_reader: ContentReader, splitter: Splitter) -> IndexingResponse:
+        for retry in range(max_retries):
+            if not pending:
+                break
+            if retry > 0:
+                time.sleep(backoff_seconds * (2 ** (retry - 1)))
+
+            attempts_by_id = {chunk.get_id(): attempts for chunk, _, attempts in pending}
+            self.content_store.store([chunk for chunk, _, _ in pending])
+            pending = [(chunk, error, attempts_by_id[chunk.get_id()] + 1)
+                       for chunk, error in self.content_store.take_failed_chunks()]
+            print(f"Replayed dead letters, {len(pending)} of {num_chunks} chunks still failing")
+
+        dead_letter_file.rewrite(pending)
+        return num_chunks - len(pending), len(pending)
+
+    def __index_documents(self, content_reader: ContentReader, splitter: Splitter, incremental: bool,
+                          checkpoint: IndexingCheckpoint, checkpoint_every: int, dead_letter_path: str,
+                          progress: dict, metrics: IndexingMetrics) -> IndexingResponse:
         start_time = time.time()
-        num_documents = 0
-        num_chunks = 0
-        for batch in content_reader.read():
-            num_documents += len(batch)
-            print(f"Indexing batch of size {len(batch)}")
-            for document in batch:
-                doc_chunks = self.index_document(document, splitter)
-                num_chunks += doc_chunks
+        metrics = metrics if metrics else IndexingMetrics()
+        self.content_store.metrics = metrics
+        try:
+            self.__index_batches(content_reader, splitter, incremental, checkpoint, checkpoint_every,
+                                 dead_letter_path, progress, metrics)
+        finally:
+            self.content_store.metrics = None
+        metrics.finish()
 
         end_time = time.time()
         response_time = end_time - start_time
 
         return IndexingResponse(
-            num_documents=num_documents,
-            num_chunks=num_chunks,
+            num_documents=progress["num_documents"],
+            num_chunks=progress["num_chunks"],
+            content_reader=content_reader.name(),
+            splitter=splitter.name(),
+            running_time=response_time,
+            num_failed_chunks=progress["num_failed_chunks"],
+            num_duplicates=progress["num_duplicates"] if self.deduplicator else None,
+            metrics=metrics,
+            **self.__change_counts(progress["changes"], incremental)
+        )
+
+    def __index_batches(self, content_reader: ContentReader, splitter: Splitter, incremental: bool,
+                        checkpoint: IndexingCheckpoint, checkpoint_every: int, dead_letter_path: str,
+                        progress: dict, metrics: IndexingMetrics):
+        document_hashes = self.__known_document_hashes() if incremental else None
+        changes = progress["changes"]
+        dead_letter_file = DeadLetterFile(dead_letter_path) if dead_letter_path else None
+        skip_batches = progress["num_batches"]
+
+        # Clear failures from before this job, they are not part of this job
+        self.content_store.take_failed_chunks()
+        self.__load_duplicate_links()
+
+        batches = metrics.measure_iteration("read", content_reader.read(batch_size=progress["batch_size"]))
+        for batch_nr, batch in enumerate(batches):
+            if batch_nr < skip_batches:
+                continue
+
+            progress["num_documents"] += len(batch)
+            print(f"Indexing batch of size {len(batch)}")
+            for document in batch:
+                if incremental:
+                    change, document_hash = self.__document_change(document, splitter, document_hashes)
+                    changes[change] += 1
+                    if change == SKIPPED:
+                        continue
+                    if change == UPDATED:
+                        if self.deduplicator:
+                            self.deduplicator.remove_document(document.document_id)
+                        self.__delete_document(document.document_id)
+
+                num_duplicates = self.__num_duplicates()
+                doc_chunks = self.index_document(document, splitter, metrics)
+                progress["num_chunks"] += doc_chunks
+                progress["num_duplicates"] += self.__num_duplicates() - num_duplicates
+
+                if incremental:
+                    document_hashes[document.document_id] = document_hash
+
+            failed_chunks = self.content_store.take_failed_chunks()
+            progress["num_failed_chunks"] += len(failed_chunks)
+            if dead_letter_file:
+                dead_letter_file.append(failed_chunks)
+
+            progress["num_batches"] = batch_nr + 1
+            if progress["num_batches"] % checkpoint_every == 0:
+                self.__save_job_metadata(document_hashes)
+                if checkpoint:
+                    self.__save_checkpoint(checkpoint, progress)
+            metrics.report_progress(progress["num_documents"], progress["num_chunks"])
+
+        self.__save_job_metadata(document_hashes)
+        if checkpoint:
+            self.__save_checkpoint(checkpoint, progress)
+
+    def __save_checkpoint(self, checkpoint: IndexingCheckpoint, progress: dict):
+        # First the store, a checkpoint file always belongs to a complete state of the store
+        self.content_store.checkpoint(checkpoint.store_path())
+        checkpoint.save(progress)
+        print(f"Saved checkpoint after batch {progress['num_batches']}")
+
+    @staticmethod
+    def __initial_progress(batch_size: int) -> dict:
+        return {
+            "batch_size": batch_size,
+            "num_batches": 0,
+            "num_documents": 0,
+            "num_chunks": 0,
+            "num_failed_chunks": 0,
+            "num_duplicates": 0,
+            "changes": {ADDED: 0, UPDATED: 0, SKIPPED: 0},
+        }
+
+    def index_document(self, document: InputDocument, splitter: Splitter, metrics: IndexingMetrics = None,
+                       store_batch_size: int = 100) -> int:
+        """
+        Splits the document and stores the chunks. The chunks are streamed from the splitter and stored in batches of
+        store_batch_size, storing starts before the complete document is split. Duplicates found by the deduplicator
+        are stored without an embedding, using store_duplicates.
+        :return: The number of chunks of the document, including the duplicates.
+        """
+        chunks = splitter.split_stream(document)
+        if metrics:
+            chunks = metrics.measure_iteration("split", chunks, count=lambda chunk: 1)
+
+        num_chunks = 0
+        batch = []
+        duplicates = []
+        document_text = [] if self.store_document_texts else None
+        for chunk in chunks:
+            num_chunks += 1
+            if document_text is not None and self.__is_first_level(chunk):
+                document_text.append(chunk.chunk_text + " ")
+            original_id = self.__find_original(chunk)
+            if original_id is not None:
+                duplicates.append((chunk, original_id))
+                continue
+            batch.append(chunk)
+            if len(batch) == store_batch_size:
+                self.content_store.store(batch)
+                batch = []
+        if batch:
+            self.content_store.store(batch)
+        if duplicates:
+            self.__store_duplicates(duplicates)
+        if document_text is not None:
+            self.content_store.store_document_text(document.document_id, "".join(document_text))
+        return num_chunks
+
+    def index_documents_pipelined(self,
+                                  content_reader: ContentReader,
+                                  splitter: Splitter,
+                                  split_workers: int = 2,
+                                  embed_workers: int = 4,
+                                  embed_batch_size: int = 32,
+                                  store_batch_size: int = 100,
+                                  queue_size: int = 8,
+                                  incremental: bool = False,
+                                  batch_size: int = 10,
+                                  metrics: IndexingMetrics = None,
+                                  checkpoint_path: str = None,
+                                  checkpoint_every: int = 10,
+                                  resume: bool = False,
+                                  dead_letter_path: str = None) -> IndexingResponse:
+        """
+        Indexes the documents using a pipeline of stages that run at the same time. Reading, splitting, embedding and
+        storing are connected by bounded queues, a stage waits when the next stage cannot keep up. The content store
+        must support embed_chunks and store_embedded.
+
+        - Reading: reads the documents and hands them to the split workers.
+        - Splitting: runs in a pool of split_workers processes, the splitter must be picklable. With 0 workers, the
+          documents are split in the reading thread.
+        - Embedding: collects chunks into batches of embed_batch_size and embeds up to embed_workers batches at the
+          same time.
+        - Storing: stores the embedded chunks in bulk, in batches of store_batch_size.
+
+        Chunks are stored in the same order as with index_documents, chunks with only whitespace are not stored. The
+        incremental mode works the same as with index_documents, the old chunks of changed documents are removed by
+        the storing stage.
+
+        With a checkpoint path, a checkpoint is written every checkpoint_every batches, after all chunks of the batches
+        are stored. Use resume to continue from the last checkpoint, like with resume_index_documents the content reader
+        must return the same documents in batches of the same size. Chunks that the content store could not store are
+        written to the dead letter file after each store call, like with index_documents.
+        :param content_reader: Provides the documents to index.
+        :param splitter: The splitter to create chunks from the documents.
+        :param split_workers: Number of processes to split documents with.
+        :param embed_workers: Number of batches that are embedded concurrently.
+        :param embed_batch_size: Number of chunks to embed in one call to the embedder.
+        :param store_batch_size: Number of chunks to store in one call to the content store.
+        :param queue_size: Maximum number of items waiting in the queue between two stages.
+        :param incremental: Only index new and changed documents.
+        :param batch_size: Number of documents to read from the content reader at once.
+        :param metrics: The metrics to record the job in, new metrics are created if empty. The times of a stage are
+        added up over all its threads and processes.
+        :param checkpoint_path: Path to write checkpoints to, without extension. No checkpoints are written if empty.
+        :param checkpoint_every: Number of batches between two checkpoints.
+        :param resume: Continue from the last checkpoint at checkpoint_path.
+        :param dead_letter_path: File to write the chunks to that could not be stored.
+        :return: The response with the numbers, the metrics and the used parallelism of the indexing job.
+        """
+        if resume and not checkpoint_path:
+            raise ValueError("A checkpoint path is required to resume indexing")
+
+        start_time = time.time()
+        checkpoint = IndexingCheckpoint(checkpoint_path) if checkpoint_path else None
+        if resume:
+            progress = self.__restore_checkpoint(checkpoint, batch_size)
+        else:
+            progress = self.__initial_progress(batch_size)
+        self.__load_duplicate_links()
+        state = _PipelineState(progress,
+                               self.__known_document_hashes() if incremental else None,
+                               metrics if metrics else IndexingMetrics(),
+                               checkpoint,
+                               checkpoint_every,
+                               DeadLetterFile(dead_letter_path) if dead_letter_path else None)
+        self.content_store.metrics = state.metrics
+        # Clear failures from before this job, they are not part of this job
+        self.content_store.take_failed_chunks()
+        split_queue = queue.Queue(maxsize=queue_size)
+        embed_queue = queue.Queue(maxsize=queue_size)
+
+        split_executor = ParallelSplitter(splitter, split_workers) if split_workers > 0 else None
+        embed_executor = ThreadPoolExecutor(max_workers=embed_workers)
+
+        read_thread = threading.Thread(target=self.__read_and_split,
+                                       args=(content_reader, batch_size, splitter, split_executor, split_queue,
+                                             state))
+        embed_thread = threading.Thread(target=self.__embed,
+                                        args=(split_queue, embed_queue, embed_executor, embed_batch_size, state))
+        read_thread.start()
+        embed_thread.start()
+        try:
+            self.__store(embed_queue, store_batch_size, state)
+        except Exception as e:
+            state.fail(e)
+        finally:
+            read_thread.join()
+            embed_thread.join()
+            embed_executor.shutdown(cancel_futures=True)
+            if split_executor:
+                split_executor.shutdown(cancel_futures=True)
+            self.content_store.metrics = None
+        state.metrics.finish()
+
+        if state.errors:
+            raise state.errors[0]
+
+        self.__save_job_metadata(state.document_hashes)
+        if checkpoint:
+            self.__save_checkpoint(checkpoint, state.progress)
+
+        return IndexingResponse(
+            num_documents=state.num_documents,
+            num_chunks=state.num_chunks,
             content_reader=content_reader.name(),
             splitter=splitter.name(),
-            running_time=response_time
+            running_time=time.time() - start_time,
+            parallelism={
+                "split_workers": split_workers,
+                "embed_workers": embed_workers,
+                "embed_batch_size": embed_batch_size,
+                "store_batch_size": store_batch_size,
+                "queue_size": queue_size,
+                "batch_size": batch_size,
+            },
+            num_failed_chunks=state.progress["num_failed_chunks"],
+            metrics=state.metrics,
+            num_duplicates=state.num_duplicates if self.deduplicator else None,
+            **self.__change_counts(state.changes, incremental)
         )
 
-    def index_document(self, document: InputDocument, splitter: Splitter) -> int:
-        chunks = splitter.split(document)
-        self.content_store.store(chunks)
-        return len(chunks)
\ No newline at end of file
+    def __read_and_split(self, content_reader, batch_size, splitter, split_executor, split_queue,
+                         state: _PipelineState):
+        try:
+            batches = state.metrics.measure_iteration("read", content_reader.read(batch_size=batch_size))
+            for batch_nr, batch in enumerate(batches):
+                if batch_nr < state.progress["num_batches"]:
+                    continue
+                state.num_documents += len(batch)
+                print(f"Indexing batch of size {len(batch)}")
+                batch_hashes = {}
+                batch_replaced_documents = []
+                for document in batch:
+                    if state.document_hashes is not None:
+                        change, document_hash = self.__document_change(document, splitter, state.document_hashes)
+                        state.changes[change] += 1
+                        if change == SKIPPED:
+                            continue
+                        if change == UPDATED:
+                            state.replaced_documents.add(document.document_id)
+                            batch_replaced_documents.append(document.document_id)
+                            if self.deduplicator:
+                                self.deduplicator.remove_document(document.document_id)
+                        state.document_hashes[document.document_id] = document_hash
+                        batch_hashes[document.document_id] = document_hash
+
+                    if split_executor:
+                        item = split_executor.submit(document)
+                    else:
+                        item = split_measured(splitter, document)
+                    if not self.__put(split_queue, item, state.stop_event):
+                        return
+
+                if state.checkpoint:
+                    batch_end = _BatchEnd(batch_nr, state.num_documents, dict(state.changes), batch_hashes,
+                                          batch_replaced_documents)
+                    if not self.__put(split_queue, batch_end, state.stop_event):
+                        return
+        except Exception as e:
+            state.fail(e)
+        finally:
+            self.__put(split_queue, _END_OF_STAGE, state.stop_event)
+
+    def __embed(self, split_queue, embed_queue, embed_executor, embed_batch_size, state: _PipelineState):
+        stop_event = state.stop_event
+        try:
+            pending_chunks = []
+            while True:
+                item = self.__get(split_queue, stop_event)
+                if item is _END_OF_STAGE:
+                    break
+                if isinstance(item, _BatchEnd):
+                    # The chunks of the batch go to the storing stage before the end of the batch
+                    if pending_chunks:
+                        if not self.__put(embed_queue, (pending_chunks, embed_executor.submit(
+                                self.content_store.embed_chunks, pending_chunks)), stop_event):
+                            return
+                        pending_chunks = []
+                    item.num_chunks = state.num_chunks
+                    item.num_duplicates = state.num_duplicates
+                    if not self.__put(embed_queue, item, stop_event):
+                        return
+                    continue
+                chunks, wall_time, cpu_time = item.result() if isinstance(item, Future) else item
+                state.metrics.add_stage_time("split", wall_time, cpu_time, len(chunks))
+                state.num_chunks += len(chunks)
+                document_text = None
+                if self.store_document_texts and chunks:
+                    document_text = _DocumentText(chunks[0].document_id, "".join(
+                        chunk.chunk_text + " " for chunk in chunks if self.__is_first_level(chunk)))
+                duplicates = []
+                for chunk in chunks:
+                    if not chunk.chunk_text.strip():
+                        continue
+                    original_id = self.__find_original(chunk)
+                    if original_id is not None:
+                        duplicates.append((chunk, original_id))
+                        continue
+                    pending_chunks.append(chunk)
+                if duplicates:
+                    # Duplicates are not embedded, they go to the storing stage without embeddings
+                    state.num_duplicates += len(duplicates)
+                    if not self.__put(embed_queue, (duplicates, None), stop_event):
+                        return
+                if document_text is not None and not self.__put(embed_queue, document_text, stop_event):
+                    return
+
+                while len(pending_chunks) >= embed_batch_size:
+                    batch = pending_chunks[:embed_batch_size]
+                    pending_chunks = pending_chunks[embed_batch_size:]
+                    if not self.__put(embed_queue,
+                                      (batch, embed_executor.submit(self.content_store.embed_chunks, batch)),
+                                      stop_event):
+                        return
+
+            if pending_chunks:
+                self.__put(embed_queue,
+                           (pending_chunks, embed_executor.submit(self.content_store.embed_chunks, pending_chunks)),
+                           stop_event)
+        except Exception as e:
+            state.fail(e)
+        finally:
+            self.__put(embed_queue, _END_OF_STAGE, stop_event)
+
+    def __store(self, embed_queue, store_batch_size, state: _PipelineState):
+        chunks_to_store = []
+        embeddings_to_store = []
+        while True:
+            item = self.__get(embed_queue, state.stop_event)
+            if item is _END_OF_STAGE:
+                break
+            if isinstance(item, _DocumentText):
+                # Stored right away, only the texts of the documents that are in the pipeline are kept in memory
+                self.__delete_replaced_documents([item], state)
+                self.content_store.store_document_text(item.document_id, item.text)
+                continue
+            if isinstance(item, _BatchEnd):
+                if chunks_to_store:
+                    self.__store_embedded(chunks_to_store, embeddings_to_store, state)
+                    chunks_to_store = []
+                    embeddings_to_store = []
+                self.__end_batch(item, state)
+                continue
+            chunks, embeddings = item
+            if embeddings is None:
+                self.__delete_replaced_documents([chunk for chunk, _ in chunks], state)
+                self.__store_duplicates(chunks)
+                self.__take_failed_chunks(state)
+                continue
+            chunks_to_store.extend(chunks)
+            embeddings_to_store.extend(embeddings.result())
+
+            if len(chunks_to_store) >= store_batch_size:
+                self.__store_embedded(chunks_to_store, embeddings_to_store, state)
+                chunks_to_store = []
+                embeddings_to_store = []
+
+        if state.stop_event.is_set():
+            return
+
+        if chunks_to_store:
+            self.__store_embedded(chunks_to_store, embeddings_to_store, state)
+
+        # Changed documents that do not result in chunks anymore still have their old chunks in the store
+        for document_id in list(state.replaced_documents):
+            self.__delete_document(document_id)
+        state.replaced_documents.clear()
+
+    def __end_batch(self, batch_end: _BatchEnd, state: _PipelineState):
+        # Changed documents of the batch without new chunks still have their old chunks in the store
+        for document_id in batch_end.replaced_documents:
+            if document_id in state.replaced_documents:
+                self.__delete_document(document_id)
+                state.replaced_documents.discard(document_id)
+
+        state.progress.update(num_batches=batch_end.batch_nr + 1,
+                              num_documents=batch_end.num_documents,
+                              num_chunks=batch_end.num_chunks,
+                              num_duplicates=batch_end.num_duplicates,
+                              changes=batch_end.changes)
+        if state.stored_document_hashes is not None:
+            state.stored_document_hashes.update(batch_end.document_hashes)
+
+        if state.progress["num_batches"] % state.checkpoint_every == 0:
+            self.__save_job_metadata(state.stored_document_hashes)
+            self.__save_checkpoint(state.checkpoint, state.progress)
+
+    def __store_embedded(self, chunks, embeddings, state: _PipelineState):
+        self.__delete_replaced_documents(chunks, state)
+        self.content_store.store_embedded(chunks, embeddings)
+        self.__take_failed_chunks(state)
+        state.metrics.report_progress(state.num_documents, state.num_chunks)
+
+    def __take_failed_chunks(self, state: _PipelineState):
+        # Only the storing stage writes to the content store, all failures up to the end of a batch are counted when
+        # the checkpoint of the batch is written
+        failed_chunks = self.content_store.take_failed_chunks()
+        state.progress["num_failed_chunks"] += len(failed_chunks)
+        if state.dead_letter_file:
+            state.dead_letter_file.append(failed_chunks)
+
+    def __delete_replaced_documents(self, items, state: _PipelineState):
+        # The old chunks of a changed document are removed just before the first new chunk or the text is stored. Doing
+        # this in the storing stage prevents changing the content store from two threads.
+        for document_id in dict.fromkeys(item.document_id for item in items):
+            if document_id in state.replaced_documents:
+                self.__delete_document(document_id)
+                state.replaced_documents.discard(document_id)
+
+    def __delete_document(self, document_id: str):
+        """
+        Removes the chunks of the document from the store. Duplicates in other documents of the removed chunks are made
+        searchable, they do not have an original anymore.
+        """
+        self.content_store.delete_document(document_id)
+        if not self.__duplicate_links:
+            return
+
+        prefix = document_id + "_"
+        orphans = [duplicate_id for duplicate_id, original_id in self.__duplicate_links.items()
+                   if original_id.startswith(prefix) and not duplicate_id.startswith(prefix)]
+        self.__duplicate_links = {duplicate_id: original_id
+                                  for duplicate_id, original_id in self.__duplicate_links.items()
+                                  if not duplicate_id.startswith(prefix) and not original_id.startswith(prefix)}
+        if orphans:
+            print(f"Making {len(orphans)} duplicates of removed document {document_id} searchable")
+            self.content_store.promote_duplicates(orphans)
+
+    def __store_duplicates(self, duplicates: list):
+        self.content_store.store_duplicates([chunk for chunk, _ in duplicates])
+        for chunk, original_id in duplicates:
+            self.__duplicate_links[chunk.get_id()] = original_id
+
+    def __find_original(self, chunk) -> Optional[str]:
+        # Chunks with only whitespace are never stored, they are not remembered as originals either
+        if self.deduplicator is None or chunk.chunk_text.strip() == "":
+            return None
+        return self.deduplicator.check(chunk)
+
+    @staticmethod
+    def __is_first_level(chunk) -> bool:
+        # Chunks created by the second or later splitter of a chain have the id of their parent as prefix
+        return "_" not in str(chunk.chunk_id)
+
+    def __num_duplicates(self) -> int:
+        return len(self.deduplicator.duplicates) if self.deduplicator else 0
+
+    def __load_duplicate_links(self):
+        # The links of earlier jobs are kept, they are needed to promote duplicates when an original is removed
+        self.__duplicate_links = dict(self.content_store.get_metadata().get(DUPLICATE_CHUNKS_METADATA_KEY, {}))
+
+    def __save_job_metadata(self, document_hashes: Optional[dict]):
+        """
+        Writes the hashes of the indexed documents and the links of the duplicates to the metadata of the content store.
+        Both grow with the number of documents, they are written every checkpoint_every batches and at the end of a job.
+        :param document_hashes: The hashes of the documents of which all chunks are stored, None if not incremental.
+        """
+        if document_hashes is not None:
+            self.content_store.add_metadata(DOCUMENT_HASHES_METADATA_KEY, dict(document_hashes))
+        if self.deduplicator:
+            self.content_store.add_metadata(DUPLICATE_CHUNKS_METADATA_KEY, dict(self.__duplicate_links))
+
+    def __known_document_hashes(self) -> dict:
+        return dict(self.content_store.get_metadata().get(DOCUMENT_HASHES_METADATA_KEY, {}))
+
+    @staticmethod
+    def __document_change(document: InputDocument, splitter: Splitter, document_hashes: dict) -> (str, str):
+        """
+        Compares the hash of the document with the hash of the previous run.
+        :return: The kind of change (added, updated or skipped) and the new hash of the document.
+        """
+        document_hash = document.content_hash(splitter.configuration())
+        known_hash = document_hashes.get(document.document_id)
+        if known_hash is None:
+            return ADDED, document_hash
+        if known_hash == document_hash:
+            return SKIPPED, document_hash
+        return UPDATED, document_hash
+
+    @staticmethod
+    def __change_counts(changes: dict, incremental: bool) -> dict:
+        if not incremental:
+            return {}
+        return {
+            "num_added": changes[ADDED],
+            "num_updated": changes[UPDATED],
+            "num_skipped": changes[SKIPPED],
+        }
+
+    @staticmethod
+    def __put(target_queue: queue.Queue, item, stop_event: threading.Event) -> bool:
+        """
+        Puts the item in the queue, waits while the queue is full. Gives up when another stage has stopped the pipeline.
+        :return: True if the item was added to the queue, False if the pipeline was stopped.
+        """
+        while not stop_event.is_set():
+            try:
+                target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def __get(source_queue: queue.Queue, stop_event: threading.Event):
+        """
+        Takes the next item from the queue, returns the end of stage marker when the pipeline was stopped.
+        """
+        while not stop_event.is_set():
+            try:
+                return source_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return _END_OF_STAGE
@@ -1,9 +1,31 @@
-class InputDocument:
+import hashlib
+import json
+
+from rag4p.util.slotted_state import SlottedState, intern_id
+
+
+class InputDocument(SlottedState):
+    __slots__ = ("document_id", "text", "properties")
+
     document_id: str
     text: str
     properties: {}
 
     def __init__(self, document_id, text, properties):
-        self.document_id = document_id
+        self.document_id = intern_id(document_id)
         self.text = text
         self.properties = properties
+
+    def content_hash(self, splitter_configuration: dict = None) -> str:
+        """
+        Creates a hash of the content of the document. The hash changes when the text, the properties or the provided
+        configuration of the splitter change. Used to find out if a document has to be indexed again.
+        :param splitter_configuration: The configuration of the splitter used to create the chunks.
+        :return: A hex string with the sha256 hash of the content.
+        """
+        content = json.dumps({
+            "text": self.text,
+            "properties": self.properties,
+            "splitter": splitter_configuration,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
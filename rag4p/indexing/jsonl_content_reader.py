@@ -1,16 +1,49 @@
 import json
+import mmap
+import multiprocessing
+import os
 from abc import abstractmethod
-from typing import Iterable, List
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
 
 from rag4p.indexing.content_reader import ContentReader
 from rag4p.indexing.input_document import InputDocument
 
+# The reader used by a worker process to map the parsed lines, it is sent to each worker once when the worker starts
+_worker_reader = None
+
+
+def _init_reader_worker(reader: "JsonlContentReader"):
+    global _worker_reader
+    _worker_reader = reader
+
+
+def _parse_range_in_worker(start: int, end: int) -> List[InputDocument]:
+    return _worker_reader.parse_range(start, end)
+
 
 class JsonlContentReader(ContentReader):
-    def __init__(self, file_path: str):
+    """
+    Reads documents from a file with a json object on each line. Subclasses map the json object to an InputDocument.
+
+    In parallel mode, the file is memory mapped and divided into byte ranges of about range_size bytes. Each range
+    ends at the end of a line. The ranges are parsed in a pool of worker processes, the subclass must therefore be
+    picklable. The documents are returned in the same order as they appear in the file.
+    """
+
+    def __init__(self, file_path: str, parallel: bool = False, num_workers: int = None,
+                 range_size: int = 4 * 1024 * 1024):
         self.file_path = file_path
+        self.parallel = parallel
+        self.num_workers = num_workers if num_workers else os.cpu_count()
+        self.range_size = range_size
 
     def read(self, batch_size: int = 10) -> Iterable[List[InputDocument]]:
+        if self.parallel:
+            yield from self.__read_parallel(batch_size)
+            return
+
         with open(self.file_path, 'r') as file:
             batch = []
             for line in file:
@@ -23,6 +56,72 @@ class JsonlContentReader(ContentReader):
             if batch:
                 yield batch
 
+    def __read_parallel(self, batch_size: int) -> Iterable[List[InputDocument]]:
+        byte_ranges = self.byte_ranges()
+        if not byte_ranges:
+            return
+
+        # Limit the number of parsed ranges waiting in memory, the order of the ranges is kept using the queue
+        max_pending = self.num_workers * 2
+        with ProcessPoolExecutor(max_workers=self.num_workers,
+                                 mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_init_reader_worker,
+                                 initargs=(self,)) as executor:
+            pending = deque()
+            next_range = 0
+            batch = []
+            while pending or next_range < len(byte_ranges):
+                while next_range < len(byte_ranges) and len(pending) < max_pending:
+                    pending.append(executor.submit(_parse_range_in_worker, *byte_ranges[next_range]))
+                    next_range += 1
+
+                batch.extend(pending.popleft().result())
+                while len(batch) >= batch_size:
+                    yield batch[:batch_size]
+                    batch = batch[batch_size:]
+
+            if batch:
+                yield batch
+
+    def byte_ranges(self) -> List[Tuple[int, int]]:
+        """
+        Divides the file into ranges of about range_size bytes, every range ends directly after a newline or at the
+        end of the file. The file is memory mapped, only the bytes around the boundaries are read.
+        :return: A list with the start and end position of each range.
+        """
+        file_size = os.path.getsize(self.file_path)
+        if file_size == 0:
+            return []
+
+        byte_ranges = []
+        with open(self.file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                start = 0
+                while start < file_size:
+                    end = start + self.range_size
+                    if end >= file_size:
+                        end = file_size
+                    else:
+                        newline = mapped_file.find(b"\n", end - 1)
+                        end = file_size if newline == -1 else newline + 1
+                    byte_ranges.append((start, end))
+                    start = end
+        return byte_ranges
+
+    def parse_range(self, start: int, end: int) -> List[InputDocument]:
+        """
+        Parses the lines in the provided byte range of the file, empty lines are skipped.
+        :param start: The position of the first byte of the range.
+        :param end: The position after the last byte of the range.
+        :return: The documents in the range, in the order of the file.
+        """
+        with open(self.file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                content = mapped_file[start:end].decode('utf-8')
+
+        # Split on newlines only, splitlines would also split on line separators within the json strings
+        return [self.map_to_input_document(json.loads(line)) for line in content.split("\n") if line.strip()]
+
     @abstractmethod
     def map_to_input_document(self, data) -> InputDocument:
         pass
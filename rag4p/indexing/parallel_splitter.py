@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.splitter import Splitter
+from rag4p.rag.model.chunk import Chunk
+
+# The splitter used by a worker process, it is sent to each worker once when the worker starts
+_worker_splitter = None
+
+
+def _init_split_worker(splitter: Splitter):
+    global _worker_splitter
+    _worker_splitter = splitter
+
+
+def _split_in_worker(document: InputDocument) -> Tuple[List[Chunk], float, float]:
+    return split_measured(_worker_splitter, document)
+
+
+def split_measured(splitter: Splitter, document: InputDocument) -> Tuple[List[Chunk], float, float]:
+    """
+    Splits the document and measures the wall and cpu time, a worker process cannot record them in the metrics itself.
+    :return: The chunks, the wall time and the cpu time.
+    """
+    start_wall = time.perf_counter()
+    start_cpu = time.thread_time()
+    chunks = splitter.split(document)
+    return chunks, time.perf_counter() - start_wall, time.thread_time() - start_cpu
+
+
+class ParallelSplitter:
+    """
+    Splits documents in a pool of worker processes. The splitter must be picklable, it is sent to each worker once.
+    The chunk ids only depend on the document and the splitter, so the chunks are the same as when splitting the
+    documents one by one. Use the ParallelSplitter as a context manager, or call shutdown when done.
+    """
+
+    def __init__(self, splitter: Splitter, num_workers: int = None):
+        self.splitter = splitter
+        self.num_workers = num_workers if num_workers else os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.num_workers,
+                                            mp_context=multiprocessing.get_context("spawn"),
+                                            initializer=_init_split_worker,
+                                            initargs=(splitter,))
+
+    def submit(self, document: InputDocument) -> Future:
+        """
+        Splits the document in one of the workers.
+        :return: A future with the chunks, the wall time and the cpu time of the split, see split_measured.
+        """
+        return self.executor.submit(_split_in_worker, document)
+
+    def split_documents(self, documents: Iterable[InputDocument], max_pending: int = None) \
+            -> Iterable[Tuple[InputDocument, List[Chunk]]]:
+        """
+        Splits the documents in the workers and yields each document with its chunks, in the order of the documents.
+        At most max_pending documents are split ahead of the consumer, which keeps the memory use bounded.
+        :param documents: The documents to split, can be a generator.
+        :param max_pending: Maximum number of documents being split or waiting to be consumed, default twice the number
+        of workers.
+        """
+        max_pending = max_pending if max_pending else self.num_workers * 2
+        pending = deque()
+        for document in documents:
+            pending.append((document, self.submit(document)))
+            if len(pending) >= max_pending:
+                document_, future = pending.popleft()
+                yield document_, future.result()[0]
+
+        while pending:
+            document_, future = pending.popleft()
+            yield document_, future.result()[0]
+
+    def shutdown(self, cancel_futures: bool = False):
+        self.executor.shutdown(cancel_futures=cancel_futures)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(cancel_futures=exc_type is not None)
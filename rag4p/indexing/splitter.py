@@ -1,5 +1,5 @@
 from abc import abstractmethod, ABC
-from typing import List
+from typing import Iterator, List
 
 from rag4p.rag.model.chunk import Chunk
 from rag4p.indexing.input_document import InputDocument
@@ -15,6 +15,43 @@ class Splitter(ABC):
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> List[Chunk]:
         pass
 
+    def split_stream(self, input_document: InputDocument, parent_chunk: Chunk = None) -> Iterator[Chunk]:
+        """
+        Yields the chunks of the document one by one, in the same order as split. Splitters that can produce chunks
+        before the complete document is split override this method, the default yields the chunks of split.
+        """
+        yield from self.split(input_document, parent_chunk)
+
+    def split_batch(self, input_documents: List[InputDocument]) -> List[List[Chunk]]:
+        """
+        Splits multiple documents at once. The result contains a list of chunks for each document, in the same order as
+        the provided documents. Splitters that can do the work for multiple documents more efficiently override this
+        method.
+        :param input_documents: The documents to split.
+        :return: A list with the chunks for each document.
+        """
+        return [self.split(input_document) for input_document in input_documents]
+
+    def split_chunks(self, input_document: InputDocument, parent_chunks: List[Chunk]) -> Iterator[List[Chunk]]:
+        """
+        Splits multiple chunks of the same document, used by the SplitterChain to split all chunks of one level at
+        once. Yields a list of chunks for each parent chunk, in the same order as the parent chunks. The default splits
+        the parent chunks one by one when the next list is requested, splitters that can split multiple chunks
+        concurrently override this method.
+        :param input_document: The document the parent chunks belong to.
+        :param parent_chunks: The chunks to split.
+        :return: An iterator with the chunks for each parent chunk.
+        """
+        for parent_chunk in parent_chunks:
+            yield self.split(input_document, parent_chunk)
+
+    def configuration(self) -> dict:
+        """
+        Returns the configuration of the splitter, splitters with parameters that change the created chunks add these
+        parameters. Used to detect that documents have to be split again.
+        """
+        return {"name": self.name()}
+
     @staticmethod
     @abstractmethod
     def name() -> str:
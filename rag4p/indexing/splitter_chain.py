@@ -1,5 +1,4 @@
-from abc import ABC
-from typing import List
+from typing import Iterator, List
 
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
@@ -7,6 +6,11 @@ from rag4p.rag.model.chunk import Chunk
 
 
 class SplitterChain(Splitter):
+    """
+    Splits the document with the first splitter, and each resulting chunk with the next splitter. The chunks of the
+    last splitter are always returned, the chunks of the first splitter as well. The chunks of the splitters in between
+    are only returned when include_all_chunks is True. A chunk is followed directly by the chunks it is split into.
+    """
 
     def __init__(self, splitters: List[Splitter], include_all_chunks: bool = False):
         self.splitters = splitters
@@ -15,28 +19,53 @@ class SplitterChain(Splitter):
         self.include_all_chunks = include_all_chunks
 
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> List[Chunk]:
+        return list(self.split_stream(input_document))
+
+    def split_stream(self, input_document: InputDocument, parent_chunk: Chunk = None) -> Iterator[Chunk]:
+        """
+        Yields the chunks depth first. The chunks created by a splitter are split by the next splitter together, using
+        split_chunks, so splitters like the SemanticSplitter handle them concurrently. Only the chunks of one split per
+        level are kept in memory, not all the chunks of the document.
+        """
         return self._split_current_splitter(input_document=input_document)
 
+    def split_batch(self, input_documents: List[InputDocument]) -> List[List[Chunk]]:
+        """
+        Splits the documents with split_batch of the first splitter, the chunks of each document are split further
+        like in split_stream.
+        """
+        batch_chunks = self.splitters[0].split_batch(input_documents)
+        return [list(self._split_chunks(input_document, 0, chunks))
+                for input_document, chunks in zip(input_documents, batch_chunks)]
+
     def _split_current_splitter(self,
                                 input_document: InputDocument,
                                 splitter_nr: int = 0,
-                                parent_chunk: Chunk = None) -> List[Chunk]:
-        chunks = []
+                                parent_chunk: Chunk = None) -> Iterator[Chunk]:
         current_chunks = self.splitters[splitter_nr].split(input_document=input_document, parent_chunk=parent_chunk)
-        for current_chunk in current_chunks:
+        return self._split_chunks(input_document, splitter_nr, current_chunks)
 
-            # We always add the first and last chunk, or all chunks if include_all_chunks is True
-            if splitter_nr + 1 >= len(self.splitters) or self.include_all_chunks or splitter_nr == 0:
-                chunks.append(current_chunk)
+    def _split_chunks(self, input_document: InputDocument, splitter_nr: int, current_chunks: List[Chunk]) \
+            -> Iterator[Chunk]:
+        # If we are at the last splitter, all chunks are returned
+        if splitter_nr + 1 >= len(self.splitters):
+            yield from current_chunks
+            return
 
-            # If we are not at the last splitter, we recursively call the next splitter
-            if splitter_nr + 1 < len(self.splitters):
-                child_chunks = self._split_current_splitter(input_document=input_document,
-                                                            splitter_nr=splitter_nr + 1,
-                                                            parent_chunk=current_chunk)
-                chunks.extend(child_chunks)
+        next_splitter_nr = splitter_nr + 1
+        child_chunks = iter(self.splitters[next_splitter_nr].split_chunks(input_document, current_chunks))
+        for current_chunk in current_chunks:
+            # We always add the first chunks, the chunks in between only if include_all_chunks is True
+            if self.include_all_chunks or splitter_nr == 0:
+                yield current_chunk
+            yield from self._split_chunks(input_document, next_splitter_nr, next(child_chunks))
 
-        return chunks
+    def configuration(self) -> dict:
+        return {
+            "name": self.name(),
+            "include_all_chunks": self.include_all_chunks,
+            "splitters": [splitter.configuration() for splitter in self.splitters],
+        }
 
     @staticmethod
     def name() -> str:
@@ -16,11 +16,21 @@ class MaxTokenSplitter(Splitter):
     Splits an InputDocument into Chunks of a maximum number of tokens. The tokens are obtained by
     encoding the text of the document using the default model from openai encoding. The chunks of tokens are
     decoded back into text.
+
+    With an overlap larger than 0, the windows of tokens slide over the document. Each window starts max_tokens -
+    overlap tokens after the previous one, so the last overlap tokens of a chunk are repeated at the start of the next
+    chunk. This gives the context across chunk boundaries without a second pass over the chunks.
     """
 
-    def __init__(self, max_tokens: int = 200, provider: str = OPENAI_PROVIDER, model: str = DEFAULT_EMBEDDING_MODEL):
+    def __init__(self, max_tokens: int = 200, provider: str = OPENAI_PROVIDER, model: str = DEFAULT_EMBEDDING_MODEL,
+                 overlap: int = 0):
+        if overlap < 0 or overlap >= max_tokens:
+            raise ValueError(f"The overlap must be between 0 and max_tokens ({max_tokens}), got {overlap}")
+
         self.max_tokens = max_tokens
+        self.overlap = overlap
         self.provider = provider
+        self.model = model
         if provider == OPENAI_PROVIDER:
             self.encoding = tiktoken.encoding_for_model(model)
         elif provider == OLLAMA_PROVIDER:
@@ -38,20 +48,69 @@ class MaxTokenSplitter(Splitter):
         else:
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-        chunks = []
-        num_chunks = len(tokens) // self.max_tokens + (len(tokens) % self.max_tokens != 0)
+        return self._create_chunks(input_document, tokens, parent_chunk)
 
-        while tokens:
-            chunk_size = min(len(tokens), self.max_tokens)
-            chunk_tokens = tokens[:chunk_size]
-            tokens = tokens[chunk_size:]
+    def split_batch(self, input_documents: List[InputDocument]) -> List[List[Chunk]]:
+        """
+        Tokenizes all documents in one call to the tokenizer before creating the chunks. The Hugging Face tokenizer used
+        for Ollama encodes the batch in parallel in native code, tiktoken uses a thread pool.
+        :param input_documents: The documents to split.
+        :return: A list with the chunks for each document.
+        """
+        texts = [input_document.text for input_document in input_documents]
+        if self.provider == OPENAI_PROVIDER:
+            batch_tokens = self.encoding.encode_batch(texts)
+        elif self.provider == OLLAMA_PROVIDER:
+            batch_tokens = [encoding.ids for encoding in self.encoding.encode_batch(texts)]
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+        return [self._create_chunks(input_document, tokens)
+                for input_document, tokens in zip(input_documents, batch_tokens)]
+
+    def _create_chunks(self, input_document: InputDocument, tokens: List[int], parent_chunk: Chunk = None) \
+            -> List[Chunk]:
+        """
+        Creates the chunks in one pass over the tokens. Each window is a slice of the token list, the list itself is
+        never copied or shortened.
+        """
+        num_chunks = self.number_of_chunks(len(tokens))
+        stride = self.max_tokens - self.overlap
+
+        chunks = []
+        for chunk_nr in range(num_chunks):
+            start = chunk_nr * stride
+            chunk_tokens = tokens[start:start + self.max_tokens]
             chunk_text = self.encoding.decode(chunk_tokens)
-            chunk_id = str(len(chunks)) if parent_chunk is None else f"{parent_chunk.chunk_id}_{len(chunks)}"
+            chunk_id = str(chunk_nr) if parent_chunk is None else f"{parent_chunk.chunk_id}_{chunk_nr}"
             chunk = Chunk(input_document.document_id, chunk_id, num_chunks, chunk_text, input_document.properties)
             chunks.append(chunk)
 
         return chunks
 
+    def number_of_chunks(self, num_tokens: int) -> int:
+        """
+        Calculates the number of windows needed to cover all tokens. The last window can be shorter than max_tokens,
+        but it always contains tokens that are not in the previous window.
+        :param num_tokens: The number of tokens in the text to split.
+        :return: The number of chunks the text is split into.
+        """
+        if num_tokens == 0:
+            return 0
+        if num_tokens <= self.max_tokens:
+            return 1
+        stride = self.max_tokens - self.overlap
+        return 1 + -(-(num_tokens - self.max_tokens) // stride)
+
+    def configuration(self) -> dict:
+        return {
+            "name": self.name(),
+            "max_tokens": self.max_tokens,
+            "overlap": self.overlap,
+            "provider": self.provider,
+            "model": self.model,
+        }
+
     @staticmethod
     def name() -> str:
         return "MaxTokenSplitter"
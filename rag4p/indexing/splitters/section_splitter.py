@@ -4,17 +4,32 @@ from typing import List
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
 from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.span_chunk import SpanChunk
+
+SECTION_SEPARATOR = re.compile(r"\n\s*\n")
 
 
 class SectionSplitter(Splitter):
+    """
+    Splits an InputDocument into Chunks of a section, sections are separated by an empty line. The chunks refer to the
+    sections using offsets into the document text, the text of a section is not copied.
+    """
+
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> List[Chunk]:
-        input_text = input_document.text if parent_chunk is None else parent_chunk.chunk_text
-        sections = re.split(r"\n\s*\n", input_text)
+        text, start, end = SpanChunk.text_span(input_document.text, parent_chunk)
+
+        spans = []
+        section_start = start
+        for separator in SECTION_SEPARATOR.finditer(text, start, end):
+            spans.append((section_start, separator.start()))
+            section_start = separator.end()
+        spans.append((section_start, end))
 
         chunks_ = []
-        for i, section in enumerate(sections):
+        for i, (section_start, section_end) in enumerate(spans):
             chunk_id = str(i) if parent_chunk is None else f"{parent_chunk.chunk_id}_{i}"
-            chunk_ = Chunk(input_document.document_id, chunk_id, len(sections), section, input_document.properties)
+            chunk_ = SpanChunk(input_document.document_id, chunk_id, len(spans), text, section_start, section_end,
+                               input_document.properties)
             chunks_.append(chunk_)
 
         return chunks_
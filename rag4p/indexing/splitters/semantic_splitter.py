@@ -1,20 +1,45 @@
-from typing import List
+from typing import Iterator, List
 
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
+from rag4p.rag.generation.knowledge.knowledge import Knowledge
 from rag4p.rag.generation.knowledge.knowledge_extractor import KnowledgeExtractor
 from rag4p.rag.model.chunk import Chunk
 
 
 class SemanticSplitter(Splitter):
-
-    def __init__(self, knowledge_extractor: KnowledgeExtractor):
+    """
+    Splits an InputDocument into Chunks of knowledge extracted by an LLM. Use split_batch to extract the knowledge for
+    multiple documents concurrently, with at most max_workers calls to the LLM at the same time. In a SplitterChain,
+    the knowledge of all chunks created by the previous splitter is extracted concurrently in the same way. Wrap the
+    extractor in a CachedKnowledgeExtractor to prevent extracting the knowledge of the same text again when
+    re-indexing.
+    """
+
+    def __init__(self, knowledge_extractor: KnowledgeExtractor, max_workers: int = 4):
         self.knowledge_extractor = knowledge_extractor
+        self.max_workers = max_workers
 
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> List[Chunk]:
         input_text = input_document.text if parent_chunk is None else parent_chunk.chunk_text
         knowledge_items = self.knowledge_extractor.extract_knowledge(input_text)
+        return self.__create_chunks(input_document, knowledge_items, parent_chunk)
+
+    def split_batch(self, input_documents: List[InputDocument]) -> List[List[Chunk]]:
+        batch_knowledge = self.knowledge_extractor.extract_knowledge_batch(
+            [input_document.text for input_document in input_documents], max_workers=self.max_workers)
+        return [self.__create_chunks(input_document, knowledge_items)
+                for input_document, knowledge_items in zip(input_documents, batch_knowledge)]
+
+    def split_chunks(self, input_document: InputDocument, parent_chunks: List[Chunk]) -> Iterator[List[Chunk]]:
+        batch_knowledge = self.knowledge_extractor.extract_knowledge_batch(
+            [parent_chunk.chunk_text for parent_chunk in parent_chunks], max_workers=self.max_workers)
+        for parent_chunk, knowledge_items in zip(parent_chunks, batch_knowledge):
+            yield self.__create_chunks(input_document, knowledge_items, parent_chunk)
 
+    @staticmethod
+    def __create_chunks(input_document: InputDocument, knowledge_items: List[Knowledge], parent_chunk: Chunk = None) \
+            -> List[Chunk]:
         chunks_ = []
         for i, knowledge_item in enumerate(knowledge_items):
             chunk_id = str(i) if parent_chunk is None else f"{parent_chunk.chunk_id}_{i}"
@@ -27,6 +52,12 @@ class SemanticSplitter(Splitter):
 
         return chunks_
 
+    def configuration(self) -> dict:
+        return {
+            "name": self.name(),
+            "knowledge_extractor": self.knowledge_extractor.configuration(),
+        }
+
     @staticmethod
     def name() -> str:
         return SemanticSplitter.__name__
@@ -1,27 +1,42 @@
+import functools
 from typing import List
 
-from nltk.tokenize import sent_tokenize
+from nltk.tokenize import PunktTokenizer
 
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
 from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.span_chunk import SpanChunk
 
 
 class SentenceSplitter(Splitter):
     """
-    Splits an InputDocument into Chunks of a single sentence.
+    Splits an InputDocument into Chunks of a single sentence. The punkt tokenizer, also used by nltk's sent_tokenize,
+    returns the offsets of the sentences. The chunks refer to the sentences using these offsets.
     """
 
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> List[Chunk]:
-        input_text = input_document.text if parent_chunk is None else parent_chunk.chunk_text
-        sentences = sent_tokenize(input_text)
+        text, start, end = SpanChunk.text_span(input_document.text, parent_chunk)
+        # Punkt only works on complete strings, the part to split is copied once for the tokenizer
+        part = text if start == 0 and end == len(text) else text[start:end]
+        spans = list(punkt_tokenizer("english").span_tokenize(part))
+
         chunks = []
-        for i in range(len(sentences)):
+        for i, (sentence_start, sentence_end) in enumerate(spans):
             chunk_id = str(i) if parent_chunk is None else f"{parent_chunk.chunk_id}_{i}"
-            chunk = Chunk(input_document.document_id, chunk_id, len(sentences), sentences[i], input_document.properties)
+            chunk = SpanChunk(input_document.document_id, chunk_id, len(spans), text, start + sentence_start,
+                              start + sentence_end, input_document.properties)
             chunks.append(chunk)
         return chunks
 
     @staticmethod
     def name() -> str:
         return "SentenceSplitter"
+
+
+@functools.lru_cache
+def punkt_tokenizer(language: str) -> PunktTokenizer:
+    """
+    Returns the punkt tokenizer for the language, loading the model once per process.
+    """
+    return PunktTokenizer(language)
@@ -1,17 +1,19 @@
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
 from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.span_chunk import SpanChunk
 
 
 class SingleChunkSplitter(Splitter):
     """
-    Does not really split the document, it results in one chunk with the whole document.
+    Does not really split the document, it results in one chunk with the whole document. The chunk refers to the text
+    of the document, the text is not copied.
     """
 
     def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> [Chunk]:
         chunk_id = "0" if parent_chunk is None else f"{parent_chunk.chunk_id}_0"
-        chunk_text = input_document.text if parent_chunk is None else parent_chunk.chunk_text
-        chunk = Chunk(input_document.document_id, chunk_id, 1, chunk_text, input_document.properties)
+        text, start, end = SpanChunk.text_span(input_document.text, parent_chunk)
+        chunk = SpanChunk(input_document.document_id, chunk_id, 1, text, start, end, input_document.properties)
         return [chunk]
 
     @staticmethod
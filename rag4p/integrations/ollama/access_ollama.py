@@ -1,18 +1,71 @@
-from typing import List
+import json
+import time
+from typing import Iterator, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from abc import ABC
 
+from rag4p.integrations.ollama import PROVIDER
+from rag4p.util.completion_cache import CompletionCache
+
 
 class AccessOllama(ABC):
     """
     A simple wrapper for Ollama's API. The wrapper is not trying to be complete, just to provide a simple way to access
     the API. YOu can find more information about the API at https://github.com/ollama/ollama/blob/main/docs/api.md
+
+    All requests share a session with a pool of connections. Requests that fail with a connection error or a 5xx
+    response are retried with an exponential backoff. Ollama unloads a model after a period without requests, the
+    keep_alive setting is sent with every request to control that period. Use preload to load a model before the first
+    question arrives.
     """
 
-    def __init__(self, host: str = "localhost", port: int = 11434, protocol: str = "http"):
+    def __init__(self, host: str = "localhost", port: int = 11434, protocol: str = "http",
+                 completion_cache: CompletionCache = None, timeout: Union[float, Tuple[float, float]] = (5.0, 300.0),
+                 max_retries: int = 3, backoff_seconds: float = 0.5, keep_alive: Optional[Union[str, int]] = "5m",
+                 pool_size: int = 10):
+        """
+        :param completion_cache: Optional cache for the generated answers, the same prompt is sent to Ollama once.
+        :param timeout: The timeout in seconds, or a tuple with the connect and the read timeout.
+        :param max_retries: The number of retries after a connection error or a 5xx response.
+        :param backoff_seconds: The wait before the first retry, it doubles for every next retry.
+        :param keep_alive: How long Ollama keeps the model loaded after a request. A duration with a unit like "5m", or
+        a number of seconds. A negative value like "-1m" or -1 keeps the model loaded forever, 0 unloads it right
+        away. None uses the default of the Ollama server.
+        :param pool_size: The maximum number of connections kept open to Ollama.
+        """
         self.connection = f"{protocol}://{host}:{port}"
+        self.completion_cache = completion_cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def preload(self, model: str):
+        """
+        Loads the model in Ollama without generating an answer, call this when starting a service to prevent a slow
+        first request.
+        :param model: The model to load, has to be available in you Ollama instance.
+        """
+        response = self.__request("post", "/api/generate", json=self.__with_keep_alive({"model": model}))
+        if response.status_code != 200:
+            raise Exception("Error loading model:" + response.text)
 
     def list_models(self) -> List[str]:
         """
@@ -20,7 +73,7 @@ class AccessOllama(ABC):
         :return: List of strings with the available models in the format name (#params, quantization level).
         """
 
-        response = requests.get(f"{self.connection}/api/tags")
+        response = self.__request("get", "/api/tags")
         models = []
         if response.status_code == 200:
             json_response = response.json()
@@ -37,21 +90,84 @@ class AccessOllama(ABC):
         :param model: The model to use to generate the answer, has to be available in you Ollama instance.
         :return:
         """
-        response = requests.post(f"{self.connection}/api/generate",
-                                 json={
-                                     "prompt": prompt,
-                                     "model": model,
-                                     "format": "json",
-                                     "stream": False
-                                 })
+        if self.completion_cache is None:
+            return self.__generate_answer(prompt, model)
+        return self.completion_cache.complete(PROVIDER, model, [{"role": "user", "content": prompt}],
+                                              {"format": "json"}, lambda: self.__generate_answer(prompt, model))
+
+    def __generate_answer(self, prompt: str, model: str) -> str:
+        response = self.__request("post", "/api/generate",
+                                  json=self.__with_keep_alive({
+                                      "prompt": prompt,
+                                      "model": model,
+                                      "format": "json",
+                                      "stream": False
+                                  }))
         if response.status_code == 200:
             return response.json()["response"]
         raise Exception("Error generating answer:" + response.text)
 
+    def generate_answer_stream(self, prompt: str, model: str) -> Iterator[dict]:
+        """
+        Generate an answer to a prompt as a stream. Each response of Ollama contains the next part of the answer in
+        "response", the last one has "done" set to true and contains the statistics like "eval_count".
+        :param prompt: Complete prompt to send to the model.
+        :param model: The model to use to generate the answer, has to be available in you Ollama instance.
+        :return: An iterator over the responses of Ollama.
+        """
+        with self.__request("post", "/api/generate",
+                            json=self.__with_keep_alive({
+                                "prompt": prompt,
+                                "model": model,
+                                "stream": True
+                            }),
+                            stream=True) as response:
+            if response.status_code != 200:
+                raise Exception("Error generating answer:" + response.text)
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
     def generate_embedding(self, text: str, model: str) -> List[float]:
-        response = requests.post(f"{self.connection}/api/embeddings",
-                                 json={"model": model, "prompt": text})
+        response = self.__request("post", "/api/embeddings",
+                                  json=self.__with_keep_alive({"model": model, "prompt": text}))
         if response.status_code == 200:
             return response.json()["embedding"]
 
         raise Exception("Error generating embedding:" + response.text)
+
+    def generate_embeddings(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts in one request, uses the batch embed endpoint of Ollama.
+        :param texts: The texts to embed.
+        :param model: The embedding model to use, has to be available in you Ollama instance.
+        :return: The embeddings in the same order as the texts.
+        """
+        response = self.__request("post", "/api/embed",
+                                  json=self.__with_keep_alive({"model": model, "input": texts}))
+        if response.status_code == 200:
+            return response.json()["embeddings"]
+
+        raise Exception("Error generating embeddings:" + response.text)
+
+    def __request(self, method: str, path: str, **kwargs) -> requests.Response:
+        for retry in range(self.max_retries + 1):
+            if retry > 0:
+                time.sleep(self.backoff_seconds * (2 ** (retry - 1)))
+            try:
+                response = self.session.request(method, f"{self.connection}{path}", timeout=self.timeout, **kwargs)
+            except requests.ConnectionError as e:
+                if retry == self.max_retries:
+                    raise
+                print(f"Connection to Ollama failed, retrying: {e}")
+                continue
+
+            if response.status_code < 500 or retry == self.max_retries:
+                return response
+            print(f"Ollama responded with {response.status_code}, retrying")
+            response.close()
+
+    def __with_keep_alive(self, body: dict) -> dict:
+        if self.keep_alive is not None:
+            body["keep_alive"] = self.keep_alive
+        return body
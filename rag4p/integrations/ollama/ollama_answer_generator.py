@@ -1,8 +1,10 @@
 import json
+from typing import Iterator
 
 from rag4p.integrations.ollama import DEFAULT_MODEL
 from rag4p.integrations.ollama.access_ollama import AccessOllama
 from rag4p.rag.generation.answer_generator import AnswerGenerator
+from rag4p.rag.generation.generation_metrics import GenerationMetrics, measure_stream
 
 
 class OllamaAnswerGenerator(AnswerGenerator):
@@ -23,3 +25,22 @@ class OllamaAnswerGenerator(AnswerGenerator):
         answer = self.ollama.generate_answer(prompt=prompt, model=self.model)
         json_answer = json.loads(answer)
         return json_answer["answer"]
+
+    def generate_answer_stream(self, question: str, context: str,
+                               metrics: GenerationMetrics = None) -> Iterator[str]:
+        return measure_stream(self.__stream(question, context, metrics), metrics)
+
+    def __stream(self, question: str, context: str, metrics: GenerationMetrics) -> Iterator[str]:
+        # Parts of a json answer cannot be shown to the user, the streamed answer is plain text
+        prompt = f"""
+        You are an assistant answering questions using the context provided. If the context does not contain the
+        answer, you should tell you cannot answer using the context. Only give the answer.
+        question: {question}
+        context: {context}
+        answer:
+        """
+        for response in self.ollama.generate_answer_stream(prompt=prompt, model=self.model):
+            if response.get("done") and metrics is not None and "eval_count" in response:
+                metrics.report_tokens(response["eval_count"])
+            if response.get("response"):
+                yield response["response"]
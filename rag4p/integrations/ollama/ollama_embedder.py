@@ -1,3 +1,5 @@
+from typing import List
+
 from rag4p.integrations.ollama import DEFAULT_EMBEDDING_MODEL
 from rag4p.integrations.ollama.access_ollama import AccessOllama
 from rag4p.rag.embedding.embedder import Embedder
@@ -21,6 +23,9 @@ class OllamaEmbedder(Embedder):
     def embed(self, text: str) -> [float]:
         return self.ollama.generate_embedding(text, model=self.embedding_model)
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return self.ollama.generate_embeddings(texts, model=self.embedding_model)
+
     @staticmethod
     def supplier() -> str:
         return "Ollama"
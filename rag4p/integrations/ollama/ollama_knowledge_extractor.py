@@ -13,6 +13,9 @@ class OllamaKnowledgeExtractor(KnowledgeExtractor):
         self.ollama = access_ollama
         self.model = model
 
+    def model_name(self) -> str:
+        return self.model
+
     def extract_knowledge(self, context: str) -> List[Knowledge]:
         prompt = f"""
         Task: Extract Knowledge Chunks
@@ -1,30 +1,76 @@
-from openai import OpenAI
+from typing import AsyncIterator, Iterator
+
+from openai import AsyncOpenAI, OpenAI
 
 from rag4p.integrations.openai import DEFAULT_MODEL
+from rag4p.integrations.openai.openai_chat import create_chat_completion
 from rag4p.rag.generation.answer_generator import AnswerGenerator
+from rag4p.rag.generation.generation_metrics import GenerationMetrics, measure_stream, measure_stream_async
+from rag4p.util.completion_cache import CompletionCache
 
 
 class OpenaiAnswerGenerator(AnswerGenerator):
     """
     Used to generate answers to questions using the OpenAI API.
     """
-    def __init__(self, openai_api_key: str, openai_model: str = DEFAULT_MODEL):
+    def __init__(self, openai_api_key: str, openai_model: str = DEFAULT_MODEL,
+                 completion_cache: CompletionCache = None):
         self.openai_client = OpenAI(
             api_key=openai_api_key,
         )
+        self.async_openai_client = AsyncOpenAI(
+            api_key=openai_api_key,
+        )
         self.openai_model = openai_model
+        self.completion_cache = completion_cache
 
     def generate_answer(self, question: str, context: str) -> str:
-        completion = self.openai_client.chat.completions.create(
+        return create_chat_completion(self.openai_client, self.completion_cache, self.openai_model,
+                                      self.__messages(question, context))
+
+    def generate_answer_stream(self, question: str, context: str,
+                               metrics: GenerationMetrics = None) -> Iterator[str]:
+        return measure_stream(self.__stream(question, context, metrics), metrics)
+
+    def generate_answer_stream_async(self, question: str, context: str,
+                                     metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        return measure_stream_async(self.__stream_async(question, context, metrics), metrics)
+
+    def __stream(self, question: str, context: str, metrics: GenerationMetrics) -> Iterator[str]:
+        stream = self.openai_client.chat.completions.create(
             model=self.openai_model,
-            messages=[
-                {"role": "system", "content": "You are an assistant answering questions using the context provided. "
-                                              "If the context does not contain the answer, you should tell you cannot "
-                                              "answer using the context. The question is provided after 'question:'. "
-                                              "The context after 'context:'."},
-                {"role": "user", "content": f"Context: {context}\nQuestion: {question}\nAnswer:"},
-            ],
-            stream=False,
+            messages=self.__messages(question, context),
+            stream=True,
+            stream_options={"include_usage": True},
         )
+        for chunk in stream:
+            yield from self.__read_chunk(chunk, metrics)
+
+    async def __stream_async(self, question: str, context: str, metrics: GenerationMetrics) -> AsyncIterator[str]:
+        stream = await self.async_openai_client.chat.completions.create(
+            model=self.openai_model,
+            messages=self.__messages(question, context),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            for delta in self.__read_chunk(chunk, metrics):
+                yield delta
+
+    @staticmethod
+    def __read_chunk(chunk, metrics: GenerationMetrics) -> Iterator[str]:
+        # The last chunk contains the usage and no choices
+        if chunk.usage is not None and metrics is not None:
+            metrics.report_tokens(chunk.usage.completion_tokens)
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
 
-        return completion.choices[0].message.content
+    @staticmethod
+    def __messages(question: str, context: str) -> list:
+        return [
+            {"role": "system", "content": "You are an assistant answering questions using the context provided. "
+                                          "If the context does not contain the answer, you should tell you cannot "
+                                          "answer using the context. The question is provided after 'question:'. "
+                                          "The context after 'context:'."},
+            {"role": "user", "content": f"Context: {context}\nQuestion: {question}\nAnswer:"},
+        ]
@@ -0,0 +1,32 @@
+from typing import List
+
+from openai import OpenAI
+
+from rag4p.integrations.openai import PROVIDER
+from rag4p.util.completion_cache import CompletionCache
+
+
+def create_chat_completion(openai_client: OpenAI, completion_cache: CompletionCache, model: str, messages: List[dict],
+                           **parameters) -> str:
+    """
+    Requests a chat completion and returns the content of the answer. With a completion cache, the same request is
+    only sent to OpenAI once.
+    :param openai_client: The client to send the request with.
+    :param completion_cache: Optional cache for the completions.
+    :param model: The model to use.
+    :param messages: The messages of the chat.
+    :param parameters: Other parameters for the request, like the response_format.
+    :return: The content of the answer.
+    """
+    def create() -> str:
+        completion = openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=False,
+            **parameters
+        )
+        return completion.choices[0].message.content
+
+    if completion_cache is None:
+        return create()
+    return completion_cache.complete(PROVIDER, model, messages, parameters, create)
@@ -1,3 +1,5 @@
+from typing import List
+
 from openai import OpenAI
 
 from rag4p.integrations.openai import EMBEDDING_SMALL
@@ -31,6 +33,12 @@ class OpenAIEmbedder(Embedder):
 
         return embeddings[0].embedding
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(input=texts, model=self.embedding_model, encoding_format="float")
+        embeddings = sorted(response.data, key=lambda item: item.index)
+
+        return [embedding.embedding for embedding in embeddings]
+
     @staticmethod
     def supplier() -> str:
         return "OpenAI"
@@ -4,16 +4,23 @@ from typing import List
 from openai import OpenAI
 
 from rag4p.integrations.openai import DEFAULT_MODEL
+from rag4p.integrations.openai.openai_chat import create_chat_completion
 from rag4p.rag.generation.knowledge.knowledge import Knowledge
 from rag4p.rag.generation.knowledge.knowledge_extractor import KnowledgeExtractor
+from rag4p.util.completion_cache import CompletionCache
 
 
 class OpenaiKnowledgeExtractor(KnowledgeExtractor):
-    def __init__(self, openai_api_key: str, openai_model: str = DEFAULT_MODEL):
+    def __init__(self, openai_api_key: str, openai_model: str = DEFAULT_MODEL,
+                 completion_cache: CompletionCache = None):
         self.openai_client = OpenAI(
             api_key=openai_api_key,
         )
         self.openai_model = openai_model
+        self.completion_cache = completion_cache
+
+    def model_name(self) -> str:
+        return self.openai_model
 
     def extract_knowledge(self, context: str) -> List[Knowledge]:
         prompt = f"""
@@ -40,9 +47,10 @@ Format:
 Text:
 {context}
 """
-        completion = self.openai_client.chat.completions.create(
-            model=self.openai_model,
-            response_format={"type": "json_object"},
+        content = create_chat_completion(
+            self.openai_client,
+            self.completion_cache,
+            self.openai_model,
             messages=[
                 {
                     "role": "system",
@@ -50,10 +58,10 @@ Text:
                                "in a RAG system."},
                 {"role": "user", "content": prompt},
             ],
-            stream=False,
+            response_format={"type": "json_object"},
         )
 
-        answer = json.loads(completion.choices[0].message.content)
+        answer = json.loads(content)
 
         k_items = []
         for kc in answer["knowledge_chunks"]:
@@ -1,15 +1,18 @@
 from openai import OpenAI
 
+from rag4p.integrations.openai.openai_chat import create_chat_completion
 from rag4p.rag.generation.question_generator import QuestionGenerator
+from rag4p.util.completion_cache import CompletionCache
 
 
 class OpenAIQuestionGenerator(QuestionGenerator):
 
-    def __init__(self, openai_api_key: str, openai_model: str):
+    def __init__(self, openai_api_key: str, openai_model: str, completion_cache: CompletionCache = None):
         self.openai_client = OpenAI(
             api_key=openai_api_key,
         )
         self.openai_model = openai_model
+        self.completion_cache = completion_cache
 
     def generate_question(self, context: str) -> str:
         """
@@ -18,8 +21,10 @@ class OpenAIQuestionGenerator(QuestionGenerator):
         :param context: The context to generate a question from.
         :return: The generated question.
         """
-        completion = self.openai_client.chat.completions.create(
-            model=self.openai_model,
+        return create_chat_completion(
+            self.openai_client,
+            self.completion_cache,
+            self.openai_model,
             messages=[
                 {"role": "system",
                  "content": "You are a content writer reading a text and writing questions that are answered in that "
@@ -32,6 +37,4 @@ class OpenAIQuestionGenerator(QuestionGenerator):
                 {"role": "user",
                  "content": f"Context: {context}\nGenerated Question:"},
             ],
-            stream=False,
         )
-        return completion.choices[0].message.content
@@ -1,22 +1,28 @@
 from openai import OpenAI
 
 from rag4p.integrations.openai import MODEL_GPT4_TURBO
+from rag4p.integrations.openai.openai_chat import create_chat_completion
 from rag4p.rag.generation.chat.chat_prompt import ChatPrompt
 from rag4p.rag.generation.quality.answer_quality_service import AnswerQualityService
 from rag4p.rag.tracker.rag_observer import RAGObserver
+from rag4p.util.completion_cache import CompletionCache
 
 
 class OpenAIAnswerQualityService(AnswerQualityService):
 
-    def __init__(self, openai_api_key: str, openai_model: str = MODEL_GPT4_TURBO):
+    def __init__(self, openai_api_key: str, openai_model: str = MODEL_GPT4_TURBO,
+                 completion_cache: CompletionCache = None):
         self.openai_client = OpenAI(
             api_key=openai_api_key,
         )
         self.openai_model = openai_model
+        self.completion_cache = completion_cache
 
     def obtain_answer_to_question_quality(self, chat_prompt: ChatPrompt, rag_observer: RAGObserver):
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4o-mini",
+        return create_chat_completion(
+            self.openai_client,
+            self.completion_cache,
+            "gpt-4o-mini",
             response_format={"type": "json_object"},
             messages=[
                 {"role": "system",
@@ -26,14 +32,13 @@ class OpenAIAnswerQualityService(AnswerQualityService):
                      "question": rag_observer.question,
                      "answer": rag_observer.answer})},
             ],
-            stream=False,
         )
 
-        return response.choices[0].message.content
-
     def obtain_answer_from_context_quality(self, chat_prompt: ChatPrompt, rag_observer: RAGObserver):
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4o-mini",
+        return create_chat_completion(
+            self.openai_client,
+            self.completion_cache,
+            "gpt-4o-mini",
             messages=[
                 {"role": "system",
                  "content": chat_prompt.create_system_message(params={})},
@@ -42,6 +47,4 @@ class OpenAIAnswerQualityService(AnswerQualityService):
                      "context": rag_observer.context,
                      "answer": rag_observer.answer})},
             ],
-            stream=False,
-        )
-        return response.choices[0].message.content
\ No newline at end of file
+        )
\ No newline at end of file
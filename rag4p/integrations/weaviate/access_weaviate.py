@@ -1,46 +1,193 @@
+import json
+import threading
 import uuid
+from typing import List, Tuple
 
 import weaviate
 import weaviate.classes as wvc
+from weaviate.collections import Collection
+from weaviate.exceptions import UnexpectedStatusCodeError
 
 
 class AccessWeaviate:
+    """
+    Gives access to a Weaviate cluster. The handles of the collections and the collections known to exist are cached,
+    creating or deleting a collection through this class invalidates the cache.
+    """
 
     def __init__(self, url, access_key, openai_api_key: str = None):
         print(f"Connecting to Weaviate at {url}")
-        headers = {}
-        if openai_api_key:
-            headers = {"X-OpenAI-Api-Key": openai_api_key}
-
-        self.client = weaviate.connect_to_wcs(
+        self.__setup(weaviate.connect_to_wcs(
             cluster_url=url,
             auth_credentials=weaviate.auth.AuthApiKey(access_key),
-            headers=headers
-        )
+            headers=openai_headers(openai_api_key)
+        ))
+
+    @classmethod
+    def connect_to_local(cls, host: str = "localhost", port: int = 8080, grpc_port: int = 50051,
+                         openai_api_key: str = None):
+        """
+        Connects to a Weaviate running locally, for example in a container.
+        """
+        print(f"Connecting to Weaviate at {host}:{port}")
+        return cls.from_client(weaviate.connect_to_local(host=host, port=port, grpc_port=grpc_port,
+                                                         headers=openai_headers(openai_api_key)))
+
+    @classmethod
+    def connect_to_custom(cls, http_host: str, http_port: int, http_secure: bool, grpc_host: str, grpc_port: int,
+                          grpc_secure: bool, access_key: str = None, openai_api_key: str = None):
+        """
+        Connects to a Weaviate with a custom location of the http and the gRPC endpoints.
+        """
+        print(f"Connecting to Weaviate at {http_host}:{http_port}")
+        return cls.from_client(weaviate.connect_to_custom(
+            http_host=http_host, http_port=http_port, http_secure=http_secure,
+            grpc_host=grpc_host, grpc_port=grpc_port, grpc_secure=grpc_secure,
+            auth_credentials=weaviate.auth.AuthApiKey(access_key) if access_key else None,
+            headers=openai_headers(openai_api_key)
+        ))
+
+    @classmethod
+    def from_client(cls, client):
+        """
+        Creates an AccessWeaviate for a client that is already connected.
+        """
+        instance = cls.__new__(cls)
+        instance.__setup(client)
+        return instance
+
+    def __setup(self, client):
+        self.client = client
+        self.__lock = threading.Lock()
+        self.__collections = {}
+        self.__existing_collections = set()
+
+    def collection(self, collection_name: str) -> Collection:
+        """
+        Returns the cached handle of the collection, obtaining a handle does not check if the collection exists.
+        """
+        with self.__lock:
+            collection = self.__collections.get(collection_name)
+            if collection is None:
+                collection = self.client.collections.get(collection_name)
+                self.__collections[collection_name] = collection
+            return collection
+
+    def __forget_collection(self, collection_name: str):
+        with self.__lock:
+            self.__collections.pop(collection_name, None)
+            self.__existing_collections.discard(collection_name)
 
     def available_collections(self):
         collections = self.client.collections.list_all(simple=True)
         return [collection["name"] for collection in collections]
 
     def does_collection_exist(self, collection_name):
+        # Only existing collections are cached, a collection created by another client is found the next time
+        if collection_name in self.__existing_collections:
+            return True
+
         exists = self.client.collections.exists(collection_name)
 
-        if not exists:
+        if exists:
+            with self.__lock:
+                self.__existing_collections.add(collection_name)
+        else:
             print(f"Collection {collection_name} does not exist")
 
         return exists
 
     def add_document(self, collection_name: str, properties: dict, vector: [float]):
-        self.client.collections.get(collection_name).data.insert(
-            uuid=uuid.uuid4(),
-            properties=properties,
-            vector=vector
+        # The batch API adds or replaces the object in one request, without checking first if it exists
+        failed_documents = self.add_documents(collection_name, [(properties, vector)], batch_size=1,
+                                              concurrent_requests=1)
+        if failed_documents:
+            raise Exception(f"Object was not added: {failed_documents[0][1]}")
+
+    def add_documents(self, collection_name: str, documents: List[Tuple[dict, List[float]]], batch_size: int = None,
+                      concurrent_requests: int = 2) -> List[Tuple[int, str]]:
+        """
+        Adds multiple documents using the batch API of the client, the objects are sent in batches instead of one
+        request per object. The id of an object is derived from the documentId and the chunkId, adding a chunk again
+        replaces the existing object.
+        :param collection_name: The collection to add the documents to.
+        :param documents: Tuples with the properties and the vector of each document.
+        :param batch_size: The number of objects per request, None lets the client adjust the size dynamically.
+        :param concurrent_requests: The number of requests sent in parallel for a fixed batch size.
+        :return: The index in documents and the error message of each document that could not be added.
+        """
+        collection = self.collection(collection_name)
+        if batch_size is None:
+            batch_context = collection.batch.dynamic()
+        else:
+            batch_context = collection.batch.fixed_size(batch_size=batch_size, concurrent_requests=concurrent_requests)
+
+        indexes = {}
+        with batch_context as batch:
+            for index, (properties, vector) in enumerate(documents):
+                object_uuid = chunk_uuid(properties["documentId"], properties["chunkId"])
+                indexes[str(object_uuid)] = index
+                batch.add_object(properties=properties, vector=vector, uuid=object_uuid)
+
+        failed_documents = []
+        for failed_object in collection.batch.failed_objects:
+            object_uuid = failed_object.original_uuid or failed_object.object_.uuid
+            failed_documents.append((indexes[str(object_uuid)], failed_object.message))
+        return failed_documents
+
+    def delete_documents(self, collection_name: str, document_id: str):
+        self.collection(collection_name).data.delete_many(
+            where=wvc.query.Filter.by_property("documentId").equal(document_id)
         )
 
     def delete_collection(self, collection_name: str):
         self.client.collections.delete(collection_name)
+        self.__forget_collection(collection_name)
+
+        # The metadata describes the content of the collection, it is not valid anymore without the collection
+        metadata_collection = metadata_collection_name(collection_name)
+        if self.client.collections.exists(metadata_collection):
+            self.client.collections.delete(metadata_collection)
+            self.__forget_collection(metadata_collection)
+
+    def save_metadata(self, collection_name: str, key: str, value):
+        """
+        Stores a metadata value of a collection, like the content hashes of the indexed documents. The values are kept
+        as JSON in a separate collection without vectors, one object per key. The metadata collection is created when
+        the first value is stored.
+        :param collection_name: The collection the metadata belongs to.
+        :param key: The key of the value, a value stored before with the same key is replaced.
+        :param value: The value, must be JSON serializable.
+        """
+        metadata_collection = metadata_collection_name(collection_name)
+        if not self.does_collection_exist(metadata_collection):
+            self.client.collections.create(
+                name=metadata_collection,
+                properties=[
+                    wvc.config.Property(name="key", data_type=wvc.config.DataType.TEXT),
+                    # A value is only read by its key, indexing the JSON for searching or filtering is a waste
+                    wvc.config.Property(name="value", data_type=wvc.config.DataType.TEXT,
+                                        index_searchable=False, index_filterable=False),
+                ],
+                vectorizer_config=wvc.config.Configure.Vectorizer.none()
+            )
+            self.__forget_collection(metadata_collection)
+
+        replace_or_insert(self.collection(metadata_collection).data, uuid.uuid5(uuid.NAMESPACE_URL, key),
+                          {"key": key, "value": json.dumps(value)})
+
+    def load_metadata(self, collection_name: str) -> dict:
+        """
+        Returns all metadata values stored for the collection using save_metadata.
+        """
+        metadata_collection = metadata_collection_name(collection_name)
+        if not self.client.collections.exists(metadata_collection):
+            return {}
+        return {found.properties["key"]: json.loads(found.properties["value"])
+                for found in self.collection(metadata_collection).iterator()}
 
     def create_collection(self, collection_name: str, properties: list, model: str = "text-embedding-3-small"):
+        self.__forget_collection(collection_name)
         self.client.collections.create(
             name=collection_name,
             properties=properties,
@@ -85,7 +232,7 @@ class AccessWeaviate:
             print(f"Collection {collection_name} does not exist")
             raise Exception(f"Collection {collection_name} does not exist")
 
-        collection = self.client.collections.get(name=collection_name)
+        collection = self.collection(collection_name)
         return collection.query.hybrid(query=question,
                                        limit=max_results,
                                        alpha=0.5,
@@ -93,3 +240,40 @@ class AccessWeaviate:
                                        return_metadata=wvc.query.MetadataQuery(
                                            distance=True, score=True)
                                        )
+
+
+def chunk_uuid(document_id: str, chunk_id) -> uuid.UUID:
+    """
+    The id of the object of a chunk, the same chunk always gets the same id. Storing a chunk again, for example when
+    an indexing job is resumed from a checkpoint, replaces the object instead of adding a duplicate.
+    """
+    return uuid.uuid5(uuid.NAMESPACE_URL, f"{document_id}_{chunk_id}")
+
+
+def replace_or_insert(data, object_uuid: uuid.UUID, properties: dict, vector: [float] = None):
+    """
+    Replaces the object with the id, inserts a new object if it does not exist yet. Used for objects that usually
+    exist already, these take one request instead of checking first.
+    """
+    try:
+        data.replace(uuid=object_uuid, properties=properties, vector=vector)
+    except UnexpectedStatusCodeError as e:
+        if e.status_code != 404:
+            raise
+        data.insert(uuid=object_uuid, properties=properties, vector=vector)
+
+
+def metadata_collection_name(collection_name: str) -> str:
+    """
+    The name of the collection with the metadata of a collection of chunks.
+    """
+    return f"{collection_name}Metadata"
+
+
+def openai_headers(openai_api_key: str = None) -> dict:
+    """
+    The headers to pass the OpenAI key to Weaviate, used by the OpenAI vectorizer of the collections.
+    """
+    if openai_api_key:
+        return {"X-OpenAI-Api-Key": openai_api_key}
+    return {}
@@ -0,0 +1,92 @@
+import weaviate
+import weaviate.classes as wvc
+from weaviate.collections.collection import CollectionAsync
+
+from rag4p.integrations.weaviate.access_weaviate import openai_headers
+
+
+class AsyncAccessWeaviate:
+    """
+    Gives access to Weaviate using the async client, for services running in asyncio. All queries share the
+    connection of the client, so many queries can run concurrently without a thread per query. Like AccessWeaviate,
+    the handles of the collections and the collections known to exist are cached.
+
+    Use connect or the async context manager before querying:
+
+        async with AsyncAccessWeaviate.connect_to_local() as weaviate_access:
+            ...
+    """
+
+    def __init__(self, client: weaviate.WeaviateAsyncClient):
+        self.client = client
+        self.__collections = {}
+        self.__existing_collections = set()
+
+    @classmethod
+    def connect_to_weaviate_cloud(cls, url: str, access_key: str, openai_api_key: str = None):
+        print(f"Using Weaviate at {url}")
+        return cls(weaviate.use_async_with_weaviate_cloud(
+            cluster_url=url,
+            auth_credentials=weaviate.auth.AuthApiKey(access_key),
+            headers=openai_headers(openai_api_key)
+        ))
+
+    @classmethod
+    def connect_to_local(cls, host: str = "localhost", port: int = 8080, grpc_port: int = 50051,
+                         openai_api_key: str = None):
+        print(f"Using Weaviate at {host}:{port}")
+        return cls(weaviate.use_async_with_local(host=host, port=port, grpc_port=grpc_port,
+                                                 headers=openai_headers(openai_api_key)))
+
+    @classmethod
+    def connect_to_custom(cls, http_host: str, http_port: int, http_secure: bool, grpc_host: str, grpc_port: int,
+                          grpc_secure: bool, access_key: str = None, openai_api_key: str = None):
+        print(f"Using Weaviate at {http_host}:{http_port}")
+        return cls(weaviate.use_async_with_custom(
+            http_host=http_host, http_port=http_port, http_secure=http_secure,
+            grpc_host=grpc_host, grpc_port=grpc_port, grpc_secure=grpc_secure,
+            auth_credentials=weaviate.auth.AuthApiKey(access_key) if access_key else None,
+            headers=openai_headers(openai_api_key)
+        ))
+
+    async def connect(self):
+        await self.client.connect()
+
+    async def close(self):
+        await self.client.close()
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def collection(self, collection_name: str) -> CollectionAsync:
+        # Obtaining a handle does not call Weaviate, no lock is needed within the event loop
+        collection = self.__collections.get(collection_name)
+        if collection is None:
+            collection = self.client.collections.get(collection_name)
+            self.__collections[collection_name] = collection
+        return collection
+
+    async def does_collection_exist(self, collection_name: str) -> bool:
+        if collection_name in self.__existing_collections:
+            return True
+
+        exists = await self.client.collections.exists(collection_name)
+        if exists:
+            self.__existing_collections.add(collection_name)
+        else:
+            print(f"Collection {collection_name} does not exist")
+        return exists
+
+    async def delete_documents(self, collection_name: str, document_id: str):
+        await self.collection(collection_name).data.delete_many(
+            where=wvc.query.Filter.by_property("documentId").equal(document_id)
+        )
+
+    async def delete_collection(self, collection_name: str):
+        await self.client.collections.delete(collection_name)
+        self.__collections.pop(collection_name, None)
+        self.__existing_collections.discard(collection_name)
@@ -0,0 +1,55 @@
+import asyncio
+from typing import List
+
+from rag4p.integrations.weaviate import COLLECTION_NAME
+from rag4p.integrations.weaviate.async_access_weaviate import AsyncAccessWeaviate
+from rag4p.integrations.weaviate.weaviate_chunk_queries import WeaviateChunkQueries
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.relevant_chunk import RelevantChunk
+
+
+class AsyncWeaviateRetriever:
+    """
+    The async variant of the WeaviateRetriever. It runs the same queries using the async client, so an asyncio service
+    can run many queries concurrently over one connection. The embedder is synchronous, the question is embedded in
+    a thread of the default executor to keep the event loop free.
+    """
+
+    def __init__(self, weaviate_access: AsyncAccessWeaviate, embedder: Embedder, additional_properties=None,
+                 hybrid: bool = False, collection_name: str = COLLECTION_NAME, include_vector: bool = False):
+        if additional_properties is None:
+            additional_properties = []
+
+        self.weaviate_access = weaviate_access
+        self.embedder = embedder
+        self.additional_properties = additional_properties
+        self.hybrid = hybrid
+        self.collection_name = collection_name
+        self.include_vector = include_vector
+        self.queries = WeaviateChunkQueries(additional_properties, hybrid, include_vector)
+
+    async def find_relevant_chunks(self, question: str, max_results: int = 4) -> List[RelevantChunk]:
+        vector = await asyncio.get_running_loop().run_in_executor(None, self.embedder.embed, question)
+        result = await self.queries.search(self.__chunk_collection().query, question, vector, max_results)
+        return self.queries.relevant_chunks(result)
+
+    async def get_chunk_by_id(self, chunk_id: str) -> Chunk:
+        parts = chunk_id.split('_')
+        return await self.get_chunk(parts[0], int(parts[1]))
+
+    async def get_chunk(self, document_id: str, chunk_id) -> Chunk:
+        result = await self.queries.fetch_chunk(self.__chunk_collection().query, document_id, chunk_id)
+        return self.queries.first_chunk(result, document_id, chunk_id)
+
+    async def get_chunks(self, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        chunk_ids = [str(chunk_id) for chunk_id in chunk_ids]
+        result = await self.queries.fetch_chunks(self.__chunk_collection().query, document_id, chunk_ids)
+        return self.queries.ordered_chunks(result, document_id, chunk_ids)
+
+    async def loop_over_chunks(self):
+        async for chunk in self.__chunk_collection().iterator(return_properties=self.queries.return_properties()):
+            yield self.queries.chunk(chunk)
+
+    def __chunk_collection(self):
+        return self.weaviate_access.collection(self.collection_name)
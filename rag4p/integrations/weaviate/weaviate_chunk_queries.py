@@ -0,0 +1,97 @@
+from typing import List
+
+import weaviate.classes as wvc
+from weaviate.collections.classes.filters import Filter
+
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.relevant_chunk import RelevantChunk
+
+
+class WeaviateChunkQueries:
+    """
+    Creates the queries for the chunks in a Weaviate collection and converts the results into chunks. The queries are
+    started on the query object of a collection, for the synchronous client they return the result, for the async
+    client they return a coroutine. This way the WeaviateRetriever and the AsyncWeaviateRetriever share the queries.
+    """
+
+    def __init__(self, additional_properties: List[str], hybrid: bool = False, include_vector: bool = False):
+        self.additional_properties = additional_properties
+        self.hybrid = hybrid
+        self.include_vector = include_vector
+
+    def search(self, query, question: str, vector: List[float], max_results: int):
+        if self.hybrid:
+            return query.hybrid(query=question,
+                                query_properties=self.additional_properties,
+                                limit=max_results,
+                                alpha=0.5,
+                                fusion_type=wvc.query.HybridFusion.RELATIVE_SCORE,
+                                vector=vector,
+                                include_vector=self.include_vector,
+                                return_properties=self.return_properties(),
+                                return_metadata=wvc.query.MetadataQuery(distance=True, score=True))
+        return query.near_vector(near_vector=vector,
+                                 limit=max_results,
+                                 include_vector=self.include_vector,
+                                 return_properties=self.return_properties(),
+                                 return_metadata=wvc.query.MetadataQuery(distance=True))
+
+    def fetch_chunk(self, query, document_id: str, chunk_id):
+        filters = Filter.by_property("documentId").equal(document_id) & Filter.by_property("chunkId").equal(chunk_id)
+        return query.fetch_objects(limit=10, filters=filters, return_properties=self.return_properties())
+
+    def fetch_chunks(self, query, document_id: str, chunk_ids: List[str]):
+        filters = (Filter.by_property("documentId").equal(document_id)
+                   & Filter.by_property("chunkId").contains_any(chunk_ids))
+        return query.fetch_objects(limit=len(chunk_ids), filters=filters, return_properties=self.return_properties())
+
+    def return_properties(self) -> List[str]:
+        # Only fetch the properties that are used to create the chunks, not all properties of the objects
+        return ["documentId", "chunkId", "text", "totalChunks"] + self.additional_properties
+
+    def relevant_chunks(self, result) -> List[RelevantChunk]:
+        relevant_chunks = []
+        for found in result.objects:
+            score = found.metadata.score if self.hybrid else found.metadata.distance
+            relevant_chunks.append(RelevantChunk(
+                document_id=found.properties["documentId"],
+                chunk_id=found.properties["chunkId"],
+                text=found.properties["text"],
+                total_chunks=found.properties["totalChunks"],
+                properties=self.__properties(found),
+                score=score,
+                embedding=found.vector.get("default") if self.include_vector else None,
+            ))
+        return relevant_chunks
+
+    def first_chunk(self, result, document_id: str, chunk_id) -> Chunk:
+        if len(result.objects) == 0:
+            raise Exception(f"Chunk with documentId {document_id} and chunkId {chunk_id} not found")
+        return self.chunk(result.objects[0])
+
+    def ordered_chunks(self, result, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        chunks_by_id = {}
+        for found in result.objects:
+            chunk = self.chunk(found)
+            chunks_by_id[str(chunk.chunk_id)] = chunk
+
+        missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in chunks_by_id]
+        if missing:
+            raise Exception(f"Chunks with documentId {document_id} and chunkIds {missing} not found")
+
+        return [chunks_by_id[chunk_id] for chunk_id in chunk_ids]
+
+    def chunk(self, found) -> Chunk:
+        return Chunk(
+            document_id=found.properties["documentId"],
+            chunk_id=found.properties["chunkId"],
+            chunk_text=found.properties["text"],
+            total_chunks=found.properties["totalChunks"],
+            properties=self.__properties(found)
+        )
+
+    def __properties(self, found) -> dict:
+        properties = {}
+        for key in self.additional_properties:
+            properties[key] = found.properties[key]
+        return properties
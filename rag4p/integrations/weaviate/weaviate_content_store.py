@@ -8,8 +8,21 @@ from rag4p.rag.embedding.embedder import Embedder
 
 
 class WeaviateContentStore(ContentStore):
+    """
+    Stores the chunks in a Weaviate collection. The chunks are embedded in batches and written using the batch API of
+    the client, chunks that could not be embedded or stored are registered as failed chunks.
 
-    def __init__(self, weaviate_access: AccessWeaviate, embedder: Embedder, collection_name: str = COLLECTION_NAME):
+    Metadata added to the store, like the content hashes of incremental indexing, is persisted in the metadata
+    collection of the collection. A new store for the same collection continues with this metadata.
+    """
+
+    def __init__(self, weaviate_access: AccessWeaviate, embedder: Embedder, collection_name: str = COLLECTION_NAME,
+                 batch_size: int = None, concurrent_requests: int = 2, embed_batch_size: int = 100):
+        """
+        :param batch_size: The number of objects per request to Weaviate, None lets the client adjust the size.
+        :param concurrent_requests: The number of requests sent to Weaviate in parallel for a fixed batch size.
+        :param embed_batch_size: The number of chunks to embed in one call to the embedder.
+        """
         super().__init__({
             'name': 'weaviate-content-store',
             'embedder': embedder.identifier(),
@@ -18,21 +31,75 @@ class WeaviateContentStore(ContentStore):
         self.embedder = embedder
         self.weaviate_access = weaviate_access
         self.collection_name = collection_name
+        self.batch_size = batch_size
+        self.concurrent_requests = concurrent_requests
+        self.embed_batch_size = embed_batch_size
+        self.__persisted_metadata_loaded = False
+
+    def get_metadata(self):
+        self.__load_persisted_metadata()
+        return super().get_metadata()
+
+    def add_metadata(self, key: str, value):
+        self.__load_persisted_metadata()
+        super().add_metadata(key, value)
+        self.weaviate_access.save_metadata(self.collection_name, key, value)
+
+    def __load_persisted_metadata(self):
+        # Loaded on first use, creating the store does not need a connection to Weaviate
+        if self.__persisted_metadata_loaded:
+            return
+        self._metadata.update(self.weaviate_access.load_metadata(self.collection_name))
+        self.__persisted_metadata_loaded = True
 
     def store(self, chunks: List[Chunk]):
-        for chunk in chunks:
-            properties = {
-                "documentId": chunk.document_id,
-                "chunkId": chunk.chunk_id,
-                "text": chunk.chunk_text,
-                "totalChunks": len(chunks),
-            }
-
-            for key, value in chunk.properties.items():
-                properties[key] = value
-
-            self.weaviate_access.add_document(
-                collection_name=self.collection_name,
-                properties=properties,
-                vector=self.embedder.embed(chunk.chunk_text)
-            )
+        for start in range(0, len(chunks), self.embed_batch_size):
+            batch = chunks[start:start + self.embed_batch_size]
+            try:
+                embeddings = self.embed_chunks(batch)
+            except Exception as e:
+                print(f"Error embedding {len(batch)} chunks starting with {batch[0].get_id()}: {e}")
+                for chunk in batch:
+                    self._register_failed_chunk(chunk, e)
+                continue
+            self.store_embedded(batch, embeddings)
+
+    def delete_document(self, document_id: str):
+        self.weaviate_access.delete_documents(collection_name=self.collection_name, document_id=document_id)
+
+    def embed_chunks(self, chunks: List[Chunk]) -> List[List[float]]:
+        texts = [chunk.chunk_text for chunk in chunks]
+        return self._measure_embedding(texts, lambda: self.embedder.embed_batch(texts))
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        documents = [(self.__properties(chunk, chunk.total_chunks), embedding)
+                     for chunk, embedding in zip(chunks, embeddings)]
+        try:
+            with self._stage("store", len(chunks)):
+                failed_documents = self.weaviate_access.add_documents(collection_name=self.collection_name,
+                                                                      documents=documents,
+                                                                      batch_size=self.batch_size,
+                                                                      concurrent_requests=self.concurrent_requests)
+        except Exception as e:
+            print(f"Error storing {len(chunks)} chunks starting with {chunks[0].get_id()}: {e}")
+            for chunk in chunks:
+                self._register_failed_chunk(chunk, e)
+            return
+
+        for index, message in failed_documents:
+            print(f"Error storing chunk {chunks[index].get_id()}: {message}")
+            self._register_failed_chunk(chunks[index], Exception(message))
+
+    @staticmethod
+    def __properties(chunk: Chunk, total_chunks: int) -> dict:
+        properties = {
+            "documentId": chunk.document_id,
+            "chunkId": chunk.chunk_id,
+            "text": chunk.chunk_text,
+            "totalChunks": total_chunks,
+        }
+
+        for key, value in chunk.properties.items():
+            properties[key] = value
+
+        return properties
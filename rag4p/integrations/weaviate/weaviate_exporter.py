@@ -0,0 +1,113 @@
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from rag4p.integrations.weaviate.weaviate_retriever import WeaviateRetriever
+from rag4p.rag.store.local.internal_content_store import InternalContentStore
+
+_END_OF_RANGE = object()
+
+
+class WeaviateExporter:
+    """
+    Exports the chunks of a Weaviate collection, together with their vectors, into an InternalContentStore. The store
+    is a local replica for evaluations and serving without Weaviate, the chunks are not embedded again.
+
+    The cursor of Weaviate returns the objects in the order of their uuid. The exporter splits the uuid space into
+    ranges and reads each range with its own cursor in parallel, a range starts after its lower boundary and includes
+    its upper boundary. The pages are stored while the other ranges are still
+    being read, at most max_pending pages wait for the store.
+    """
+
+    def __init__(self, retriever: WeaviateRetriever, num_ranges: int = 4, page_size: int = 500, max_pending: int = 8):
+        """
+        :param retriever: The retriever for the collection to export, its embedder becomes the embedder of the store.
+        :param num_ranges: The number of uuid ranges that are read in parallel.
+        :param page_size: The number of objects per request and per batch to store.
+        :param max_pending: The maximum number of pages read but not yet stored.
+        """
+        if num_ranges < 1:
+            raise ValueError(f"The number of ranges must be at least 1, got {num_ranges}")
+
+        self.retriever = retriever
+        self.num_ranges = num_ranges
+        self.page_size = page_size
+        self.max_pending = max_pending
+
+    def export(self, path: str = None) -> InternalContentStore:
+        """
+        Exports the collection into a new InternalContentStore.
+        :param path: Optional path to write a backup of the store to, load it with InternalContentStore.load_from_backup.
+        :return: The store with the exported chunks.
+        """
+        store = InternalContentStore(self.retriever.embedder,
+                                     metadata={'exported_from': self.retriever.collection_name})
+        pages = queue.Queue(maxsize=self.max_pending)
+        boundaries = self.range_boundaries(self.num_ranges)
+
+        # Stops the readers when storing fails, otherwise they wait forever for room in the queue
+        stop_event = threading.Event()
+        num_chunks = 0
+        with ThreadPoolExecutor(max_workers=self.num_ranges, thread_name_prefix="weaviate-export") as executor:
+            futures = [executor.submit(self.__read_range, after, until, pages, stop_event)
+                       for after, until in zip(boundaries[:-1], boundaries[1:])]
+
+            try:
+                num_finished = 0
+                while num_finished < len(futures):
+                    page = pages.get()
+                    if page is _END_OF_RANGE:
+                        num_finished += 1
+                        continue
+                    chunks, vectors = page
+                    store.store_embedded(chunks, vectors)
+                    num_chunks += len(chunks)
+                    print(f"Exported {num_chunks} chunks from {self.retriever.collection_name}")
+            except BaseException:
+                stop_event.set()
+                raise
+
+            for future in futures:
+                future.result()
+
+        if path:
+            store.backup(path)
+        return store
+
+    def __read_range(self, after: Optional[str], until: Optional[str], pages: queue.Queue,
+                     stop_event: threading.Event):
+        try:
+            chunks = []
+            vectors = []
+            for chunk, vector in self.retriever.loop_over_chunks_with_vectors(after, until, self.page_size):
+                chunks.append(chunk)
+                vectors.append(vector)
+                if len(chunks) == self.page_size:
+                    if not self.__put(pages, (chunks, vectors), stop_event):
+                        return
+                    chunks, vectors = [], []
+            if chunks:
+                self.__put(pages, (chunks, vectors), stop_event)
+        finally:
+            self.__put(pages, _END_OF_RANGE, stop_event)
+
+    @staticmethod
+    def __put(pages: queue.Queue, item, stop_event: threading.Event) -> bool:
+        while not stop_event.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def range_boundaries(num_ranges: int) -> List[Optional[str]]:
+        """
+        Splits the uuid space into ranges of the same size. The first range starts at the first object, the last range
+        ends at the last object, these boundaries are None.
+        """
+        step = (1 << 128) // num_ranges
+        return [None] + [str(uuid.UUID(int=step * i)) for i in range(1, num_ranges)] + [None]
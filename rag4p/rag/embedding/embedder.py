@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 
 class Embedder(ABC):
@@ -9,6 +10,15 @@ class Embedder(ABC):
     def embed(self, text: str) -> [float]:
         pass
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embeds multiple texts, the embeddings are returned in the same order as the texts. Embedders that support
+        sending multiple texts in one request override this method.
+        :param texts: The texts to embed.
+        :return: A list with an embedding for each text.
+        """
+        return [self.embed(text) for text in texts]
+
     @abstractmethod
     def identifier(self) -> str:
         pass
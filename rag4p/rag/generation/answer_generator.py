@@ -1,4 +1,10 @@
+import asyncio
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator
+
+from rag4p.rag.generation.generation_metrics import GenerationMetrics, measure_stream
+
+_END_OF_STREAM = object()
 
 
 class AnswerGenerator(ABC):
@@ -8,3 +14,32 @@ class AnswerGenerator(ABC):
     @abstractmethod
     def generate_answer(self, question: str, context: str) -> str:
         pass
+
+    def generate_answer_stream(self, question: str, context: str,
+                               metrics: GenerationMetrics = None) -> Iterator[str]:
+        """
+        Generates the answer as a stream of deltas, the text of the answer is the concatenation of the deltas. Answer
+        generators that support streaming override this method, the default yields the complete answer at once.
+        :param question: The question to answer.
+        :param context: The context to answer the question with.
+        :param metrics: Optional metrics to record the time to the first token and the tokens per second.
+        :return: An iterator over the parts of the answer.
+        """
+        return measure_stream(self.__complete_answer(question, context), metrics)
+
+    async def generate_answer_stream_async(self, question: str, context: str,
+                                           metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        """
+        The async variant of generate_answer_stream. The default reads the synchronous stream in a thread, so the
+        event loop is not blocked while waiting for the model.
+        """
+        loop = asyncio.get_running_loop()
+        deltas = self.generate_answer_stream(question, context, metrics)
+        while True:
+            delta = await loop.run_in_executor(None, next, deltas, _END_OF_STREAM)
+            if delta is _END_OF_STREAM:
+                return
+            yield delta
+
+    def __complete_answer(self, question: str, context: str) -> Iterator[str]:
+        yield self.generate_answer(question, context)
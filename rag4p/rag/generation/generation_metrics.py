@@ -0,0 +1,106 @@
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+
+class GenerationMetrics:
+    """
+    Collects the metrics of a streamed answer: the time to the first token, the total time and the number of tokens
+    per second. The number of tokens is reported by the model when it supports that, otherwise every delta in the
+    stream counts as one token.
+    """
+
+    def __init__(self):
+        self.start_time: Optional[float] = None
+        self.first_token_time: Optional[float] = None
+        self.end_time: Optional[float] = None
+        self.num_deltas = 0
+        self.reported_tokens: Optional[int] = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+
+    def record_delta(self, delta: str):
+        if self.first_token_time is None and delta:
+            self.first_token_time = time.perf_counter()
+        self.num_deltas += 1
+
+    def report_tokens(self, num_tokens: int):
+        """
+        Sets the number of generated tokens as reported by the model.
+        """
+        self.reported_tokens = num_tokens
+
+    def finish(self):
+        self.end_time = time.perf_counter()
+
+    @property
+    def num_tokens(self) -> int:
+        return self.reported_tokens if self.reported_tokens is not None else self.num_deltas
+
+    @property
+    def time_to_first_token(self) -> Optional[float]:
+        if self.start_time is None or self.first_token_time is None:
+            return None
+        return self.first_token_time - self.start_time
+
+    @property
+    def total_time(self) -> Optional[float]:
+        if self.start_time is None or self.end_time is None:
+            return None
+        return self.end_time - self.start_time
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """
+        The speed of generating the answer after the first token, the time to the first token is not included.
+        """
+        if self.first_token_time is None or self.end_time is None or self.end_time <= self.first_token_time:
+            return None
+        return max(self.num_tokens - 1, 0) / (self.end_time - self.first_token_time)
+
+    def to_dict(self) -> dict:
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "total_time": self.total_time,
+            "num_tokens": self.num_tokens,
+            "tokens_per_second": self.tokens_per_second,
+        }
+
+    def __str__(self):
+        return (f"GenerationMetrics(time_to_first_token={self.time_to_first_token}, total_time={self.total_time}, "
+                f"num_tokens={self.num_tokens}, tokens_per_second={self.tokens_per_second})")
+
+
+def measure_stream(deltas: Iterator[str], metrics: Optional[GenerationMetrics]) -> Iterator[str]:
+    """
+    Records the metrics while the deltas are consumed. The clock starts when the first delta is requested, so the
+    time to the first token includes sending the request.
+    """
+    if metrics is None:
+        yield from deltas
+        return
+
+    metrics.start()
+    try:
+        for delta in deltas:
+            metrics.record_delta(delta)
+            yield delta
+    finally:
+        metrics.finish()
+
+
+async def measure_stream_async(deltas: AsyncIterator[str],
+                               metrics: Optional[GenerationMetrics]) -> AsyncIterator[str]:
+    """
+    The async variant of measure_stream.
+    """
+    if metrics is not None:
+        metrics.start()
+    try:
+        async for delta in deltas:
+            if metrics is not None:
+                metrics.record_delta(delta)
+            yield delta
+    finally:
+        if metrics is not None:
+            metrics.finish()
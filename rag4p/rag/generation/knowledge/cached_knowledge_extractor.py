@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+from typing import List
+
+from rag4p.rag.generation.knowledge.knowledge import Knowledge
+from rag4p.rag.generation.knowledge.knowledge_extractor import KnowledgeExtractor
+
+
+class CachedKnowledgeExtractor(KnowledgeExtractor):
+    """
+    Wraps a KnowledgeExtractor and keeps the extracted knowledge in files on disk. The key of a cached result consists
+    of the model, the prompt version and a hash of the context, so re-indexing the same text with the same extractor
+    does not call the LLM again. Each result is written to its own file, the cache can be used from multiple threads
+    and processes.
+
+    Empty results are not cached, the extractors return an empty list when the response of the LLM cannot be parsed.
+    """
+
+    def __init__(self, knowledge_extractor: KnowledgeExtractor, cache_dir: str):
+        self.knowledge_extractor = knowledge_extractor
+        self.cache_dir = cache_dir
+        self.prompt_version = knowledge_extractor.prompt_version
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def extract_knowledge(self, context: str) -> List[Knowledge]:
+        return self.extract_knowledge_batch([context], max_workers=1)[0]
+
+    def extract_knowledge_batch(self, contexts: List[str], max_workers: int = 4) -> List[List[Knowledge]]:
+        """
+        Returns the cached knowledge for the contexts that were extracted before, the other contexts are extracted
+        concurrently by the wrapped extractor. Duplicate contexts are extracted once.
+        """
+        results = [self.__read(context) for context in contexts]
+        missing = list(dict.fromkeys(context for context, result in zip(contexts, results) if result is None))
+        if not missing:
+            return results
+
+        extracted = dict(zip(missing, self.knowledge_extractor.extract_knowledge_batch(missing, max_workers)))
+        for context, knowledge in extracted.items():
+            if knowledge:
+                self.__write(context, knowledge)
+
+        return [result if result is not None else extracted[context] for context, result in zip(contexts, results)]
+
+    def cache_key(self, context: str) -> str:
+        text_hash = hashlib.sha256(context.encode("utf-8")).hexdigest()
+        key = json.dumps([self.knowledge_extractor.model_name(), self.prompt_version, text_hash])
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def model_name(self) -> str:
+        return self.knowledge_extractor.model_name()
+
+    def configuration(self) -> dict:
+        return self.knowledge_extractor.configuration()
+
+    def __cache_file(self, context: str) -> str:
+        key = self.cache_key(context)
+        # Spread the files over sub directories, large directories are slow on some file systems
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def __read(self, context: str):
+        cache_file = self.__cache_file(context)
+        if not os.path.exists(cache_file):
+            return None
+        with open(cache_file, 'r') as f:
+            return [Knowledge(item["subject"], item["description"]) for item in json.load(f)]
+
+    def __write(self, context: str, knowledge: List[Knowledge]):
+        cache_file = self.__cache_file(context)
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        # Write to a temporary file first, other processes never read a partial file
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump([{"subject": item.subject, "description": item.description} for item in knowledge], f)
+        os.replace(tmp_file, cache_file)
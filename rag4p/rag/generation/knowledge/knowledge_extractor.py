@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from rag4p.rag.generation.knowledge.knowledge import Knowledge
@@ -8,6 +9,36 @@ class KnowledgeExtractor(ABC):
     """
     Abstract class for extracting knowledge from a context.
     """
+    # Change the version when the prompt changes, it is part of the configuration and of the key of cached results
+    prompt_version = "1"
+
     @abstractmethod
     def extract_knowledge(self, context: str) -> List[Knowledge]:
         pass
+
+    def extract_knowledge_batch(self, contexts: List[str], max_workers: int = 4) -> List[List[Knowledge]]:
+        """
+        Extracts the knowledge from multiple contexts concurrently. Extracting knowledge mostly waits for the LLM, so
+        at most max_workers contexts are handled at the same time using threads.
+        :param contexts: The contexts to extract knowledge from.
+        :param max_workers: The maximum number of concurrent calls to the LLM.
+        :return: The knowledge for each context, in the same order as the contexts.
+        """
+        if len(contexts) <= 1 or max_workers <= 1:
+            return [self.extract_knowledge(context) for context in contexts]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(contexts))) as executor:
+            return list(executor.map(self.extract_knowledge, contexts))
+
+    def model_name(self) -> str:
+        """
+        The name of the model used to extract the knowledge.
+        """
+        return ""
+
+    def configuration(self) -> dict:
+        return {
+            "name": self.__class__.__name__,
+            "model": self.model_name(),
+            "prompt_version": self.prompt_version,
+        }
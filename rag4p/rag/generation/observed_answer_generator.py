@@ -1,4 +1,7 @@
+from typing import AsyncIterator, Iterator
+
 from rag4p.rag.generation.answer_generator import AnswerGenerator
+from rag4p.rag.generation.generation_metrics import GenerationMetrics
 from rag4p.rag.tracker.rag_tracker import global_data
 
 
@@ -8,7 +11,28 @@ class ObservedAnswerGenerator(AnswerGenerator):
 
     def generate_answer(self, question: str, context: str) -> str:
         answer = self.answer_generator.generate_answer(question, context)
+        self.__observe(question, context, answer)
+        return answer
+
+    def generate_answer_stream(self, question: str, context: str,
+                               metrics: GenerationMetrics = None) -> Iterator[str]:
+        # The answer is observed once the stream is complete
+        deltas = []
+        for delta in self.answer_generator.generate_answer_stream(question, context, metrics):
+            deltas.append(delta)
+            yield delta
+        self.__observe(question, context, "".join(deltas))
+
+    async def generate_answer_stream_async(self, question: str, context: str,
+                                           metrics: GenerationMetrics = None) -> AsyncIterator[str]:
+        deltas = []
+        async for delta in self.answer_generator.generate_answer_stream_async(question, context, metrics):
+            deltas.append(delta)
+            yield delta
+        self.__observe(question, context, "".join(deltas))
+
+    @staticmethod
+    def __observe(question: str, context: str, answer: str):
         global_data["observer"].question = question
         global_data["observer"].context = context
         global_data["observer"].answer = answer
-        return answer
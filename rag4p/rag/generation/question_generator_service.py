@@ -1,36 +1,131 @@
 import csv
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from random import Random
 
 from rag4p.rag.generation.question_generator import QuestionGenerator
 from rag4p.rag.retrieval.retriever import Retriever
 
 
 class QuestionGeneratorService:
+    """
+    Generates a question for the chunks of a retriever and writes the chunks with their question to a CSV file. The
+    questions are generated by multiple workers, the rows are written in the order of the chunks and flushed regularly.
+    With resume, the chunks that are already in the file are skipped, so a crashed run continues where it stopped.
+    """
 
     def __init__(self, retriever: Retriever, question_generator: QuestionGenerator):
         self.retriever = retriever
         self.question_generator = question_generator
 
-    def generate_question_answer_pairs(self, file_name: str):
-        directory = os.getcwd()  # get current working directory
-        file_path = os.path.join(directory, "./data", file_name)
+    def generate_question_answer_pairs(self, file_name: str, output_dir: str = "./data", max_workers: int = 1,
+                                       flush_every: int = 10, resume: bool = False, sample_size: int = None,
+                                       seed: int = 42) -> int:
+        """
+        :param file_name: The name of the CSV file.
+        :param output_dir: The directory for the file, relative to the current working directory.
+        :param max_workers: The number of questions generated concurrently.
+        :param flush_every: Flush the file after this number of rows.
+        :param resume: Append to an existing file and skip the chunks that are already in it.
+        :param sample_size: Generate questions for a random sample of this number of chunks, None uses all chunks.
+        :param seed: The seed for the sample, resuming with the same seed continues with the same sample.
+        :return: The number of generated questions.
+        """
+        file_path = os.path.join(os.getcwd(), output_dir, file_name)
         print(file_path)
+
+        done = self.__read_done_chunks(file_path) if resume else set()
+        chunks = self.retriever.loop_over_chunks()
+        if sample_size is not None:
+            chunks = self.__sample(chunks, sample_size, seed)
+        chunks = (chunk for chunk in chunks if (chunk.document_id, str(chunk.chunk_id)) not in done)
+
+        append = resume and os.path.exists(file_path) and os.path.getsize(file_path) > 0
+        num_questions = 0
         try:
-            with open(file_path, 'w', newline='', encoding='utf-8') as file:
+            with open(file_path, 'a' if append else 'w', newline='', encoding='utf-8') as file, \
+                    ThreadPoolExecutor(max_workers=max_workers) as executor:
                 writer = csv.writer(file)
-                writer.writerow(["document", "chunk", "text", "question"])
-                for chunk in self.retriever.loop_over_chunks():
-                    # Use LLM to generate a question for this chunk
-                    question = self.generate_question(chunk.chunk_text)
-
-                    # Write the question and answer to a file
-                    document_id = chunk.document_id
-                    chunk_id = str(chunk.chunk_id)
-                    writer.writerow([document_id, chunk_id, chunk.chunk_text, question])
-                    print(f"Generated question: {question}")
+                if not append:
+                    writer.writerow(["document", "chunk", "text", "question"])
+
+                # Keep a limited number of questions in progress, the oldest is written first to keep the order
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, executor.submit(self.generate_question, chunk.chunk_text)))
+                    if len(pending) >= 2 * max_workers:
+                        self.__write_row(writer, *pending.popleft())
+                        num_questions += 1
+                        if num_questions % flush_every == 0:
+                            file.flush()
+                while pending:
+                    self.__write_row(writer, *pending.popleft())
+                    num_questions += 1
+                    if num_questions % flush_every == 0:
+                        file.flush()
         except IOError as e:
             print("An error occurred while writing to the file.", e)
             raise
+        return num_questions
+
+    @staticmethod
+    def __write_row(writer, chunk, future):
+        question = future.result()
+        writer.writerow([chunk.document_id, str(chunk.chunk_id), chunk.chunk_text, question])
+        print(f"Generated question: {question}")
+
+    @staticmethod
+    def __read_done_chunks(file_path: str) -> set:
+        """
+        Reads the chunks of the complete rows in an existing file. A crash can leave the last row partly written, the
+        file is truncated after the last complete row so the question of that chunk is generated again.
+        """
+        if not os.path.exists(file_path):
+            return set()
+        with open(file_path, 'rb') as file:
+            content = file.read()
+
+        # The number of bytes of the lines the csv reader consumed, a row is complete when its last line ends
+        position = 0
+
+        def lines():
+            nonlocal position
+            for line in content.splitlines(keepends=True):
+                position += len(line)
+                yield line.decode('utf-8', errors='replace')
+
+        done = set()
+        complete_size = 0
+        for row_nr, row in enumerate(csv.reader(lines())):
+            if len(row) != 4 or content[position - 1:position] != b"\n":
+                break
+            if row_nr > 0:
+                done.add((row[0], row[1]))
+            complete_size = position
+
+        if complete_size < len(content):
+            print(f"Removing the incomplete last row from {file_path}")
+            with open(file_path, 'r+b') as file:
+                file.truncate(complete_size)
+        return done
+
+    @staticmethod
+    def __sample(chunks, sample_size: int, seed: int) -> list:
+        """
+        Selects a random sample of the chunks in one pass using reservoir sampling, the sample keeps the order of the
+        chunks.
+        """
+        random = Random(seed)
+        reservoir = []
+        for index, chunk in enumerate(chunks):
+            if index < sample_size:
+                reservoir.append((index, chunk))
+            else:
+                position = random.randint(0, index)
+                if position < sample_size:
+                    reservoir[position] = (index, chunk)
+        return [chunk for _, chunk in sorted(reservoir, key=lambda item: item[0])]
 
     def generate_question(self, context: str) -> str:
         """
@@ -1,4 +1,13 @@
-class Chunk:
+from rag4p.util.slotted_state import SlottedState, intern_id
+
+
+class Chunk(SlottedState):
+    """
+    A part of a document that is embedded and stored. Chunks use slots, and the document id is interned, to limit the
+    memory used by stores with a lot of chunks.
+    """
+    __slots__ = ("document_id", "chunk_id", "total_chunks", "chunk_text", "properties")
+
     document_id: str
     chunk_id: str
     total_chunks: int
@@ -6,7 +15,7 @@ class Chunk:
     properties: {}
 
     def __init__(self, document_id: str, chunk_id: str, total_chunks: int, chunk_text: str, properties: dict):
-        self.document_id = document_id
+        self.document_id = intern_id(document_id)
         self.chunk_id = chunk_id
         self.total_chunks = total_chunks
         self.chunk_text = chunk_text
@@ -1,9 +1,15 @@
+from typing import List, Optional
+
 from rag4p.rag.model.chunk import Chunk
 
 
 class RelevantChunk (Chunk):
+    __slots__ = ("score", "embedding")
+
     score: float
+    embedding: Optional[List[float]]
 
-    def __init__(self, document_id, chunk_id, total_chunks, text, properties, score):
+    def __init__(self, document_id, chunk_id, total_chunks, text, properties, score, embedding=None):
         super().__init__(document_id, chunk_id, total_chunks, text, properties)
         self.score = score
+        self.embedding = embedding
@@ -0,0 +1,45 @@
+from rag4p.rag.model.chunk import Chunk
+from rag4p.util.slotted_state import intern_id
+
+
+class SpanChunk(Chunk):
+    """
+    A chunk that refers to a part of the text of the document instead of holding a copy of it. All chunks of a document,
+    also the chunks of nested splitters in a SplitterChain, share the same document text. The chunk_text is created
+    from the start and end offsets every time it is requested.
+    """
+    __slots__ = ("document_text", "start", "end")
+
+    document_text: str
+    start: int
+    end: int
+
+    def __init__(self, document_id: str, chunk_id: str, total_chunks: int, document_text: str, start: int, end: int,
+                 properties: dict):
+        self.document_id = intern_id(document_id)
+        self.chunk_id = chunk_id
+        self.total_chunks = total_chunks
+        self.document_text = document_text
+        self.start = start
+        self.end = end
+        self.properties = properties
+
+    @property
+    def chunk_text(self) -> str:
+        return self.document_text[self.start:self.end]
+
+    @staticmethod
+    def text_span(document_text: str, parent_chunk: Chunk = None) -> (str, int, int):
+        """
+        Determines the text to split and the part of it to use. For a SpanChunk parent, this is the span of the parent
+        in the shared document text, for other parents it is the complete text of the parent.
+        :param document_text: The text of the document, used when there is no parent chunk.
+        :param parent_chunk: The chunk that is split further, optional.
+        :return: The text, the start offset and the end offset.
+        """
+        if parent_chunk is None:
+            return document_text, 0, len(document_text)
+        if isinstance(parent_chunk, SpanChunk):
+            return parent_chunk.document_text, parent_chunk.start, parent_chunk.end
+        text = parent_chunk.chunk_text
+        return text, 0, len(text)
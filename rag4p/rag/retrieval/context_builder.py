@@ -0,0 +1,129 @@
+import re
+from typing import Callable, List, Optional
+
+import tiktoken
+from tokenizers import Tokenizer
+
+from rag4p.integrations.ollama.ollama_tokenizer import tokenizer_for_model
+from rag4p.rag.retrieval.retrieval_output import RetrievalOutput, RetrievalOutputItem
+from rag4p.integrations.openai import PROVIDER as OPENAI_PROVIDER
+from rag4p.integrations.ollama import PROVIDER as OLLAMA_PROVIDER
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+# Joins the sentences and the items of the context
+SEPARATOR = " "
+
+
+class Context:
+    """
+    The context created by the ContextBuilder, with the numbers of the used and dropped tokens.
+    """
+
+    def __init__(self, text: str, items: List[RetrievalOutputItem], num_tokens: int, num_dropped_tokens: int,
+                 num_truncated_items: int, num_dropped_items: int):
+        self.text = text
+        self.items = items
+        self.num_tokens = num_tokens
+        self.num_dropped_tokens = num_dropped_tokens
+        self.num_truncated_items = num_truncated_items
+        self.num_dropped_items = num_dropped_items
+
+    def __str__(self):
+        return (f"Context(num_tokens={self.num_tokens}, num_dropped_tokens={self.num_dropped_tokens}, "
+                f"num_items={len(self.items)}, num_truncated_items={self.num_truncated_items}, "
+                f"num_dropped_items={self.num_dropped_items})")
+
+
+class ContextBuilder:
+    """
+    Creates the context for the LLM from a RetrievalOutput without exceeding a budget of tokens. The items are added
+    sentence by sentence in order of relevance, sentences that are already in the context are skipped. An item is
+    truncated before its first sentence that does not fit. The next items are still tried, so short sentences of less
+    relevant items can use the rest of the budget. Items that add no sentence, because none fits or all are already in
+    the context, are dropped. The separators between the sentences count towards the budget.
+
+    The items are in order of relevance as returned by the retrieval strategy. Set higher_score_is_better to sort the
+    items by their score instead, True for similarity scores and False for distances.
+    """
+
+    def __init__(self, max_tokens: int, count_tokens: Callable[[str], int],
+                 higher_score_is_better: Optional[bool] = None):
+        """
+        :param max_tokens: The maximum number of tokens in the context.
+        :param count_tokens: Function returning the number of tokens in a text, see token_counter_for_model.
+        :param higher_score_is_better: Sort the items by score, None keeps the order of the items.
+        """
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.higher_score_is_better = higher_score_is_better
+
+    @classmethod
+    def for_model(cls, max_tokens: int, provider: str, model: str, higher_score_is_better: Optional[bool] = None):
+        """
+        Creates a ContextBuilder that counts tokens with the tokenizer of the model, like the MaxTokenSplitter.
+        """
+        return cls(max_tokens, token_counter_for_model(provider, model), higher_score_is_better)
+
+    def build(self, retrieval_output: RetrievalOutput) -> Context:
+        items = self.__ordered_items(retrieval_output.items)
+        separator_tokens = self.count_tokens(SEPARATOR)
+
+        seen_sentences = set()
+        packed_items = []
+        num_tokens = 0
+        num_dropped_tokens = 0
+        num_truncated_items = 0
+        num_dropped_items = 0
+        for item in items:
+            sentences = []
+            truncated = False
+            for sentence in SENTENCE_BOUNDARY.split(item.text.strip()):
+                key = " ".join(sentence.lower().split())
+                if not key or key in seen_sentences:
+                    continue
+                sentence_tokens = self.count_tokens(sentence)
+                # Every sentence after the first one in the context is preceded by a separator
+                needed_tokens = sentence_tokens + separator_tokens if seen_sentences else sentence_tokens
+                if truncated or num_tokens + needed_tokens > self.max_tokens:
+                    # Skip the rest of the item, later items with shorter sentences are still considered
+                    truncated = True
+                    num_dropped_tokens += sentence_tokens
+                    continue
+                seen_sentences.add(key)
+                sentences.append(sentence)
+                num_tokens += needed_tokens
+
+            if not sentences:
+                num_dropped_items += 1
+                continue
+            if truncated:
+                num_truncated_items += 1
+            packed_items.append(RetrievalOutputItem(document_id=item.document_id,
+                                                    chunk_id=item.chunk_id,
+                                                    text=SEPARATOR.join(sentences),
+                                                    score=item.score))
+
+        return Context(text=SEPARATOR.join(item.text for item in packed_items),
+                       items=packed_items,
+                       num_tokens=num_tokens,
+                       num_dropped_tokens=num_dropped_tokens,
+                       num_truncated_items=num_truncated_items,
+                       num_dropped_items=num_dropped_items)
+
+    def __ordered_items(self, items: List[RetrievalOutputItem]) -> List[RetrievalOutputItem]:
+        if self.higher_score_is_better is None or any(item.score is None for item in items):
+            return items
+        return sorted(items, key=lambda item: item.score, reverse=self.higher_score_is_better)
+
+
+def token_counter_for_model(provider: str, model: str) -> Callable[[str], int]:
+    """
+    Returns a function that counts the tokens of a text using the tokenizer of the model.
+    """
+    if provider == OPENAI_PROVIDER:
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text))
+    if provider == OLLAMA_PROVIDER:
+        tokenizer = Tokenizer.from_pretrained(tokenizer_for_model(model))
+        return lambda text: len(tokenizer.encode(text).ids)
+    raise ValueError(f"Unsupported provider: {provider}")
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import List, Optional
+
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.relevant_chunk import RelevantChunk
+from rag4p.rag.retrieval.retriever import Retriever
+
+RECIPROCAL_RANK_FUSION = "rrf"
+SCORE_FUSION = "score"
+
+
+class FederatedBackend:
+    """
+    A retriever that is part of a FederatedRetriever. The scores of retrievers are not comparable, the
+    InternalContentStore returns a euclidean distance, the WeaviateRetriever a cosine distance or a hybrid score. Use
+    higher_score_is_better to tell if the score is a similarity (True) or a distance (False).
+    """
+
+    def __init__(self, name: str, retriever: Retriever, higher_score_is_better: bool = False, timeout: float = 5.0,
+                 weight: float = 1.0, max_in_flight: int = 2):
+        """
+        :param name: The name of the backend, used in the logging.
+        :param retriever: The retriever to query.
+        :param higher_score_is_better: True if the retriever returns similarities, False for distances.
+        :param timeout: The number of seconds to wait for the results of this retriever.
+        :param weight: The weight of the results of this retriever in the fusion.
+        :param max_in_flight: The maximum number of unfinished calls to this retriever, including calls that timed out.
+        """
+        if max_in_flight < 1:
+            raise ValueError(f"The maximum number of calls in flight must be at least 1, got {max_in_flight}")
+
+        self.name = name
+        self.retriever = retriever
+        self.higher_score_is_better = higher_score_is_better
+        self.timeout = timeout
+        self.weight = weight
+        self.max_in_flight = max_in_flight
+
+
+class FederatedRetriever(Retriever):
+    """
+    Sends a question to multiple retrievers in parallel and merges the results into one list. Each backend has its own
+    timeout, a backend that is too slow or fails is left out of the results instead of delaying the answer.
+
+    Every backend has its own threads, a call that timed out keeps its thread until the retriever returns. A backend
+    with max_in_flight unfinished calls is saturated, it is skipped until one of its calls finishes. A hanging backend
+    therefore never delays the calls to the other backends.
+
+    The results are merged using reciprocal rank fusion, or using the scores of the backends normalised to a value
+    between 0 and 1 per backend. A chunk returned by multiple backends gets the sum of its scores. The score of the
+    returned chunks is the fused score, a higher score is better.
+    """
+
+    def __init__(self, backends: List[FederatedBackend], fusion: str = RECIPROCAL_RANK_FUSION, rrf_k: int = 60,
+                 max_documents: int = 10000):
+        """
+        :param backends: The retrievers to query.
+        :param fusion: The fusion method, RECIPROCAL_RANK_FUSION or SCORE_FUSION.
+        :param rrf_k: The constant for the reciprocal rank fusion, higher values reduce the impact of the top ranks.
+        :param max_documents: The number of recently returned documents for which the backend is remembered.
+        """
+        if not backends:
+            raise ValueError("A FederatedRetriever needs at least one backend")
+        if fusion not in (RECIPROCAL_RANK_FUSION, SCORE_FUSION):
+            raise ValueError(f"Unsupported fusion: {fusion}")
+
+        self.backends = backends
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.max_documents = max_documents
+        self.__executors = [ThreadPoolExecutor(max_workers=backend.max_in_flight,
+                                               thread_name_prefix=f"federated-retriever-{backend.name}")
+                            for backend in backends]
+        self.__in_flight = [0] * len(backends)
+        self.__lock = threading.Lock()
+        # The backend that most recently returned a document, used to fetch the other chunks of the document
+        self.__document_backends = OrderedDict()
+
+    def find_relevant_chunks(self, question: str, max_results: int = 4) -> [RelevantChunk]:
+        start = time.monotonic()
+        futures = []
+        for index, backend in enumerate(self.backends):
+            future = self.__submit(index, question, max_results)
+            if future is None:
+                print(f"Retriever {backend.name} has {backend.max_in_flight} unfinished calls, skipping it")
+                continue
+            futures.append((backend, future))
+
+        fused_scores = {}
+        fused_chunks = {}
+        for backend, future in futures:
+            try:
+                relevant_chunks = future.result(timeout=max(0.0, start + backend.timeout - time.monotonic()))
+            except TimeoutError:
+                print(f"Retriever {backend.name} did not answer within {backend.timeout} seconds, skipping it")
+                future.cancel()
+                continue
+            except Exception as e:
+                print(f"Retriever {backend.name} failed, skipping it: {e}")
+                continue
+
+            for relevant_chunk, score in zip(relevant_chunks, self.__fusion_scores(backend, relevant_chunks)):
+                key = relevant_chunk.get_id()
+                fused_scores[key] = fused_scores.get(key, 0.0) + backend.weight * score
+                if key not in fused_chunks:
+                    fused_chunks[key] = relevant_chunk
+                    self.__remember_backend(relevant_chunk.document_id, backend)
+
+        best_keys = sorted(fused_scores, key=fused_scores.get, reverse=True)[:max_results]
+        return [RelevantChunk(document_id=fused_chunks[key].document_id,
+                              chunk_id=fused_chunks[key].chunk_id,
+                              total_chunks=fused_chunks[key].total_chunks,
+                              text=fused_chunks[key].chunk_text,
+                              properties=fused_chunks[key].properties,
+                              score=fused_scores[key],
+                              embedding=fused_chunks[key].embedding) for key in best_keys]
+
+    def __submit(self, index: int, question: str, max_results: int):
+        """
+        Starts the call to the backend, unless the backend is saturated.
+        :return: The future of the call, or None if the backend already has max_in_flight unfinished calls.
+        """
+        with self.__lock:
+            if self.__in_flight[index] >= self.backends[index].max_in_flight:
+                return None
+            self.__in_flight[index] += 1
+
+        future = self.__executors[index].submit(self.backends[index].retriever.find_relevant_chunks, question,
+                                                max_results)
+        future.add_done_callback(lambda _: self.__call_finished(index))
+        return future
+
+    def __call_finished(self, index: int):
+        with self.__lock:
+            self.__in_flight[index] -= 1
+
+    def __remember_backend(self, document_id: str, backend: FederatedBackend):
+        with self.__lock:
+            self.__document_backends[document_id] = backend
+            self.__document_backends.move_to_end(document_id)
+            while len(self.__document_backends) > self.max_documents:
+                self.__document_backends.popitem(last=False)
+
+    def __fusion_scores(self, backend: FederatedBackend, relevant_chunks: List[RelevantChunk]) -> List[float]:
+        if self.fusion == RECIPROCAL_RANK_FUSION:
+            return [1.0 / (self.rrf_k + rank) for rank in range(1, len(relevant_chunks) + 1)]
+
+        scores = [relevant_chunk.score for relevant_chunk in relevant_chunks]
+        if not scores:
+            return []
+        lowest = min(scores)
+        highest = max(scores)
+        if highest == lowest:
+            return [1.0] * len(scores)
+        if backend.higher_score_is_better:
+            return [(score - lowest) / (highest - lowest) for score in scores]
+        return [(highest - score) / (highest - lowest) for score in scores]
+
+    def get_chunk_by_id(self, chunk_id: str) -> Chunk:
+        document_id = chunk_id.rsplit("_", 1)[0]
+        return self.__first_found(document_id, lambda retriever: retriever.get_chunk_by_id(chunk_id))
+
+    def get_chunk(self, document_id: str, chunk_id: str) -> Chunk:
+        return self.__first_found(document_id, lambda retriever: retriever.get_chunk(document_id, chunk_id))
+
+    def get_chunks(self, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        return self.__first_found(document_id, lambda retriever: retriever.get_chunks(document_id, chunk_ids))
+
+    def get_document_text(self, document_id: str) -> Optional[str]:
+        for backend in self.__backends_for(document_id):
+            text = backend.retriever.get_document_text(document_id)
+            if text is not None:
+                return text
+        return None
+
+    def content_version(self) -> Optional[int]:
+        versions = [backend.retriever.content_version() for backend in self.backends]
+        if any(version is None for version in versions):
+            return None
+        return sum(versions)
+
+    def loop_over_chunks(self):
+        for backend in self.backends:
+            yield from backend.retriever.loop_over_chunks()
+
+    def close(self):
+        for executor in self.__executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __first_found(self, document_id: str, get):
+        error = None
+        for backend in self.__backends_for(document_id):
+            try:
+                found = get(backend.retriever)
+                if found is not None:
+                    return found
+            except Exception as e:
+                error = e
+        if error is not None:
+            raise error
+        return None
+
+    def __backends_for(self, document_id: str) -> List[FederatedBackend]:
+        with self.__lock:
+            owner = self.__document_backends.get(document_id)
+        if owner is None:
+            return self.backends
+        return [owner] + [backend for backend in self.backends if backend is not owner]
@@ -1,3 +1,5 @@
+from typing import List, Optional
+
 from rag4p.rag.model.chunk import Chunk
 from rag4p.rag.model.relevant_chunk import RelevantChunk
 from rag4p.rag.retrieval.retriever import Retriever
@@ -18,5 +20,17 @@ class ObservedRetriever(Retriever):
         chunk = self.retriever.get_chunk(document_id, chunk_id)
         return chunk
 
+    def get_chunks(self, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        return self.retriever.get_chunks(document_id, chunk_ids)
+
+    def get_chunk_by_id(self, chunk_id: str) -> Chunk:
+        return self.retriever.get_chunk_by_id(chunk_id)
+
+    def get_document_text(self, document_id: str) -> Optional[str]:
+        return self.retriever.get_document_text(document_id)
+
+    def content_version(self) -> Optional[int]:
+        return self.retriever.content_version()
+
     def loop_over_chunks(self):
         yield from self.retriever.loop_over_chunks()
\ No newline at end of file
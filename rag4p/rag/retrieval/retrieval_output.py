@@ -1,17 +1,23 @@
-from typing import List
+from typing import List, Optional
 
+from rag4p.util.slotted_state import SlottedState, intern_id
+
+
+class RetrievalOutputItem(SlottedState):
+    __slots__ = ("document_id", "chunk_id", "text", "score", "embedding")
 
-class RetrievalOutputItem:
     document_id: str
     chunk_id: int
     text: str
+    score: float
+    embedding: Optional[List[float]]
 
-    def __init__(self, document_id, chunk_id, text):
-        self.document_id = document_id
+    def __init__(self, document_id, chunk_id, text, score: float = None, embedding: List[float] = None):
+        self.document_id = intern_id(document_id)
         self.chunk_id = chunk_id
         self.text = text
-
-    pass
+        self.score = score
+        self.embedding = embedding
 
 
 class RetrievalOutput:
@@ -20,6 +26,12 @@ class RetrievalOutput:
     def __init__(self, items):
         self.items = items
 
-    def construct_context(self):
+    def construct_context(self, context_builder=None):
+        """
+        Combines the texts of the items into the context for the LLM.
+        :param context_builder: Optional ContextBuilder that limits the context to a number of tokens.
+        """
+        if context_builder is not None:
+            return context_builder.build(self).text
         return ' '.join(item.text for item in self.items)
 
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
 
 from rag4p.rag.model.chunk import Chunk
 from rag4p.rag.model.relevant_chunk import RelevantChunk
@@ -18,6 +19,30 @@ class Retriever(ABC):
     def get_chunk(self, document_id: str, chunk_id: str) -> Chunk:
         return self.get_chunk_by_id(document_id + "_" + str(chunk_id))
 
+    def get_chunks(self, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        """
+        Obtains multiple chunks of one document. Retrievers that can fetch the chunks in one call override this method,
+        the default gets the chunks one by one.
+        :param document_id: The id of the document the chunks belong to.
+        :param chunk_ids: The ids of the chunks within the document.
+        :return: The chunks in the order of the provided chunk ids.
+        """
+        return [self.get_chunk(document_id, chunk_id) for chunk_id in chunk_ids]
+
+    def get_document_text(self, document_id: str) -> Optional[str]:
+        """
+        Obtains the complete text of a document if the retriever stored it during indexing.
+        :return: The text of the document, or None if the retriever does not have the text.
+        """
+        return None
+
+    def content_version(self) -> Optional[int]:
+        """
+        A number that changes every time the content of the retriever changes, used to invalidate caches. Retrievers
+        that cannot detect changes return None.
+        """
+        return None
+
     @abstractmethod
     def get_chunk_by_id(self, chunk_id: str) -> Chunk:
         pass
@@ -1,3 +1,6 @@
+import threading
+from collections import OrderedDict
+
 from rag4p.rag.retrieval.retrieval_strategy import RetrievalStrategy
 from rag4p.rag.retrieval.retriever import Retriever
 from rag4p.rag.retrieval.retrieval_output import RetrievalOutput, RetrievalOutputItem
@@ -16,12 +19,25 @@ class DocumentRetrievalStrategy(RetrievalStrategy):
     author of the blog post. Using this context, the LLM can find the author of the specific found blog post.
 
     When the chunks are created using a chain of splitters, the complete document is retrieved by combining all chunks
-    from the highest level of the chain.
+    from the highest level of the chain. The chunks of a document are fetched in one call to the retriever, unless the
+    retriever has the text of the document stored during indexing.
+
+    The texts of the last cache_size documents are kept in a cache. The cache is cleared when the content version of
+    the retriever changes. Retrievers that do not have a content version never invalidate the cache, use clear_cache
+    after changing their content.
     """
 
-    def __init__(self, retriever: Retriever, observe: bool = False):
+    def __init__(self, retriever: Retriever, observe: bool = False, cache_size: int = 128):
         self.retriever = retriever
         self.observe = observe
+        self.cache_size = cache_size
+        self.__cache = OrderedDict()
+        self.__cache_version = None
+        self.__cache_lock = threading.Lock()
+
+    def clear_cache(self):
+        with self.__cache_lock:
+            self.__cache.clear()
 
     def retrieve_max_results(self, question, max_results) -> RetrievalOutput:
         relevant_chunks = self.retriever.find_relevant_chunks(question, max_results)
@@ -39,10 +55,12 @@ class DocumentRetrievalStrategy(RetrievalStrategy):
         unique_docs = self.__unique_documents_from_chunks(relevant_chunks)
 
         for relevant_chunk in unique_docs:
+            score = relevant_chunk.score
             # for a chunk that is not of the first splitter level, we need to obtain the parent chunk that is of the
             # first splitter level
             if len(relevant_chunk.chunk_id.split("_")) > 1:
-                relevant_chunk = self.retriever.get_chunk(relevant_chunk.document_id, relevant_chunk.chunk_id.split("_")[0])
+                relevant_chunk = self.retriever.get_chunks(relevant_chunk.document_id,
+                                                           [relevant_chunk.chunk_id.split("_")[0]])[0]
 
             overall_text = self.__read_text_from_all_chunks_for_document(relevant_chunk.document_id,
                                                                          relevant_chunk.total_chunks)
@@ -53,7 +71,8 @@ class DocumentRetrievalStrategy(RetrievalStrategy):
 
             relevant_item = RetrievalOutputItem(document_id=relevant_chunk.document_id,
                                                 chunk_id=relevant_chunk.chunk_id,
-                                                text=overall_text)
+                                                text=overall_text,
+                                                score=score)
             retrieval_output_items.append(relevant_item)
 
             if observe:
@@ -70,12 +89,34 @@ class DocumentRetrievalStrategy(RetrievalStrategy):
         :param total_chunks: Total amount of chunks in the document.
         :return: The complete text of all chunks combined.
         """
-        chunk_ids = range(0, total_chunks)
-        overall_text = ""
-        for chunk_id in chunk_ids:
-            chunk = self.retriever.get_chunk(document_id, str(chunk_id))
-            overall_text += chunk.chunk_text + " "
-        return overall_text
+        if self.cache_size <= 0:
+            return self.__assemble_document_text(document_id, total_chunks)
+
+        content_version = self.retriever.content_version()
+        with self.__cache_lock:
+            if content_version != self.__cache_version:
+                self.__cache.clear()
+                self.__cache_version = content_version
+            text = self.__cache.get(document_id)
+            if text is not None:
+                self.__cache.move_to_end(document_id)
+                return text
+
+        text = self.__assemble_document_text(document_id, total_chunks)
+        with self.__cache_lock:
+            if content_version == self.__cache_version:
+                self.__cache[document_id] = text
+                if len(self.__cache) > self.cache_size:
+                    self.__cache.popitem(last=False)
+        return text
+
+    def __assemble_document_text(self, document_id, total_chunks):
+        text = self.retriever.get_document_text(document_id)
+        if text is not None:
+            return text
+
+        chunks = self.retriever.get_chunks(document_id, [str(chunk_id) for chunk_id in range(total_chunks)])
+        return "".join(chunk.chunk_text + " " for chunk in chunks)
 
     @staticmethod
     def __unique_documents_from_chunks(relevant_chunks):
@@ -37,25 +37,34 @@ class HierarchicalRetrievalStrategy(RetrievalStrategy):
         return self.__extract_hierarchy_for_chunks(relevant_chunks, observe=True)
 
     def __extract_hierarchy_for_chunks(self, relevant_chunks: [RelevantChunk], observe: bool = False) -> RetrievalOutput:
-        retrieval_output_items = []
-        used_chunk_ids = set()
-
+        # Select the relevant chunks with a parent that is not used yet, and fetch the parents per document at once
+        selected_chunks = []
+        parent_ids_by_document = {}
         for relevant_chunk in relevant_chunks:
             hierarchical_chunk_id = self.__chunk_id_for_hierarchy(relevant_chunk.chunk_id, self.max_levels)
 
-            if hierarchical_chunk_id in used_chunk_ids:
+            parent_ids = parent_ids_by_document.setdefault(relevant_chunk.document_id, [])
+            if hierarchical_chunk_id in parent_ids:
                 continue
+            parent_ids.append(hierarchical_chunk_id)
+            selected_chunks.append((relevant_chunk, hierarchical_chunk_id))
 
-            hierarchical_chunk = self.retriever.get_chunk(relevant_chunk.document_id, hierarchical_chunk_id)
-            used_chunk_ids.add(hierarchical_chunk_id)
+        hierarchical_chunks = {}
+        for document_id, parent_ids in parent_ids_by_document.items():
+            for parent_id, chunk in zip(parent_ids, self.retriever.get_chunks(document_id, parent_ids)):
+                hierarchical_chunks[(document_id, parent_id)] = chunk
+
+        retrieval_output_items = []
+        for relevant_chunk, hierarchical_chunk_id in selected_chunks:
+            hierarchical_chunk = hierarchical_chunks[(relevant_chunk.document_id, hierarchical_chunk_id)]
 
             if observe:
                 global_data["observer"].add_relevant_chunk(relevant_chunk.get_id(), hierarchical_chunk.chunk_text)
 
-
             relevant_item = RetrievalOutputItem(document_id=relevant_chunk.document_id,
                                                 chunk_id=relevant_chunk.chunk_id,
-                                                text=hierarchical_chunk.chunk_text)
+                                                text=hierarchical_chunk.chunk_text,
+                                                score=relevant_chunk.score)
             retrieval_output_items.append(relevant_item)
 
         return RetrievalOutput(retrieval_output_items)
@@ -0,0 +1,82 @@
+from typing import List
+
+import numpy as np
+
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.retrieval.retrieval_output import RetrievalOutput, RetrievalOutputItem
+from rag4p.rag.retrieval.retrieval_strategy import RetrievalStrategy
+
+
+class MaximalMarginalRelevanceStrategy(RetrievalStrategy):
+    """
+    Reranks the output of another strategy using maximal marginal relevance (MMR). The wrapped strategy is asked for
+    more candidates than needed, from these the strategy selects items that are relevant for the question, but not
+    similar to the items that are already selected. This prevents a context full of near-identical chunks.
+
+    The embeddings of the candidates are used when the retriever returns them, like the InternalContentStore and the
+    WeaviateRetriever with include_vector. Other candidates are embedded in one batch using the embedder.
+    """
+
+    def __init__(self, strategy: RetrievalStrategy, embedder: Embedder, lambda_mult: float = 0.5,
+                 fetch_factor: int = 4):
+        """
+        :param strategy: The strategy that provides the candidates.
+        :param embedder: The embedder for the question and the candidates without an embedding.
+        :param lambda_mult: Balance between relevance (1.0) and diversity (0.0).
+        :param fetch_factor: The number of candidates to fetch for each requested result.
+        """
+        if not 0.0 <= lambda_mult <= 1.0:
+            raise ValueError(f"The lambda_mult must be between 0 and 1, got {lambda_mult}")
+        if fetch_factor < 1:
+            raise ValueError(f"The fetch_factor must be at least 1, got {fetch_factor}")
+
+        self.strategy = strategy
+        self.embedder = embedder
+        self.lambda_mult = lambda_mult
+        self.fetch_factor = fetch_factor
+
+    def retrieve_max_results(self, question: str, max_results: int) -> RetrievalOutput:
+        candidates = self.strategy.retrieve_max_results(question, max_results * self.fetch_factor)
+        return self.__rerank(question, candidates, max_results)
+
+    def retrieve_max_results_observed(self, question: str, max_results: int) -> RetrievalOutput:
+        candidates = self.strategy.retrieve_max_results_observed(question, max_results * self.fetch_factor)
+        return self.__rerank(question, candidates, max_results)
+
+    def __rerank(self, question: str, candidates: RetrievalOutput, max_results: int) -> RetrievalOutput:
+        items = candidates.items
+        if len(items) <= 1 or max_results <= 0:
+            return RetrievalOutput(items[:max(max_results, 0)])
+
+        embeddings = self.__normalize(np.asarray(self.__embeddings(items), dtype=float))
+        query = self.__normalize(np.asarray(self.embedder.embed(question), dtype=float))
+
+        relevance = embeddings @ query
+        similarity = embeddings @ embeddings.T
+
+        selected = [int(np.argmax(relevance))]
+        max_similarity = similarity[selected[0]].copy()
+        is_selected = np.zeros(len(items), dtype=bool)
+        is_selected[selected[0]] = True
+        while len(selected) < min(max_results, len(items)):
+            mmr_scores = self.lambda_mult * relevance - (1.0 - self.lambda_mult) * max_similarity
+            mmr_scores[is_selected] = -np.inf
+            best = int(np.argmax(mmr_scores))
+            selected.append(best)
+            is_selected[best] = True
+            np.maximum(max_similarity, similarity[best], out=max_similarity)
+
+        return RetrievalOutput([items[index] for index in selected])
+
+    def __embeddings(self, items: List[RetrievalOutputItem]) -> List[List[float]]:
+        missing = [index for index, item in enumerate(items) if item.embedding is None]
+        embeddings = [item.embedding for item in items]
+        if missing:
+            for index, embedding in zip(missing, self.embedder.embed_batch([items[index].text for index in missing])):
+                embeddings[index] = embedding
+        return embeddings
+
+    @staticmethod
+    def __normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0.0, 1.0, norms)
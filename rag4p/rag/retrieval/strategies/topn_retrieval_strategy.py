@@ -21,5 +21,7 @@ class TopNRetrievalStrategy(RetrievalStrategy):
         for relevant_chunk in relevant_chunks:
             retrieval_output_items.append(RetrievalOutputItem(document_id=relevant_chunk.document_id,
                                                               chunk_id=relevant_chunk.chunk_id,
-                                                              text=relevant_chunk.chunk_text))
+                                                              text=relevant_chunk.chunk_text,
+                                                              score=relevant_chunk.score,
+                                                              embedding=relevant_chunk.embedding))
         return RetrievalOutput(retrieval_output_items)
@@ -13,11 +13,16 @@ class WindowRetrievalStrategy(RetrievalStrategy):
 
     When multiple levels of chunks are used, the window is applied to the level of chunks that are relevant. This means
     that the window is applied to the level of chunks that are returned by the retriever.
+
+    With merge_windows, overlapping and adjacent windows within the same document are merged into one range. The chunks
+    of a document are fetched in one call to the retriever, and each merged range results in one item. The item has
+    the id of the best relevant chunk in the range, the items are ordered by their best relevant chunk.
     """
 
-    def __init__(self, retriever: Retriever, window_size: int = 1):
+    def __init__(self, retriever: Retriever, window_size: int = 1, merge_windows: bool = False):
         self.retriever = retriever
         self.window_size = window_size
+        self.merge_windows = merge_windows
 
     def retrieve_max_results(self, question, max_results) -> RetrievalOutput:
         relevant_chunks = self.retriever.find_relevant_chunks(question, max_results)
@@ -31,14 +36,16 @@ class WindowRetrievalStrategy(RetrievalStrategy):
 
     def __extract_window_for_relevant_chunks(self, relevant_chunks: [RelevantChunk], observe: bool = False) \
             -> RetrievalOutput:
+        if self.merge_windows:
+            return self.__extract_merged_windows(relevant_chunks, observe)
+
         retrieval_output_items = []
         for relevant_chunk in relevant_chunks:
             chunk_ids = self.__chunk_ids_for_window(relevant_chunk.chunk_id,
                                                     self.window_size,
                                                     relevant_chunk.total_chunks)
             overall_text = ""
-            for chunk_id in chunk_ids:
-                chunk = self.retriever.get_chunk(relevant_chunk.document_id, chunk_id)
+            for chunk in self.retriever.get_chunks(relevant_chunk.document_id, chunk_ids):
                 overall_text += chunk.chunk_text + " "
 
             if observe:
@@ -46,10 +53,71 @@ class WindowRetrievalStrategy(RetrievalStrategy):
 
             relevant_item = RetrievalOutputItem(document_id=relevant_chunk.document_id,
                                                 chunk_id=relevant_chunk.chunk_id,
-                                                text=overall_text)
+                                                text=overall_text,
+                                                score=relevant_chunk.score)
             retrieval_output_items.append(relevant_item)
         return RetrievalOutput(retrieval_output_items)
 
+    def __extract_merged_windows(self, relevant_chunks: [RelevantChunk], observe: bool) -> RetrievalOutput:
+        # Group the windows by document and by parent chunk, only chunks with the same parent are neighbours
+        windows = {}
+        for relevant_chunk in relevant_chunks:
+            parent_id, _, number = relevant_chunk.chunk_id.rpartition("_")
+            start = max(0, int(number) - self.window_size)
+            end = min(relevant_chunk.total_chunks - 1, int(number) + self.window_size)
+            windows.setdefault((relevant_chunk.document_id, parent_id), []).append((start, end, relevant_chunk))
+
+        merged_ranges = []
+        for (document_id, parent_id), document_windows in windows.items():
+            ranges = self.__merge_ranges(document_windows)
+            chunk_ids = [self.__window_chunk_id(parent_id, number)
+                         for start, end, _ in ranges for number in range(start, end + 1)]
+            chunks_by_id = {chunk_id: chunk for chunk_id, chunk
+                            in zip(chunk_ids, self.retriever.get_chunks(document_id, chunk_ids))}
+            for start, end, range_relevant_chunks in ranges:
+                text = "".join(chunks_by_id[self.__window_chunk_id(parent_id, number)].chunk_text + " "
+                               for number in range(start, end + 1))
+                merged_ranges.append((range_relevant_chunks, text))
+
+        rank = {id(relevant_chunk): i for i, relevant_chunk in enumerate(relevant_chunks)}
+        merged_ranges.sort(key=lambda merged_range: rank[id(merged_range[0][0])])
+
+        retrieval_output_items = []
+        for range_relevant_chunks, text in merged_ranges:
+            if observe:
+                for relevant_chunk in range_relevant_chunks:
+                    global_data["observer"].add_relevant_chunk(relevant_chunk.get_id(), text)
+
+            best_chunk = range_relevant_chunks[0]
+            retrieval_output_items.append(RetrievalOutputItem(document_id=best_chunk.document_id,
+                                                              chunk_id=best_chunk.chunk_id,
+                                                              text=text,
+                                                              score=best_chunk.score))
+        return RetrievalOutput(retrieval_output_items)
+
+    @staticmethod
+    def __merge_ranges(windows: list) -> list:
+        """
+        Merges overlapping and adjacent windows. The relevant chunks of a merged range keep the order of the retriever.
+        :param windows: Tuples with the start, the end and the relevant chunk of a window, in the order of the retriever.
+        :return: Tuples with the start, the end and the relevant chunks of each merged range, ordered by start.
+        """
+        order = {id(relevant_chunk): i for i, (_, _, relevant_chunk) in enumerate(windows)}
+        ranges = []
+        for start, end, relevant_chunk in sorted(windows, key=lambda window: window[0]):
+            if ranges and start <= ranges[-1][1] + 1:
+                ranges[-1][1] = max(ranges[-1][1], end)
+                ranges[-1][2].append(relevant_chunk)
+            else:
+                ranges.append([start, end, [relevant_chunk]])
+        for merged_range in ranges:
+            merged_range[2].sort(key=lambda chunk: order[id(chunk)])
+        return [tuple(merged_range) for merged_range in ranges]
+
+    @staticmethod
+    def __window_chunk_id(parent_id: str, number: int) -> str:
+        return f"{parent_id}_{number}" if parent_id else str(number)
+
     @staticmethod
     def __chunk_ids_for_window(chunk_id: str, window_size: int, number_of_chunks: int) -> [int]:
         # The chunk_id has the format 0 or 0_0, we need to extract the last part
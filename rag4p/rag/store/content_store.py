@@ -1,6 +1,8 @@
+import time
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 from types import MappingProxyType
-from typing import List
+from typing import Callable, List, Tuple
 
 from rag4p.rag.model.chunk import Chunk
 
@@ -11,6 +13,9 @@ class ContentStore(ABC):
         if metadata is None:
             metadata = {}
         self._metadata = metadata
+        self._failed_chunks = []
+        # Set by the IndexingService while an indexing job runs, the store records the embed and store stages in it
+        self.metrics = None
 
     def get_metadata(self):
         return MappingProxyType(self._metadata)
@@ -21,3 +26,111 @@ class ContentStore(ABC):
     @abstractmethod
     def store(self, chunks: List[Chunk]):
         pass
+
+    def take_failed_chunks(self) -> List[Tuple[Chunk, str]]:
+        """
+        Returns the chunks that could not be stored since the previous call, together with the error message. The list
+        of failed chunks is emptied.
+        """
+        failed_chunks = self._failed_chunks
+        self._failed_chunks = []
+        return failed_chunks
+
+    def _register_failed_chunk(self, chunk: Chunk, error: Exception):
+        self._failed_chunks.append((chunk, str(error)))
+
+    def _stage(self, name: str, num_items: int = 0):
+        """
+        Measures the code in the with block as a stage of the indexing metrics, does nothing without metrics.
+        """
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.stage(name, num_items)
+
+    def _measure_embedding(self, texts: List[str], embed: Callable):
+        """
+        Calls embed and records the call in the indexing metrics, if there are any.
+        :param texts: The texts that are embedded by the call.
+        :param embed: Function without arguments that calls the embedder.
+        :return: The result of embed.
+        """
+        if self.metrics is None:
+            return embed()
+        with self.metrics.stage("embed", len(texts)):
+            start = time.perf_counter()
+            result = embed()
+            self.metrics.record_embedding(time.perf_counter() - start, texts)
+        return result
+
+    def checkpoint(self, path: str):
+        """
+        Writes the state of the store, so an indexing job can be resumed. Stores that persist every chunk immediately
+        and replace a chunk that is stored again, like the WeaviateContentStore, do not need to do anything. When the
+        job is resumed, the chunks stored after the checkpoint are stored again.
+        :param path: The path to write the state to, without extension.
+        """
+        pass
+
+    def restore_checkpoint(self, path: str):
+        """
+        Restores the state of the store that was written using checkpoint.
+        :param path: The path the state was written to, without extension.
+        """
+        pass
+
+    def delete_document(self, document_id: str):
+        """
+        Removes all chunks of the document from the store. Used to replace the chunks of a document that has changed.
+        :param document_id: The id of the document to remove the chunks for.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support deleting documents.")
+
+    def supports_document_texts(self) -> bool:
+        """
+        Returns True if the store implements store_document_text.
+        """
+        return False
+
+    def store_document_text(self, document_id: str, text: str):
+        """
+        Stores the complete text of a document, so retrieval strategies that return complete documents do not have to
+        combine the chunks for every question.
+        :param document_id: The id of the document.
+        :param text: The text of the document, the texts of the chunks of the first level separated by a space.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support storing document texts.")
+
+    def store_duplicates(self, chunks: List[Chunk]):
+        """
+        Stores chunks that are near duplicates of chunks in the store, found by the ChunkDeduplicator. The duplicates
+        must be found by their id, retrieval strategies that combine the chunks of a document need them. Stores that
+        can keep chunks out of the search results override this method to store the duplicates without an embedding,
+        the default stores them like other chunks.
+        :param chunks: The duplicate chunks to store.
+        """
+        self.store(chunks)
+
+    def promote_duplicates(self, chunk_ids: List[str]):
+        """
+        Makes stored duplicates searchable, used when the chunks they duplicate are removed from the store. Stores that
+        store duplicates without an embedding override this method to embed them now.
+        :param chunk_ids: The complete ids (document_id + "_" + chunk_id) of the duplicates.
+        """
+        pass
+
+    def embed_chunks(self, chunks: List[Chunk]) -> List[List[float]]:
+        """
+        Creates the embeddings for the chunks without storing them. Together with store_embedded this splits the work
+        of the store method in two, which makes it possible to embed and store chunks in parallel.
+        :param chunks: The chunks to create the embeddings for.
+        :return: The embeddings in the same order as the chunks.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support embedding chunks separately.")
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        """
+        Stores chunks for which the embeddings are already created using embed_chunks.
+        :param chunks: The chunks to store.
+        :param embeddings: The embeddings of the chunks, in the same order as the chunks.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not support storing embedded chunks.")
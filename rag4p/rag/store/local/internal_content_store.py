@@ -1,7 +1,8 @@
 from datetime import datetime
 import json
+import os
 import pickle
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 
@@ -35,6 +36,8 @@ class InternalContentStore(ContentStore, Retriever):
         super().__init__(_metadata)
         self.embedder = embedder
         self.vector_store = pd.DataFrame(columns=['chunk_id', 'chunk', 'embedding'])
+        self.__document_texts = {}
+        self.__content_version = 0
 
     def store(self, chunks: List[Chunk]):
         for chunk in chunks:
@@ -48,16 +51,83 @@ class InternalContentStore(ContentStore, Retriever):
         chunk_id = chunk.document_id + "_" + str(chunk.chunk_id)
         print(f"Storing chunk {chunk_id}: {chunk.chunk_text}")
         try:
-            embedding = self.embedder.embed(chunk.chunk_text)
-            self.vector_store.loc[len(self.vector_store)] = {'chunk_id': chunk_id, 'chunk': chunk, 'embedding': embedding}
+            embedding = self._measure_embedding([chunk.chunk_text], lambda: self.embedder.embed(chunk.chunk_text))
+            with self._stage("store", 1):
+                self.vector_store.loc[len(self.vector_store)] = {'chunk_id': chunk_id, 'chunk': chunk,
+                                                                 'embedding': embedding}
+            self.__content_version += 1
         except Exception as e:
             print(f"Error storing chunk {chunk_id}-{chunk.chunk_text}: {e}")
+            self._register_failed_chunk(chunk, e)
+
+    def embed_chunks(self, chunks: List[Chunk]) -> List[List[float]]:
+        texts = [chunk.chunk_text for chunk in chunks]
+        return self._measure_embedding(texts, lambda: self.embedder.embed_batch(texts))
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        with self._stage("store", len(chunks)):
+            self.__append_rows(chunks, embeddings)
+        self.__content_version += 1
+
+    def store_duplicates(self, chunks: List[Chunk]):
+        # Duplicates are stored without an embedding, they are found by id but never by a search
+        with self._stage("store", len(chunks)):
+            self.__append_rows(chunks, [None] * len(chunks))
+        self.__content_version += 1
+
+    def promote_duplicates(self, chunk_ids: List[str]):
+        is_duplicate = self.vector_store['chunk_id'].isin(chunk_ids) & self.vector_store['embedding'].isna()
+        if not is_duplicate.any():
+            return
+        duplicates = self.vector_store[is_duplicate]
+        embeddings = self.embed_chunks(list(duplicates['chunk']))
+
+        column = self.vector_store['embedding'].tolist()
+        for position, embedding in zip(is_duplicate.to_numpy().nonzero()[0], embeddings):
+            column[position] = embedding
+        self.vector_store['embedding'] = pd.Series(column, index=self.vector_store.index, dtype=object)
+        self.__content_version += 1
+
+    def __append_rows(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        rows = pd.DataFrame({
+            'chunk_id': [chunk.document_id + "_" + str(chunk.chunk_id) for chunk in chunks],
+            'chunk': chunks,
+            'embedding': embeddings
+        })
+        # Appending all rows at once is a lot faster than adding them one by one using loc
+        if len(self.vector_store) == 0:
+            self.vector_store = rows
+        else:
+            self.vector_store = pd.concat([self.vector_store, rows], ignore_index=True)
+
+    def delete_document(self, document_id: str):
+        if len(self.vector_store) == 0:
+            return
+        is_document_chunk = self.vector_store['chunk'].apply(lambda chunk: chunk.document_id == document_id)
+        self.vector_store = self.vector_store[~is_document_chunk].reset_index(drop=True)
+        self.__document_texts.pop(document_id, None)
+        self.__content_version += 1
+
+    def supports_document_texts(self) -> bool:
+        return True
+
+    def store_document_text(self, document_id: str, text: str):
+        self.__document_texts[document_id] = text
+        self.__content_version += 1
+
+    def get_document_text(self, document_id: str) -> Optional[str]:
+        return self.__document_texts.get(document_id)
+
+    def content_version(self) -> Optional[int]:
+        return self.__content_version
 
     def find_relevant_chunks(self, query: str, max_results: int = 4) -> List[RelevantChunk]:
         print(f"Finding relevant chunks for query: {query}")
         embedding = self.embedder.embed(query)
-        self.vector_store['distance'] = self.vector_store['embedding'].apply(lambda x: distance.euclidean(x, embedding))
-        relevant_chunks_df = self.vector_store.nsmallest(max_results, 'distance')
+        # Duplicates are stored without an embedding and are not searched
+        searchable = self.vector_store[self.vector_store['embedding'].notna()]
+        distances = searchable['embedding'].apply(lambda x: distance.euclidean(x, embedding))
+        relevant_chunks_df = searchable.assign(distance=distances).nsmallest(max_results, 'distance')
 
         relevant_chunks = []
         for index, row in relevant_chunks_df.iterrows():
@@ -69,7 +139,8 @@ class InternalContentStore(ContentStore, Retriever):
                 total_chunks=chunk.total_chunks,
                 text=chunk.chunk_text,
                 properties=chunk.properties,
-                score=score
+                score=score,
+                embedding=row['embedding']
             )
             relevant_chunks.append(relevant_chunk)
         return relevant_chunks
@@ -87,6 +158,17 @@ class InternalContentStore(ContentStore, Retriever):
 
         return found_chunk.iloc[0]['chunk']
 
+    def get_chunks(self, document_id: str, chunk_ids: List[str]) -> List[Chunk]:
+        ids = [document_id + "_" + str(chunk_id) for chunk_id in chunk_ids]
+        found_chunks = self.vector_store[self.vector_store['chunk_id'].isin(ids)]
+        chunks_by_id = dict(zip(found_chunks['chunk_id'], found_chunks['chunk']))
+
+        missing = [chunk_id for chunk_id in ids if chunk_id not in chunks_by_id]
+        if missing:
+            raise Exception(f"Chunks with ids {missing} not found.")
+
+        return [chunks_by_id[chunk_id] for chunk_id in ids]
+
     def loop_over_chunks(self):
         for index, row in self.vector_store.iterrows():
             yield row['chunk']
@@ -100,22 +182,46 @@ class InternalContentStore(ContentStore, Retriever):
         with open(f'{path}_metadata.json', 'w') as f:
             json.dump(self._metadata, f)
 
+        # Save the complete texts of the documents, if they were stored during indexing
+        if self.__document_texts:
+            with open(f'{path}_documents.pickle', 'wb') as f:
+                pickle.dump(self.__document_texts, f)
+        elif os.path.exists(f'{path}_documents.pickle'):
+            os.remove(f'{path}_documents.pickle')
+
+    def checkpoint(self, path: str):
+        self.backup(path)
+
+    def restore_checkpoint(self, path: str):
+        self.__restore(path)
+
     @classmethod
     def load_from_backup(cls, embedder: Embedder, path: str):
         # Create an instance of the class
         instance = cls(embedder)
+        instance.__restore(path)
+        return instance
 
+    def __restore(self, path: str):
         # Load the DataFrame from the pickle file
         with open(f'{path}.pickle', 'rb') as f:
-            instance.vector_store = pickle.load(f)
+            vector_store = pickle.load(f)
 
         # Load the metadata from the JSON file
         with open(f'{path}_metadata.json', 'r') as f:
-            instance._metadata = json.load(f)
-
-        if 'embedder' in instance._metadata:
-            if instance._metadata['embedder'] != embedder.identifier():
-                raise Exception(f"Embedder {embedder.identifier()} does not match the one in the backup: "
-                                f"{instance._metadata['embedder']}")
-
-        return instance
+            metadata = json.load(f)
+
+        if 'embedder' in metadata:
+            if metadata['embedder'] != self.embedder.identifier():
+                raise Exception(f"Embedder {self.embedder.identifier()} does not match the one in the backup: "
+                                f"{metadata['embedder']}")
+
+        document_texts = {}
+        if os.path.exists(f'{path}_documents.pickle'):
+            with open(f'{path}_documents.pickle', 'rb') as f:
+                document_texts = pickle.load(f)
+
+        self.vector_store = vector_store
+        self._metadata = metadata
+        self.__document_texts = document_texts
+        self.__content_version += 1
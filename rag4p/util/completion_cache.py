@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+
+class CompletionCache:
+    """
+    Caches the completions of LLMs, so reruns of evaluations and indexing jobs do not send the same requests again. The
+    key consists of the provider, the model, all messages and the parameters that change the completion, like the
+    response format.
+
+    Recently used completions are kept in memory, with a path the completions are also stored in a SQLite database.
+    The database can be shared by multiple processes. Entries older than ttl_seconds are not used, a ttl of None keeps
+    the entries forever.
+
+    Use read=False to ignore the cached completions but still store the new ones, for example to refresh the cache. Use
+    write=False to use the cache without adding to it.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = 1024, ttl_seconds: float = None, read: bool = True,
+                 write: bool = True):
+        """
+        :param path: The file of the SQLite database, None keeps the completions in memory only.
+        :param max_entries: The number of completions kept in memory.
+        :param ttl_seconds: The number of seconds a completion can be used, None for no limit.
+        :param read: Use the cached completions.
+        :param write: Store new completions.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.read = read
+        self.write = write
+
+        self.__lock = threading.Lock()
+        self.__memory = OrderedDict()
+        self.__connection = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.__connection = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, completion TEXT, created REAL)")
+            self.__connection.commit()
+
+    @staticmethod
+    def key(provider: str, model: str, messages: List[dict], parameters: dict = None) -> str:
+        content = json.dumps([provider, model, messages, parameters or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def complete(self, provider: str, model: str, messages: List[dict], parameters: dict,
+                 create: Callable[[], str]) -> str:
+        """
+        Returns the cached completion, or calls create and caches the result.
+        :param provider: The provider of the model, like openai or ollama.
+        :param model: The name of the model.
+        :param messages: All messages sent to the model.
+        :param parameters: The other parameters that change the completion.
+        :param create: Function that requests the completion from the model.
+        :return: The completion.
+        """
+        key = self.key(provider, model, messages, parameters)
+        if self.read:
+            completion = self.get(key)
+            if completion is not None:
+                return completion
+
+        completion = create()
+        if self.write and completion is not None:
+            self.put(key, completion)
+        return completion
+
+    def get(self, key: str) -> Optional[str]:
+        with self.__lock:
+            entry = self.__memory.get(key)
+            if entry is not None:
+                if not self.__is_expired(entry[1]):
+                    self.__memory.move_to_end(key)
+                    return entry[0]
+                del self.__memory[key]
+
+            if self.__connection is None:
+                return None
+            row = self.__connection.execute("SELECT completion, created FROM completions WHERE key = ?",
+                                            (key,)).fetchone()
+            if row is None or self.__is_expired(row[1]):
+                return None
+            self.__remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, key: str, completion: str):
+        created = time.time()
+        with self.__lock:
+            self.__remember(key, completion, created)
+            if self.__connection is not None:
+                self.__connection.execute("INSERT OR REPLACE INTO completions (key, completion, created) "
+                                          "VALUES (?, ?, ?)", (key, completion, created))
+                self.__connection.commit()
+
+    def clear(self):
+        with self.__lock:
+            self.__memory.clear()
+            if self.__connection is not None:
+                self.__connection.execute("DELETE FROM completions")
+                self.__connection.commit()
+
+    def close(self):
+        with self.__lock:
+            if self.__connection is not None:
+                self.__connection.close()
+                self.__connection = None
+
+    def __remember(self, key: str, completion: str, created: float):
+        self.__memory[key] = (completion, created)
+        self.__memory.move_to_end(key)
+        while len(self.__memory) > self.max_entries:
+            self.__memory.popitem(last=False)
+
+    def __is_expired(self, created: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created > self.ttl_seconds
@@ -0,0 +1,44 @@
+import sys
+from types import MemberDescriptorType
+
+
+class SlottedState:
+    """
+    Base class for the model classes that use __slots__ instead of a __dict__ per instance. Pickles the values of the
+    slots as a dict, and reads pickles that were written before the class used slots. Subclasses that replace a slot of
+    a parent class with a property do not pickle that slot.
+    """
+    __slots__ = ()
+
+    def __getstate__(self) -> dict:
+        state = {}
+        for name in self.__slot_names():
+            try:
+                state[name] = getattr(self, name)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self, state):
+        # Default pickles of slotted classes contain a tuple with the __dict__ state and the slots state
+        if isinstance(state, tuple):
+            dict_state, slots_state = state
+            state = {**(dict_state or {}), **(slots_state or {})}
+        slot_names = self.__slot_names()
+        for name, value in state.items():
+            if name in slot_names:
+                setattr(self, name, value)
+        if "document_id" in state:
+            self.document_id = intern_id(state["document_id"])
+
+    @classmethod
+    def __slot_names(cls) -> set:
+        return {name for klass in cls.__mro__ for name in getattr(klass, "__slots__", ())
+                if isinstance(getattr(cls, name, None), MemberDescriptorType)}
+
+
+def intern_id(value):
+    """
+    Interns string ids, all chunks of a document share the same id string instead of a copy each.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
@@ -42,6 +42,41 @@ class TestMaxTokenSplitter(unittest.TestCase):
         chunks = splitter.split(input_document)
         self.assertEqual(2, len(chunks))
 
+    def test_split_into_overlapping_chunks(self):
+        splitter = MaxTokenSplitter(max_tokens=5, overlap=2, provider=OPENAI_PROVIDER, model=DEFAULT_EMBEDDING_MODEL)
+        input_document = InputDocument(document_id="1", text="one two three four five six seven eight nine ten",
+                                       properties={})
+        chunks = splitter.split(input_document)
+        self.assertEqual(3, len(chunks))
+        self.assertEqual("one two three four five", chunks[0].chunk_text)
+        self.assertEqual(" four five six seven eight", chunks[1].chunk_text)
+        self.assertEqual(" seven eight nine ten", chunks[2].chunk_text)
+        for chunk in chunks:
+            self.assertEqual(len(chunks), chunk.total_chunks)
+
+    def test_split_with_invalid_overlap(self):
+        with self.assertRaises(ValueError):
+            MaxTokenSplitter(max_tokens=5, overlap=5, provider=OPENAI_PROVIDER, model=DEFAULT_EMBEDDING_MODEL)
+
+    def test_split_batch_gives_same_chunks_as_split(self):
+        input_documents = [
+            InputDocument(document_id="1", text="This is a longer test document with more than max tokens.",
+                          properties={}),
+            InputDocument(document_id="2", text="Short text.", properties={}),
+        ]
+        batch_chunks = self.splitter.split_batch(input_documents)
+        self.assertEqual(2, len(batch_chunks))
+        for input_document, chunks in zip(input_documents, batch_chunks):
+            expected = self.splitter.split(input_document)
+            self.assertEqual([chunk.chunk_text for chunk in expected], [chunk.chunk_text for chunk in chunks])
+            self.assertEqual([chunk.get_id() for chunk in expected], [chunk.get_id() for chunk in chunks])
+
+    def test_split_batch_with_ollama_provider(self):
+        splitter = MaxTokenSplitter(max_tokens=5, provider=OLLAMA_PROVIDER, model=EMBEDDING_MODEL_NOMIC)
+        input_documents = [InputDocument(document_id="1", text="This is a test document", properties={})]
+        batch_chunks = splitter.split_batch(input_documents)
+        self.assertEqual(2, len(batch_chunks[0]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,47 @@
+import re
+import unittest
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.splitter_chain import SplitterChain
+from rag4p.indexing.splitters.section_splitter import SectionSplitter
+from rag4p.indexing.splitters.single_chunk_splitter import SingleChunkSplitter
+from rag4p.rag.model.chunk import Chunk
+
+
+class TestSectionSplitter(unittest.TestCase):
+
+    def setUp(self):
+        self.splitter = SectionSplitter()
+
+    def test_splits_like_regular_expression(self):
+        text = "\n\nFirst section.\n  \nSecond section.\n\n\n\nThird section\nwith two lines.\n\n"
+        input_document = InputDocument(document_id='1', text=text, properties={})
+        chunks = self.splitter.split(input_document)
+        self.assertEqual(re.split(r"\n\s*\n", text), [chunk.chunk_text for chunk in chunks])
+        self.assertEqual([len(chunks)] * len(chunks), [chunk.total_chunks for chunk in chunks])
+
+    def test_chunks_share_document_text(self):
+        input_document = InputDocument(document_id='1', text="First section.\n\nSecond section.", properties={})
+        chunks = self.splitter.split(input_document)
+        self.assertIs(input_document.text, chunks[0].document_text)
+        self.assertIs(input_document.text, chunks[1].document_text)
+        self.assertEqual((16, 31), (chunks[1].start, chunks[1].end))
+
+    def test_nested_chunks_use_offsets_in_document_text(self):
+        input_document = InputDocument(document_id='1', text="Intro.\n\nFirst section.\n\nSecond section.",
+                                       properties={})
+        chunks = SplitterChain([SingleChunkSplitter(), SectionSplitter()], include_all_chunks=True).split(input_document)
+        self.assertEqual(["0", "0_0", "0_1", "0_2"], [chunk.chunk_id for chunk in chunks])
+        self.assertEqual("Second section.", chunks[3].chunk_text)
+        self.assertTrue(all(chunk.document_text is input_document.text for chunk in chunks))
+
+    def test_splits_parent_chunk_without_span(self):
+        input_document = InputDocument(document_id='1', text="Not used", properties={})
+        parent_chunk = Chunk('1', '3', 5, "First.\n\nSecond.", {})
+        chunks = self.splitter.split(input_document, parent_chunk)
+        self.assertEqual(["3_0", "3_1"], [chunk.chunk_id for chunk in chunks])
+        self.assertEqual(["First.", "Second."], [chunk.chunk_text for chunk in chunks])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from rag4p.indexing.chunk_deduplicator import ChunkDeduplicator
+from rag4p.rag.model.chunk import Chunk
+
+FOOTER = ("JFall is the largest one day Java conference in the Netherlands, organised by the NLJUG. Tickets for the "
+          "conference are available on the website of the NLJUG.")
+
+
+def create_chunk(document_id: str, chunk_id: str, text: str) -> Chunk:
+    return Chunk(document_id, chunk_id, 1, text, {})
+
+
+class TestChunkDeduplicator(unittest.TestCase):
+
+    def test_finds_exact_and_near_duplicates(self):
+        deduplicator = ChunkDeduplicator()
+        self.assertIsNone(deduplicator.check(create_chunk("doc1", "0", FOOTER)))
+        self.assertEqual("doc1_0", deduplicator.check(create_chunk("doc2", "3", FOOTER)))
+        self.assertEqual("doc1_0", deduplicator.check(create_chunk("doc3", "1", FOOTER.replace("NLJUG.", "NLJUG!"))))
+        self.assertIsNone(deduplicator.check(create_chunk("doc4", "0", "Vector search with Weaviate and Java.")))
+        self.assertEqual({"doc2_3": "doc1_0", "doc3_1": "doc1_0"}, deduplicator.duplicates)
+
+    def test_different_texts_are_not_duplicates(self):
+        deduplicator = ChunkDeduplicator()
+        for i in range(50):
+            self.assertIsNone(deduplicator.check(create_chunk(f"doc{i}", "0", f"Session {i} is about topic {i * 7}")))
+
+    def test_removed_document_is_forgotten(self):
+        deduplicator = ChunkDeduplicator()
+        deduplicator.check(create_chunk("doc1", "0", FOOTER))
+        deduplicator.check(create_chunk("doc2", "0", FOOTER))
+        deduplicator.remove_document("doc1")
+
+        self.assertEqual({}, deduplicator.duplicates)
+        self.assertIsNone(deduplicator.check(create_chunk("doc3", "0", FOOTER)))
+
+    def test_signature_is_stable(self):
+        self.assertTrue((ChunkDeduplicator().signature(FOOTER) == ChunkDeduplicator().signature(FOOTER)).all())
+
+    def test_bands_must_divide_permutations(self):
+        with self.assertRaises(ValueError):
+            ChunkDeduplicator(num_permutations=100, num_bands=30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+from rag4p.indexing.indexing_metrics import IndexingMetrics, LatencyHistogram
+
+
+class TestIndexingMetrics(unittest.TestCase):
+
+    def test_latency_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for latency in [0.005] * 90 + [0.2] * 9 + [3.0]:
+            histogram.record(latency)
+
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.01, histogram.percentile(50))
+        self.assertEqual(0.25, histogram.percentile(95))
+        self.assertEqual(3.0, histogram.percentile(100))
+        self.assertEqual(90, histogram.to_dict()["buckets"]["0.01"])
+
+    def test_stages_are_added_up(self):
+        metrics = IndexingMetrics()
+        with metrics.stage("split", 2):
+            pass
+        metrics.add_stage_time("split", 1.5, 0.5, 3)
+
+        self.assertEqual(5, metrics.stages["split"].num_items)
+        self.assertGreaterEqual(metrics.stages["split"].wall_time, 1.5)
+        self.assertGreaterEqual(metrics.stages["split"].cpu_time, 0.5)
+
+    def test_measure_iteration_yields_none_items(self):
+        metrics = IndexingMetrics()
+        items = list(metrics.measure_iteration("read", [1, None, 2], count=lambda item: 1))
+
+        self.assertEqual([1, None, 2], items)
+        self.assertEqual(3, metrics.stages["read"].num_items)
+
+    def test_embedding_tokens_per_second(self):
+        metrics = IndexingMetrics(token_counter=len)
+        metrics.record_embedding(0.5, ["abcd", "ef"])
+        metrics.add_stage_time("embed", 2.0, 0.1, 2)
+
+        self.assertEqual(6, metrics.embedding_tokens)
+        self.assertEqual(3.0, metrics.embedding_tokens_per_second())
+
+    def test_progress_is_reported_after_interval(self):
+        progress = []
+        metrics = IndexingMetrics(progress_callback=progress.append, progress_interval=3600)
+        metrics.report_progress(10, 30)
+        self.assertEqual([], progress)
+
+        metrics.progress_interval = 0
+        metrics.report_progress(20, 60)
+        self.assertEqual([(20, 60)], [(event.num_documents, event.num_chunks) for event in progress])
+
+    def test_finish_records_peak_memory(self):
+        metrics = IndexingMetrics()
+        metrics.finish()
+        self.assertGreater(metrics.to_dict()["peak_memory_mb"], 0)
+        self.assertGreater(metrics.running_time, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
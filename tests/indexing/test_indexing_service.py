@@ -0,0 +1,510 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from typing import Iterable, List
+from unittest.mock import patch
+
+from rag4p.indexing.chunk_deduplicator import ChunkDeduplicator
+from rag4p.indexing.content_reader import ContentReader
+from rag4p.indexing.dead_letter_file import DeadLetterFile
+from rag4p.indexing.indexing_checkpoint import IndexingCheckpoint
+from rag4p.indexing.indexing_metrics import IndexingMetrics
+from rag4p.indexing.indexing_service import IndexingService, DUPLICATE_CHUNKS_METADATA_KEY
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.splitter_chain import SplitterChain
+from rag4p.indexing.splitters.section_splitter import SectionSplitter
+from rag4p.indexing.splitters.semantic_splitter import SemanticSplitter
+from rag4p.indexing.splitters.single_chunk_splitter import SingleChunkSplitter
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.generation.knowledge.knowledge import Knowledge
+from rag4p.rag.generation.knowledge.knowledge_extractor import KnowledgeExtractor
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.store.content_store import ContentStore
+from rag4p.rag.retrieval.strategies.window_retrieval_strategy import WindowRetrievalStrategy
+from rag4p.rag.store.local.internal_content_store import InternalContentStore
+
+
+class ListContentReader(ContentReader):
+    def __init__(self, documents: List[InputDocument]):
+        self.documents = documents
+
+    def read(self, batch_size: int = 10) -> Iterable[List[InputDocument]]:
+        for i in range(0, len(self.documents), batch_size):
+            yield self.documents[i:i + batch_size]
+
+
+class ListContentStore(ContentStore):
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.embeddings = []
+        self.duplicates = []
+        self.store_calls = 0
+
+    def store(self, chunks: List[Chunk]):
+        self.store_embedded(chunks, self.embed_chunks(chunks))
+
+    def embed_chunks(self, chunks: List[Chunk]) -> List[List[float]]:
+        return [[float(len(chunk.chunk_text))] for chunk in chunks]
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        self.store_calls += 1
+        self.chunks.extend(chunks)
+        self.embeddings.extend(embeddings)
+
+    def store_duplicates(self, chunks: List[Chunk]):
+        self.duplicates.extend(chunks)
+
+    def delete_document(self, document_id: str):
+        kept = [(chunk, embedding) for chunk, embedding in zip(self.chunks, self.embeddings)
+                if chunk.document_id != document_id]
+        self.chunks = [chunk for chunk, _ in kept]
+        self.embeddings = [embedding for _, embedding in kept]
+
+
+class TextListContentStore(ListContentStore):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        super().store_embedded(chunks, embeddings)
+        self.events.append(("chunks", len(chunks)))
+
+    def supports_document_texts(self) -> bool:
+        return True
+
+    def store_document_text(self, document_id: str, text: str):
+        self.events.append(("text", document_id))
+
+
+class FailingListContentStore(ListContentStore):
+    """
+    Registers the chunks with the failing text as failed, like a store that imports chunks in bulk.
+    """
+
+    def __init__(self, failing_text: str = "Second"):
+        super().__init__()
+        self.failing_text = failing_text
+
+    def store_embedded(self, chunks: List[Chunk], embeddings: List[List[float]]):
+        stored = [(chunk, embedding) for chunk, embedding in zip(chunks, embeddings)
+                  if self.failing_text not in chunk.chunk_text]
+        super().store_embedded([chunk for chunk, _ in stored], [embedding for _, embedding in stored])
+        for chunk in chunks:
+            if self.failing_text in chunk.chunk_text:
+                self._register_failed_chunk(chunk, ConnectionError("Store not available"))
+
+
+class CrashingContentReader(ListContentReader):
+    def __init__(self, documents: List[InputDocument], crash_after_batches: int):
+        super().__init__(documents)
+        self.crash_after_batches = crash_after_batches
+
+    def read(self, batch_size: int = 10) -> Iterable[List[InputDocument]]:
+        for batch_nr, batch in enumerate(super().read(batch_size)):
+            if batch_nr == self.crash_after_batches:
+                raise IOError("Connection lost")
+            yield batch
+
+
+class FlakyEmbedder(Embedder):
+    def __init__(self, failing_text: str = "Second"):
+        self.available = True
+        self.failing_text = failing_text
+
+    def embed(self, text: str) -> [float]:
+        if not self.available and self.failing_text in text:
+            raise ConnectionError("Embedder not available")
+        return [float(len(text)), 1.0]
+
+    def identifier(self) -> str:
+        return "flaky-embedder"
+
+    @staticmethod
+    def supplier() -> str:
+        return "Test"
+
+    def model(self) -> str:
+        return "flaky"
+
+
+class SlowKnowledgeExtractor(KnowledgeExtractor):
+    def __init__(self):
+        self.max_concurrent = 0
+        self.__running = 0
+        self.__lock = threading.Lock()
+
+    def extract_knowledge(self, context: str) -> List[Knowledge]:
+        with self.__lock:
+            self.__running += 1
+            self.max_concurrent = max(self.max_concurrent, self.__running)
+        time.sleep(0.05)
+        with self.__lock:
+            self.__running -= 1
+        return [Knowledge("Section", context)]
+
+
+def create_documents(num_documents: int) -> List[InputDocument]:
+    return [InputDocument(document_id=f"doc{i}",
+                          text=f"First section of {i}.\n\nSecond section of {i}.\n\nThird section of {i}.",
+                          properties={"nr": i})
+            for i in range(num_documents)]
+
+
+class TestIndexingService(unittest.TestCase):
+
+    def test_index_documents(self):
+        content_store = ListContentStore()
+        response = IndexingService(content_store).index_documents(ListContentReader(create_documents(5)),
+                                                                  SectionSplitter())
+        self.assertEqual(5, response.num_documents)
+        self.assertEqual(15, response.num_chunks)
+        self.assertEqual(15, len(content_store.chunks))
+
+    def test_index_document_stores_streamed_chunks_in_batches(self):
+        content_store = ListContentStore()
+        num_chunks = IndexingService(content_store).index_document(create_documents(1)[0], SectionSplitter(),
+                                                                   store_batch_size=2)
+        self.assertEqual(3, num_chunks)
+        self.assertEqual(2, content_store.store_calls)
+        self.assertEqual(["doc0_0", "doc0_1", "doc0_2"], [chunk.get_id() for chunk in content_store.chunks])
+
+    def test_index_documents_extracts_knowledge_of_chained_chunks_concurrently(self):
+        extractor = SlowKnowledgeExtractor()
+        splitter = SplitterChain([SectionSplitter(), SemanticSplitter(extractor, max_workers=3)])
+        content_store = ListContentStore()
+        response = IndexingService(content_store).index_documents(ListContentReader(create_documents(2)), splitter)
+
+        self.assertEqual(3, extractor.max_concurrent)
+        self.assertEqual(12, response.num_chunks)
+        self.assertEqual(["doc0_0", "doc0_0_0", "doc0_1", "doc0_1_0", "doc0_2", "doc0_2_0"],
+                         [chunk.get_id() for chunk in content_store.chunks[:6]])
+        self.assertEqual("Section: Second section of 0.", content_store.chunks[3].chunk_text)
+
+    def test_index_documents_pipelined_keeps_order(self):
+        documents = create_documents(25)
+        serial_store = ListContentStore()
+        IndexingService(serial_store).index_documents(ListContentReader(documents), SectionSplitter())
+
+        pipelined_store = ListContentStore()
+        response = IndexingService(pipelined_store).index_documents_pipelined(ListContentReader(documents),
+                                                                              SectionSplitter(),
+                                                                              split_workers=2,
+                                                                              embed_workers=3,
+                                                                              embed_batch_size=4,
+                                                                              store_batch_size=10,
+                                                                              queue_size=2)
+        self.assertEqual(25, response.num_documents)
+        self.assertEqual(75, response.num_chunks)
+        self.assertEqual([chunk.get_id() for chunk in serial_store.chunks],
+                         [chunk.get_id() for chunk in pipelined_store.chunks])
+        self.assertEqual(serial_store.embeddings, pipelined_store.embeddings)
+        self.assertLess(pipelined_store.store_calls, serial_store.store_calls)
+        self.assertEqual({"split_workers": 2, "embed_workers": 3, "embed_batch_size": 4, "store_batch_size": 10,
+                          "queue_size": 2, "batch_size": 10}, response.parallelism)
+
+    def test_index_documents_pipelined_without_split_processes(self):
+        content_store = ListContentStore()
+        response = IndexingService(content_store).index_documents_pipelined(ListContentReader(create_documents(3)),
+                                                                            SectionSplitter(),
+                                                                            split_workers=0)
+        self.assertEqual(9, response.num_chunks)
+        self.assertEqual(9, len(content_store.chunks))
+
+    def test_index_documents_pipelined_raises_error_of_stage(self):
+        content_store = ListContentStore()
+
+        def failing_embed(chunks):
+            raise ValueError("Embedder not available")
+
+        content_store.embed_chunks = failing_embed
+        with self.assertRaises(ValueError):
+            IndexingService(content_store).index_documents_pipelined(ListContentReader(create_documents(20)),
+                                                                     SectionSplitter(),
+                                                                     split_workers=0,
+                                                                     embed_batch_size=2,
+                                                                     queue_size=1)
+        self.assertEqual(0, len(content_store.chunks))
+
+    def test_index_documents_incremental(self):
+        content_store = ListContentStore()
+        indexing_service = IndexingService(content_store)
+        documents = create_documents(3)
+        response = indexing_service.index_documents(ListContentReader(documents), SectionSplitter(), incremental=True)
+        self.assertEqual((3, 0, 0), (response.num_added, response.num_updated, response.num_skipped))
+        self.assertEqual(3, len(content_store.get_metadata()["document_hashes"]))
+
+        changed_documents = create_documents(4)
+        changed_documents[1].text = "Only one section left."
+        response = indexing_service.index_documents(ListContentReader(changed_documents), SectionSplitter(),
+                                                    incremental=True)
+        self.assertEqual((1, 1, 2), (response.num_added, response.num_updated, response.num_skipped))
+        self.assertEqual(4, response.num_chunks)
+        self.assertEqual(10, len(content_store.chunks))
+        self.assertEqual(["Only one section left."],
+                         [chunk.chunk_text for chunk in content_store.chunks if chunk.document_id == "doc1"])
+
+    def test_index_documents_incremental_writes_hashes_every_checkpoint(self):
+        content_store = ListContentStore()
+        with patch.object(content_store, "add_metadata", wraps=content_store.add_metadata) as add_metadata:
+            IndexingService(content_store).index_documents(ListContentReader(create_documents(25)), SectionSplitter(),
+                                                           incremental=True, checkpoint_every=2)
+        self.assertEqual(2, add_metadata.call_count)
+        self.assertEqual(25, len(content_store.get_metadata()["document_hashes"]))
+
+    def test_index_documents_incremental_with_changed_splitter_configuration(self):
+        content_store = ListContentStore()
+        indexing_service = IndexingService(content_store)
+        documents = create_documents(2)
+        indexing_service.index_documents(ListContentReader(documents), SectionSplitter(), incremental=True)
+        response = indexing_service.index_documents(ListContentReader(documents), SingleChunkSplitter(),
+                                                    incremental=True)
+        self.assertEqual(2, response.num_updated)
+        self.assertEqual(2, len(content_store.chunks))
+
+    def test_index_documents_pipelined_incremental(self):
+        content_store = ListContentStore()
+        indexing_service = IndexingService(content_store)
+        indexing_service.index_documents_pipelined(ListContentReader(create_documents(10)), SectionSplitter(),
+                                                   split_workers=0, incremental=True)
+
+        changed_documents = create_documents(10)
+        changed_documents[3].text = "Changed.\n\nText."
+        response = indexing_service.index_documents_pipelined(ListContentReader(changed_documents), SectionSplitter(),
+                                                              split_workers=0, embed_batch_size=3, incremental=True)
+        self.assertEqual((0, 1, 9), (response.num_added, response.num_updated, response.num_skipped))
+        self.assertEqual(29, len(content_store.chunks))
+        self.assertEqual(["Changed.", "Text."],
+                         [chunk.chunk_text for chunk in content_store.chunks if chunk.document_id == "doc3"])
+
+    def test_resume_index_documents_from_checkpoint(self):
+        documents = create_documents(50)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint")
+            content_store = InternalContentStore(FlakyEmbedder())
+            with self.assertRaises(IOError):
+                IndexingService(content_store).index_documents(CrashingContentReader(documents, 3), SectionSplitter(),
+                                                               checkpoint_path=checkpoint_path, checkpoint_every=2)
+
+            resumed_store = InternalContentStore(FlakyEmbedder())
+            response = IndexingService(resumed_store).resume_index_documents(ListContentReader(documents),
+                                                                             SectionSplitter(),
+                                                                             checkpoint_path=checkpoint_path,
+                                                                             checkpoint_every=2)
+            self.assertEqual(50, response.num_documents)
+            self.assertEqual(150, response.num_chunks)
+            self.assertEqual(150, len(resumed_store.vector_store))
+            self.assertEqual(150, resumed_store.vector_store['chunk_id'].nunique())
+
+    def test_resume_index_documents_pipelined_from_checkpoint(self):
+        documents = create_documents(50)
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint")
+            embedder = FlakyEmbedder(failing_text="section of 35.")
+            embedder.available = False
+            with self.assertRaises(ConnectionError):
+                IndexingService(InternalContentStore(embedder)).index_documents_pipelined(
+                    ListContentReader(documents), SectionSplitter(), split_workers=0,
+                    checkpoint_path=checkpoint_path, checkpoint_every=2)
+            self.assertEqual(2, IndexingCheckpoint(checkpoint_path).load()["num_batches"])
+            self.assertEqual(60, len(InternalContentStore.load_from_backup(FlakyEmbedder(),
+                                                                           f"{checkpoint_path}_store").vector_store))
+
+            resumed_store = InternalContentStore(FlakyEmbedder())
+            response = IndexingService(resumed_store).index_documents_pipelined(
+                ListContentReader(documents), SectionSplitter(), split_workers=0,
+                checkpoint_path=checkpoint_path, checkpoint_every=2, resume=True)
+            self.assertEqual(50, response.num_documents)
+            self.assertEqual(150, response.num_chunks)
+            self.assertEqual(150, len(resumed_store.vector_store))
+            self.assertEqual(150, resumed_store.vector_store['chunk_id'].nunique())
+            self.assertEqual(5, IndexingCheckpoint(checkpoint_path).load()["num_batches"])
+
+    def test_resume_pipelined_requires_checkpoint_path(self):
+        with self.assertRaises(ValueError):
+            IndexingService(ListContentStore()).index_documents_pipelined(ListContentReader(create_documents(1)),
+                                                                          SectionSplitter(), resume=True)
+
+    def test_resume_with_other_batch_size_fails(self):
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint")
+            content_store = InternalContentStore(FlakyEmbedder())
+            IndexingService(content_store).index_documents(ListContentReader(create_documents(6)), SectionSplitter(),
+                                                           checkpoint_path=checkpoint_path, batch_size=3)
+            with self.assertRaises(ValueError):
+                IndexingService(content_store).resume_index_documents(ListContentReader(create_documents(6)),
+                                                                      SectionSplitter(),
+                                                                      checkpoint_path=checkpoint_path,
+                                                                      batch_size=4)
+
+    def test_failed_chunks_are_written_to_dead_letter_file_and_replayed(self):
+        embedder = FlakyEmbedder()
+        embedder.available = False
+        content_store = InternalContentStore(embedder)
+        indexing_service = IndexingService(content_store)
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letter_path = os.path.join(directory, "dead_letters.jsonl")
+            response = indexing_service.index_documents(ListContentReader(create_documents(4)), SectionSplitter(),
+                                                        dead_letter_path=dead_letter_path)
+            self.assertEqual(4, response.num_failed_chunks)
+            self.assertEqual(8, len(content_store.vector_store))
+            self.assertEqual(4, len(DeadLetterFile(dead_letter_path).read()))
+
+            stored, failed = indexing_service.replay_dead_letters(dead_letter_path, max_retries=2, backoff_seconds=0)
+            self.assertEqual((0, 4), (stored, failed))
+            self.assertEqual([3] * 4, [attempts for _, attempts in DeadLetterFile(dead_letter_path).read()])
+
+            embedder.available = True
+            stored, failed = indexing_service.replay_dead_letters(dead_letter_path, backoff_seconds=0)
+            self.assertEqual((4, 0), (stored, failed))
+            self.assertEqual(12, len(content_store.vector_store))
+            self.assertFalse(os.path.exists(dead_letter_path))
+
+    def test_failed_chunks_of_pipelined_indexing_are_written_to_dead_letter_file(self):
+        content_store = FailingListContentStore()
+        with tempfile.TemporaryDirectory() as directory:
+            dead_letter_path = os.path.join(directory, "dead_letters.jsonl")
+            response = IndexingService(content_store).index_documents_pipelined(ListContentReader(create_documents(4)),
+                                                                                SectionSplitter(),
+                                                                                split_workers=0,
+                                                                                embed_batch_size=3,
+                                                                                dead_letter_path=dead_letter_path)
+            self.assertEqual(4, response.num_failed_chunks)
+            self.assertEqual(8, len(content_store.chunks))
+            self.assertEqual(["doc0_1", "doc1_1", "doc2_1", "doc3_1"],
+                             [chunk.get_id() for chunk, _ in DeadLetterFile(dead_letter_path).read()])
+            self.assertEqual([], content_store.take_failed_chunks())
+
+    def test_index_documents_records_metrics(self):
+        progress = []
+        metrics = IndexingMetrics(progress_callback=progress.append, progress_interval=0)
+        content_store = InternalContentStore(FlakyEmbedder())
+        response = IndexingService(content_store).index_documents(ListContentReader(create_documents(4)),
+                                                                  SectionSplitter(), batch_size=2, metrics=metrics)
+
+        self.assertIs(metrics, response.metrics)
+        self.assertEqual({"read", "split", "embed", "store"}, set(metrics.stages.keys()))
+        self.assertEqual(4, metrics.stages["read"].num_items)
+        self.assertEqual(12, metrics.stages["split"].num_items)
+        self.assertEqual(12, metrics.stages["store"].num_items)
+        self.assertEqual(12, metrics.embedding_latency.count)
+        self.assertEqual(48, metrics.embedding_tokens)
+        self.assertEqual([2, 4], [event.num_documents for event in progress])
+        self.assertIsNone(content_store.metrics)
+        self.assertEqual(12, response.to_dict()["metrics"]["stages"]["store"]["num_items"])
+
+    def test_index_documents_pipelined_records_metrics(self):
+        content_store = InternalContentStore(FlakyEmbedder())
+        response = IndexingService(content_store).index_documents_pipelined(ListContentReader(create_documents(5)),
+                                                                            SectionSplitter(),
+                                                                            split_workers=0,
+                                                                            embed_batch_size=4)
+        metrics = response.metrics
+        self.assertEqual(15, metrics.stages["split"].num_items)
+        self.assertEqual(15, metrics.stages["embed"].num_items)
+        self.assertEqual(4, metrics.embedding_latency.count)
+        self.assertEqual(15, metrics.stages["store"].num_items)
+        self.assertGreater(metrics.chunks_per_second(), 0)
+
+    def test_index_documents_skips_duplicates(self):
+        documents = [InputDocument(document_id=f"doc{i}",
+                                   text=f"Session {i} about topic {i}.\n\nTickets are available on the NLJUG website.",
+                                   properties={})
+                     for i in range(4)]
+        for pipelined in [False, True]:
+            content_store = ListContentStore()
+            indexing_service = IndexingService(content_store, ChunkDeduplicator())
+            if pipelined:
+                response = indexing_service.index_documents_pipelined(ListContentReader(documents), SectionSplitter(),
+                                                                      split_workers=0)
+            else:
+                response = indexing_service.index_documents(ListContentReader(documents), SectionSplitter())
+
+            self.assertEqual(8, response.num_chunks)
+            self.assertEqual(3, response.num_duplicates)
+            self.assertEqual(["doc0_0", "doc0_1", "doc1_0", "doc2_0", "doc3_0"],
+                             [chunk.get_id() for chunk in content_store.chunks])
+            self.assertEqual(["doc1_1", "doc2_1", "doc3_1"], [chunk.get_id() for chunk in content_store.duplicates])
+            self.assertEqual({"doc1_1": "doc0_1", "doc2_1": "doc0_1", "doc3_1": "doc0_1"},
+                             content_store.get_metadata()[DUPLICATE_CHUNKS_METADATA_KEY])
+
+    def test_retrieve_window_over_deduplicated_content(self):
+        documents = [InputDocument(document_id=name,
+                                   text=f"Session {name} about {topic}.\n\nTickets are available on the NLJUG website."
+                                        f"\n\nThe speaker of {name} works on {topic}.",
+                                   properties={"title": name})
+                     for name, topic in [("a", "testing"), ("b", "vector search")]]
+        for pipelined in [False, True]:
+            content_store = InternalContentStore(FlakyEmbedder())
+            indexing_service = IndexingService(content_store, ChunkDeduplicator())
+            if pipelined:
+                indexing_service.index_documents_pipelined(ListContentReader(documents), SectionSplitter(),
+                                                           split_workers=0)
+            else:
+                indexing_service.index_documents(ListContentReader(documents), SectionSplitter())
+
+            self.assertEqual({"b_1": "a_1"}, content_store.get_metadata()[DUPLICATE_CHUNKS_METADATA_KEY])
+            found_ids = [f"{chunk.document_id}_{chunk.chunk_id}"
+                         for chunk in content_store.find_relevant_chunks("question", max_results=10)]
+            self.assertEqual(5, len(found_ids))
+            self.assertNotIn("b_1", found_ids)
+
+            output = WindowRetrievalStrategy(content_store, window_size=1).retrieve_max_results("Session b", 6)
+            window = next(item for item in output.items if item.document_id == "b" and item.chunk_id == "0")
+            self.assertEqual("Session b about vector search. Tickets are available on the NLJUG website.",
+                             window.text.strip())
+
+    def test_duplicates_become_searchable_when_original_is_removed(self):
+        documents = [InputDocument(document_id=name,
+                                   text=f"Session {name}.\n\nTickets are available on the NLJUG website.",
+                                   properties={})
+                     for name in ["a", "b"]]
+        content_store = InternalContentStore(FlakyEmbedder())
+        indexing_service = IndexingService(content_store, ChunkDeduplicator())
+        indexing_service.index_documents(ListContentReader(documents), SectionSplitter(), incremental=True)
+        self.assertIsNone(content_store.vector_store.iloc[3]['embedding'])
+
+        changed_documents = [InputDocument(document_id="a", text="Session a without tickets.", properties={}),
+                             documents[1]]
+        response = indexing_service.index_documents(ListContentReader(changed_documents), SectionSplitter(),
+                                                    incremental=True)
+        self.assertEqual(1, response.num_updated)
+        self.assertEqual({}, content_store.get_metadata()[DUPLICATE_CHUNKS_METADATA_KEY])
+        found_ids = [f"{chunk.document_id}_{chunk.chunk_id}"
+                     for chunk in content_store.find_relevant_chunks("question", max_results=10)]
+        self.assertEqual(["a_0", "b_0", "b_1"], sorted(found_ids))
+
+    def test_index_documents_stores_document_texts(self):
+        documents = create_documents(3)
+        for pipelined in [False, True]:
+            content_store = InternalContentStore(FlakyEmbedder())
+            indexing_service = IndexingService(content_store, store_document_texts=True)
+            if pipelined:
+                indexing_service.index_documents_pipelined(ListContentReader(documents), SectionSplitter(),
+                                                           split_workers=0)
+            else:
+                indexing_service.index_documents(ListContentReader(documents), SectionSplitter())
+
+            self.assertEqual("First section of 2. Second section of 2. Third section of 2. ",
+                             content_store.get_document_text("doc2"))
+
+    def test_index_documents_pipelined_stores_document_texts_while_indexing(self):
+        content_store = TextListContentStore()
+        IndexingService(content_store, store_document_texts=True).index_documents_pipelined(
+            ListContentReader(create_documents(10)), SectionSplitter(), split_workers=0, embed_batch_size=3,
+            store_batch_size=3, queue_size=2)
+
+        self.assertEqual([f"doc{i}" for i in range(10)],
+                         [value for kind, value in content_store.events if kind == "text"])
+        self.assertLess(content_store.events.index(("text", "doc0")), len(content_store.events) - 5)
+
+    def test_store_document_texts_requires_support_of_content_store(self):
+        with self.assertRaises(ValueError):
+            IndexingService(ListContentStore(), store_document_texts=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import unittest
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.jsonl_content_reader import JsonlContentReader
+
+
+class SessionContentReader(JsonlContentReader):
+    def map_to_input_document(self, data) -> InputDocument:
+        return InputDocument(document_id=data["title"],
+                             text=data["description"],
+                             properties={"speakers": data["speakers"]})
+
+
+class TestJsonlContentReader(unittest.TestCase):
+
+    def setUp(self):
+        self.file_path = os.path.join(os.getcwd(), "data/jfall", "sessions.jsonl")
+
+    def test_read_in_batches(self):
+        reader = SessionContentReader(self.file_path)
+        batches = list(reader.read(batch_size=10))
+        self.assertEqual(7, len(batches))
+        self.assertEqual(9, len(batches[-1]))
+
+    def test_byte_ranges_end_at_line_boundaries(self):
+        reader = SessionContentReader(self.file_path, range_size=5000)
+        byte_ranges = reader.byte_ranges()
+        self.assertGreater(len(byte_ranges), 1)
+        self.assertEqual(0, byte_ranges[0][0])
+        self.assertEqual(os.path.getsize(self.file_path), byte_ranges[-1][1])
+        with open(self.file_path, 'rb') as file:
+            content = file.read()
+        for (start, end), (next_start, _) in zip(byte_ranges, byte_ranges[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(b"\n", content[end - 1:end])
+
+    def test_read_parallel_gives_same_documents_in_same_order(self):
+        serial_reader = SessionContentReader(self.file_path)
+        parallel_reader = SessionContentReader(self.file_path, parallel=True, num_workers=2, range_size=5000)
+
+        serial_batches = list(serial_reader.read(batch_size=8))
+        parallel_batches = list(parallel_reader.read(batch_size=8))
+
+        self.assertEqual([len(batch) for batch in serial_batches], [len(batch) for batch in parallel_batches])
+        serial_documents = [document for batch in serial_batches for document in batch]
+        parallel_documents = [document for batch in parallel_batches for document in batch]
+        self.assertEqual([document.document_id for document in serial_documents],
+                         [document.document_id for document in parallel_documents])
+        self.assertEqual([document.text for document in serial_documents],
+                         [document.text for document in parallel_documents])
+
+
+if __name__ == '__main__':
+    unittest.main()
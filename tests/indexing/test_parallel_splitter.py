@@ -0,0 +1,26 @@
+import unittest
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.parallel_splitter import ParallelSplitter
+from rag4p.indexing.splitters.section_splitter import SectionSplitter
+
+
+class TestParallelSplitter(unittest.TestCase):
+
+    def test_split_documents_gives_same_chunks_in_same_order(self):
+        documents = [InputDocument(document_id=f"doc{i}", text="\n\n".join(["Section"] * (i % 4 + 1)), properties={})
+                     for i in range(20)]
+        splitter = SectionSplitter()
+
+        with ParallelSplitter(splitter, num_workers=2) as parallel_splitter:
+            results = list(parallel_splitter.split_documents(iter(documents), max_pending=3))
+
+        self.assertEqual([document.document_id for document in documents],
+                         [document.document_id for document, _ in results])
+        for document, chunks in results:
+            self.assertEqual([chunk.get_id() for chunk in splitter.split(document)],
+                             [chunk.get_id() for chunk in chunks])
+
+
+if __name__ == '__main__':
+    unittest.main()
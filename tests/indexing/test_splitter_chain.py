@@ -4,11 +4,21 @@ from rag4p.indexing.splitter_chain import SplitterChain
 from rag4p.indexing.input_document import InputDocument
 from rag4p.indexing.splitter import Splitter
 from rag4p.indexing.splitters.max_token_splitter import MaxTokenSplitter
+from rag4p.indexing.splitters.section_splitter import SectionSplitter
 from rag4p.indexing.splitters.sentence_splitter import SentenceSplitter
 from rag4p.indexing.splitters.single_chunk_splitter import SingleChunkSplitter
 from rag4p.rag.model.chunk import Chunk
 
 
+class CountingSplitter(SingleChunkSplitter):
+    def __init__(self):
+        self.num_splits = 0
+
+    def split(self, input_document: InputDocument, parent_chunk: Chunk = None) -> [Chunk]:
+        self.num_splits += 1
+        return super().split(input_document, parent_chunk)
+
+
 class TestSplitterChain(unittest.TestCase):
 
     def test_splitter_chain_initializes_with_valid_splitters(self):
@@ -83,6 +93,37 @@ class TestSplitterChain(unittest.TestCase):
         chunks = splitter_chain.split(input_document)
         self.assertEqual(len(chunks), 0)
 
+    def test_splitter_chain_streams_chunks_depth_first(self):
+        input_document = InputDocument(text="One.\n\nTwo.", properties={}, document_id="doc1")
+        last_splitter = CountingSplitter()
+        splitter_chain = SplitterChain([SectionSplitter(), last_splitter], include_all_chunks=True)
+
+        chunks = splitter_chain.split_stream(input_document)
+        self.assertEqual("0", next(chunks).chunk_id)
+        self.assertEqual(0, last_splitter.num_splits)
+        self.assertEqual("0_0", next(chunks).chunk_id)
+        self.assertEqual(1, last_splitter.num_splits)
+        self.assertEqual(["1", "1_0"], [chunk.chunk_id for chunk in chunks])
+
+    def test_splitter_chain_splits_chunks_of_a_level_together(self):
+        input_document = InputDocument(text="One.\n\nTwo.\n\nThree.", properties={}, document_id="doc1")
+        last_splitter = MagicMock(wraps=SingleChunkSplitter())
+        splitter_chain = SplitterChain([SectionSplitter(), last_splitter])
+
+        chunks = splitter_chain.split(input_document)
+        self.assertEqual(["0", "0_0", "1", "1_0", "2", "2_0"], [chunk.chunk_id for chunk in chunks])
+        last_splitter.split_chunks.assert_called_once()
+        self.assertEqual(["0", "1", "2"],
+                         [chunk.chunk_id for chunk in last_splitter.split_chunks.call_args.args[1]])
+
+    def test_splitter_chain_split_batch(self):
+        input_documents = [InputDocument(text=f"One {i}.\n\nTwo {i}.", properties={}, document_id=f"doc{i}")
+                           for i in range(2)]
+        splitter_chain = SplitterChain([SectionSplitter(), SingleChunkSplitter()])
+
+        self.assertEqual([[chunk.get_id() for chunk in splitter_chain.split(document)] for document in input_documents],
+                         [[chunk.get_id() for chunk in chunks] for chunks in splitter_chain.split_batch(input_documents)])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,117 @@
+import json
+import socket
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+from rag4p.integrations.ollama.access_ollama import AccessOllama
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    """
+    Answers like Ollama, the server fails with a 503 for the number of failures set on the server.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.__respond({"models": [{"name": "phi3", "details": {"parameter_size": "3.8B",
+                                                                "quantization_level": "Q4_0"}}]})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.path, body, self.client_address[1]))
+        if self.server.failures > 0:
+            self.server.failures -= 1
+            self.__respond({"error": "model is loading"}, status=503)
+        elif body.get("stream"):
+            lines = [{"response": "Hello", "done": False}, {"response": " there", "done": False},
+                     {"response": "", "done": True, "eval_count": 2}]
+            self.__respond_raw("\n".join(json.dumps(line) for line in lines).encode("utf-8"))
+        else:
+            self.__respond({"response": json.dumps({"answer": "42"}), "done": True})
+
+    def __respond(self, body: dict, status: int = 200):
+        self.__respond_raw(json.dumps(body).encode("utf-8"), status)
+
+    def __respond_raw(self, data: bytes, status: int = 200):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAccessOllama(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllamaHandler)
+        self.server.requests = []
+        self.server.failures = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.ollama = AccessOllama(host="127.0.0.1", port=self.server.server_address[1], backoff_seconds=0.01,
+                                   keep_alive="30m")
+
+    def tearDown(self):
+        self.ollama.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_reuses_the_connection_and_sends_keep_alive(self):
+        self.assertEqual('{"answer": "42"}', self.ollama.generate_answer("prompt", "phi3"))
+        self.assertEqual('{"answer": "42"}', self.ollama.generate_answer("other prompt", "phi3"))
+
+        (_, body, first_port), (_, _, second_port) = self.server.requests
+        self.assertEqual("30m", body["keep_alive"])
+        self.assertEqual(first_port, second_port)
+
+    def test_retries_server_errors_with_backoff(self):
+        self.server.failures = 2
+        self.assertEqual('{"answer": "42"}', self.ollama.generate_answer("prompt", "phi3"))
+        self.assertEqual(3, len(self.server.requests))
+
+    def test_raises_when_retries_are_exhausted(self):
+        self.server.failures = 10
+        with self.assertRaises(Exception):
+            self.ollama.generate_answer("prompt", "phi3")
+        self.assertEqual(4, len(self.server.requests))
+
+    def test_retries_connection_errors(self):
+        with socket.socket() as free_socket:
+            free_socket.bind(("127.0.0.1", 0))
+            port = free_socket.getsockname()[1]
+        ollama = AccessOllama(host="127.0.0.1", port=port, max_retries=2, backoff_seconds=0.01)
+        with patch.object(ollama.session, "request", wraps=ollama.session.request) as request:
+            with self.assertRaises(requests.ConnectionError):
+                ollama.list_models()
+        self.assertEqual(3, request.call_count)
+
+    def test_sends_numeric_keep_alive(self):
+        ollama = AccessOllama(host="127.0.0.1", port=self.server.server_address[1], keep_alive=-1)
+        ollama.preload("phi3")
+
+        _, body, _ = self.server.requests[0]
+        self.assertEqual({"model": "phi3", "keep_alive": -1}, body)
+
+    def test_preload_loads_model_without_prompt(self):
+        self.ollama.preload("phi3")
+
+        path, body, _ = self.server.requests[0]
+        self.assertEqual("/api/generate", path)
+        self.assertEqual({"model": "phi3", "keep_alive": "30m"}, body)
+
+    def test_streams_answer(self):
+        responses = list(self.ollama.generate_answer_stream("prompt", "phi3"))
+        self.assertEqual(["Hello", " there", ""], [response["response"] for response in responses])
+        self.assertEqual(2, responses[-1]["eval_count"])
+
+    def test_lists_models(self):
+        self.assertEqual(["phi3 ( 3.8B - Q4_0 )"], self.ollama.list_models())
+
+
+if __name__ == '__main__':
+    unittest.main()
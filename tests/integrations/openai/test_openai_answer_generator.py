@@ -0,0 +1,43 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from rag4p.integrations.openai.openai_answer_generator import OpenaiAnswerGenerator
+from rag4p.rag.generation.generation_metrics import GenerationMetrics
+from rag4p.util.completion_cache import CompletionCache
+
+
+def stream_chunk(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if usage is None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class TestOpenaiAnswerGenerator(unittest.TestCase):
+    def test_streams_deltas_and_reports_usage(self):
+        generator = OpenaiAnswerGenerator(openai_api_key="not-used")
+        generator.openai_client = MagicMock()
+        generator.openai_client.chat.completions.create.return_value = iter([
+            stream_chunk(""), stream_chunk("Hello"), stream_chunk(" world"),
+            stream_chunk(usage=SimpleNamespace(completion_tokens=2))])
+        metrics = GenerationMetrics()
+
+        deltas = list(generator.generate_answer_stream("question", "context", metrics))
+
+        self.assertEqual(["Hello", " world"], deltas)
+        self.assertTrue(generator.openai_client.chat.completions.create.call_args.kwargs["stream"])
+        self.assertEqual(2, metrics.num_tokens)
+        self.assertIsNotNone(metrics.time_to_first_token)
+
+    def test_cached_answer_is_requested_once(self):
+        generator = OpenaiAnswerGenerator(openai_api_key="not-used", completion_cache=CompletionCache())
+        generator.openai_client = MagicMock()
+        generator.openai_client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="The answer"))])
+
+        self.assertEqual("The answer", generator.generate_answer("question", "context"))
+        self.assertEqual("The answer", generator.generate_answer("question", "context"))
+        self.assertEqual(1, generator.openai_client.chat.completions.create.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import httpx
+from weaviate.exceptions import UnexpectedStatusCodeError
+
+from rag4p.integrations.weaviate.access_weaviate import AccessWeaviate, chunk_uuid
+
+
+def status_code_error(status_code: int) -> UnexpectedStatusCodeError:
+    return UnexpectedStatusCodeError("Object was not replaced", httpx.Response(status_code))
+
+
+class TestAccessWeaviate(unittest.TestCase):
+    def setUp(self):
+        self.client = MagicMock()
+        self.client.collections.exists.return_value = True
+        self.access = AccessWeaviate.from_client(self.client)
+
+    def test_collection_handle_is_cached(self):
+        self.assertIs(self.access.collection("Chunks"), self.access.collection("Chunks"))
+        self.client.collections.get.assert_called_once_with("Chunks")
+
+    def test_existing_collection_is_checked_once(self):
+        self.access.query_collection("question", "Chunks")
+        self.access.query_collection("question", "Chunks")
+
+        self.client.collections.exists.assert_called_once_with("Chunks")
+        self.client.collections.get.assert_called_once_with("Chunks")
+
+    def test_missing_collection_is_checked_again(self):
+        self.client.collections.exists.return_value = False
+        self.assertFalse(self.access.does_collection_exist("Chunks"))
+        self.client.collections.exists.return_value = True
+        self.assertTrue(self.access.does_collection_exist("Chunks"))
+
+    def test_delete_and_create_invalidate_the_cache(self):
+        self.access.does_collection_exist("Chunks")
+        self.access.collection("Chunks")
+
+        self.access.delete_collection("Chunks")
+        self.client.collections.exists.return_value = False
+        self.assertFalse(self.access.does_collection_exist("Chunks"))
+
+        self.access.create_collection("Chunks", [])
+        self.access.collection("Chunks")
+        self.assertEqual(2, self.client.collections.get.call_count)
+
+    def test_save_metadata_creates_the_metadata_collection(self):
+        self.client.collections.exists.return_value = False
+        data = self.client.collections.get.return_value.data
+        data.replace.side_effect = status_code_error(404)
+
+        self.access.save_metadata("Chunks", "document_hashes", {"doc1": "abc"})
+
+        self.assertEqual("ChunksMetadata", self.client.collections.create.call_args.kwargs["name"])
+        value_property = self.client.collections.create.call_args.kwargs["properties"][1]
+        self.assertEqual((False, False), (value_property.indexSearchable, value_property.indexFilterable))
+        data.insert.assert_called_once_with(properties={"key": "document_hashes", "value": '{"doc1": "abc"}'},
+                                            uuid=uuid.uuid5(uuid.NAMESPACE_URL, "document_hashes"), vector=None)
+
+    def test_save_metadata_replaces_an_existing_value(self):
+        data = self.client.collections.get.return_value.data
+
+        self.access.save_metadata("Chunks", "document_hashes", {"doc1": "def"})
+
+        self.client.collections.create.assert_not_called()
+        data.replace.assert_called_once_with(uuid=uuid.uuid5(uuid.NAMESPACE_URL, "document_hashes"),
+                                             properties={"key": "document_hashes", "value": '{"doc1": "def"}'},
+                                             vector=None)
+        data.exists.assert_not_called()
+        data.insert.assert_not_called()
+
+    def test_save_metadata_raises_other_errors(self):
+        self.client.collections.get.return_value.data.replace.side_effect = status_code_error(500)
+
+        with self.assertRaises(UnexpectedStatusCodeError):
+            self.access.save_metadata("Chunks", "document_hashes", {"doc1": "def"})
+
+    def test_add_document_uses_one_batch_request(self):
+        collection = self.client.collections.get.return_value
+        collection.batch.failed_objects = []
+        properties = {"documentId": "doc1", "chunkId": 0, "text": "Text"}
+
+        self.access.add_document("Chunks", properties, [1.0])
+
+        collection.batch.fixed_size.assert_called_once_with(batch_size=1, concurrent_requests=1)
+        batch = collection.batch.fixed_size.return_value.__enter__.return_value
+        batch.add_object.assert_called_once_with(properties=properties, vector=[1.0], uuid=chunk_uuid("doc1", 0))
+        collection.data.exists.assert_not_called()
+
+    def test_add_document_raises_when_rejected(self):
+        collection = self.client.collections.get.return_value
+        collection.batch.failed_objects = [SimpleNamespace(original_uuid=chunk_uuid("doc1", 0), message="Rejected")]
+
+        with self.assertRaises(Exception):
+            self.access.add_document("Chunks", {"documentId": "doc1", "chunkId": 0, "text": "Text"}, [1.0])
+
+    def test_load_metadata(self):
+        self.client.collections.get.return_value.iterator.return_value = [
+            SimpleNamespace(properties={"key": "document_hashes", "value": '{"doc1": "abc"}'})]
+
+        self.assertEqual({"document_hashes": {"doc1": "abc"}}, self.access.load_metadata("Chunks"))
+        self.client.collections.get.assert_called_once_with("ChunksMetadata")
+
+    def test_load_metadata_without_metadata_collection(self):
+        self.client.collections.exists.return_value = False
+        self.assertEqual({}, self.access.load_metadata("Chunks"))
+
+    def test_delete_collection_deletes_its_metadata(self):
+        self.access.delete_collection("Chunks")
+
+        self.assertEqual(["Chunks", "ChunksMetadata"],
+                         [call.args[0] for call in self.client.collections.delete.call_args_list])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from rag4p.integrations.weaviate.async_access_weaviate import AsyncAccessWeaviate
+from rag4p.integrations.weaviate.async_weaviate_retriever import AsyncWeaviateRetriever
+from rag4p.rag.embedding.embedder import Embedder
+
+
+def found_object(document_id, chunk_id, distance=0.1):
+    return SimpleNamespace(properties={"documentId": document_id, "chunkId": chunk_id, "text": f"text {chunk_id}",
+                                       "totalChunks": 3, "title": "Doc"},
+                           metadata=SimpleNamespace(distance=distance, score=None), vector={})
+
+
+class FakeAsyncQuery:
+    """
+    Stands in for the query API of an async collection, every query waits a little to simulate the network.
+    """
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def __respond(self, objects):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        return SimpleNamespace(objects=objects)
+
+    async def near_vector(self, near_vector, limit, **kwargs):
+        return await self.__respond([found_object("doc1", "0", 0.1), found_object("doc1", "2", 0.3)][:limit])
+
+    async def fetch_objects(self, limit, filters, return_properties):
+        return await self.__respond([found_object("doc1", "2"), found_object("doc1", "1")])
+
+
+class TestAsyncWeaviateRetriever(unittest.TestCase):
+    def setUp(self):
+        self.query = FakeAsyncQuery()
+        client = MagicMock()
+        client.collections.get.return_value.query = self.query
+        embedder = MagicMock(spec=Embedder)
+        embedder.embed.return_value = [0.1, 0.2]
+        self.retriever = AsyncWeaviateRetriever(AsyncAccessWeaviate(client), embedder, additional_properties=["title"])
+
+    def test_queries_run_concurrently(self):
+        async def run():
+            return await asyncio.gather(*[self.retriever.find_relevant_chunks("question", 2) for _ in range(5)])
+
+        results = asyncio.run(run())
+
+        self.assertEqual(5, self.query.max_running)
+        self.assertEqual(["doc1_0", "doc1_2"], [chunk.get_id() for chunk in results[0]])
+        self.assertEqual({"title": "Doc"}, results[0][0].properties)
+        self.assertEqual(0.3, results[0][1].score)
+
+    def test_get_chunks_returns_requested_order(self):
+        chunks = asyncio.run(self.retriever.get_chunks("doc1", ["1", "2"]))
+
+        self.assertEqual(["text 1", "text 2"], [chunk.chunk_text for chunk in chunks])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+from weaviate.collections.classes.batch import ErrorObject, _BatchObject
+
+from rag4p.integrations.weaviate.access_weaviate import AccessWeaviate
+from rag4p.integrations.weaviate.weaviate_content_store import WeaviateContentStore
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.model.chunk import Chunk
+
+
+class FakeBatchCollection:
+    """
+    Stands in for the batch API of a Weaviate collection, objects with a text starting with "fail" are rejected.
+    """
+
+    def __init__(self):
+        self.objects = []
+        self.uuids = []
+        self.failed_objects = []
+        self.batch_settings = []
+
+    @contextmanager
+    def fixed_size(self, batch_size: int, concurrent_requests: int):
+        self.batch_settings.append((batch_size, concurrent_requests))
+        yield self
+
+    @contextmanager
+    def dynamic(self):
+        self.batch_settings.append(None)
+        yield self
+
+    def add_object(self, properties, vector, uuid):
+        if properties["text"].startswith("fail"):
+            self.failed_objects.append(ErrorObject(
+                message="Rejected", original_uuid=uuid,
+                object_=_BatchObject(collection="Chunks", vector=vector, uuid=str(uuid), properties=properties,
+                                     tenant=None, references=None, index=len(self.failed_objects))))
+        else:
+            self.objects.append((properties, vector))
+            self.uuids.append(uuid)
+
+
+class TestWeaviateContentStore(unittest.TestCase):
+    def setUp(self):
+        self.batch = FakeBatchCollection()
+        client = MagicMock()
+        client.collections.get.return_value.batch = self.batch
+        self.access = AccessWeaviate.from_client(client)
+        self.embedder = MagicMock(spec=Embedder)
+        self.embedder.identifier.return_value = "fake"
+        self.embedder.embed_batch.side_effect = lambda texts: [[float(len(text))] for text in texts]
+
+    def test_store_embeds_and_writes_in_batches(self):
+        store = WeaviateContentStore(self.access, self.embedder, batch_size=50, concurrent_requests=4,
+                                     embed_batch_size=2)
+        store.store([Chunk("doc1", str(i), 5, f"text {i}", {"title": "Doc"}) for i in range(3)])
+
+        self.assertEqual(2, self.embedder.embed_batch.call_count)
+        self.embedder.embed.assert_not_called()
+        self.assertEqual([(50, 4), (50, 4)], self.batch.batch_settings)
+        self.assertEqual(3, len(self.batch.objects))
+        properties, vector = self.batch.objects[2]
+        self.assertEqual({"documentId": "doc1", "chunkId": "2", "text": "text 2", "totalChunks": 5, "title": "Doc"},
+                         properties)
+        self.assertEqual([6.0], vector)
+
+    def test_failed_objects_are_registered_per_chunk(self):
+        store = WeaviateContentStore(self.access, self.embedder)
+        store.store([Chunk("doc1", "0", 2, "fine", {}), Chunk("doc1", "1", 2, "fail this one", {})])
+
+        self.assertEqual([None], self.batch.batch_settings)
+        failed_chunks = store.take_failed_chunks()
+        self.assertEqual([("doc1_1", "Rejected")], [(chunk.get_id(), error) for chunk, error in failed_chunks])
+
+    def test_failed_embedding_registers_the_batch(self):
+        self.embedder.embed_batch.side_effect = Exception("Rate limited")
+        store = WeaviateContentStore(self.access, self.embedder)
+        store.store([Chunk("doc1", "0", 1, "text", {})])
+
+        self.assertEqual([("doc1_0", "Rate limited")],
+                         [(chunk.get_id(), error) for chunk, error in store.take_failed_chunks()])
+        self.assertEqual([], self.batch.objects)
+
+    def test_metadata_is_persisted_in_weaviate(self):
+        access = MagicMock(spec=AccessWeaviate)
+        access.load_metadata.return_value = {"document_hashes": {"doc1": "abc"}}
+        store = WeaviateContentStore(access, self.embedder, collection_name="Chunks")
+
+        self.assertEqual({"doc1": "abc"}, store.get_metadata()["document_hashes"])
+        self.assertEqual("fake", store.get_metadata()["embedder"])
+
+        store.add_metadata("document_hashes", {"doc1": "def"})
+        access.save_metadata.assert_called_once_with("Chunks", "document_hashes", {"doc1": "def"})
+        self.assertEqual({"doc1": "def"}, store.get_metadata()["document_hashes"])
+        access.load_metadata.assert_called_once_with("Chunks")
+
+    def test_storing_a_chunk_again_uses_the_same_id(self):
+        store = WeaviateContentStore(self.access, self.embedder)
+        store.store([Chunk("doc1", "0", 2, "text 0", {}), Chunk("doc1", "1", 2, "text 1", {})])
+        store.store([Chunk("doc1", "1", 2, "text 1", {})])
+
+        self.assertEqual(2, len(set(self.batch.uuids)))
+        self.assertEqual(self.batch.uuids[1], self.batch.uuids[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
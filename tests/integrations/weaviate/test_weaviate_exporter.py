@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from rag4p.integrations.weaviate.access_weaviate import AccessWeaviate
+from rag4p.integrations.weaviate.weaviate_exporter import WeaviateExporter
+from rag4p.integrations.weaviate.weaviate_retriever import WeaviateRetriever
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.store.local.internal_content_store import InternalContentStore
+
+
+class FakeCursorCollection:
+    """
+    Stands in for the cursor of a Weaviate collection, it returns the objects ordered by uuid after the given uuid.
+    """
+
+    def __init__(self, num_objects: int):
+        self.objects = sorted((SimpleNamespace(
+            uuid=uuid.UUID(int=(i * 7919 % num_objects) * ((1 << 128) // num_objects)),
+            properties={"documentId": f"doc{i}", "chunkId": "0", "text": f"text {i}", "totalChunks": 1},
+            vector={"default": [float(i), 1.0]}) for i in range(num_objects)), key=lambda found: str(found.uuid))
+        self.cursors = []
+
+    def iterator(self, include_vector, return_properties, after, cache_size):
+        self.cursors.append(after)
+        return iter([found for found in self.objects if after is None or str(found.uuid) > after])
+
+
+class TestWeaviateExporter(unittest.TestCase):
+    def setUp(self):
+        self.collection = FakeCursorCollection(40)
+        client = MagicMock()
+        client.collections.get.return_value = self.collection
+        self.embedder = MagicMock(spec=Embedder)
+        self.embedder.identifier.return_value = "fake"
+        self.embedder.supplier.return_value = "fake"
+        self.embedder.model.return_value = "fake"
+        self.retriever = WeaviateRetriever(AccessWeaviate.from_client(client), self.embedder)
+
+    def test_exports_all_chunks_with_vectors_in_parallel_ranges(self):
+        store = WeaviateExporter(self.retriever, num_ranges=4, page_size=3).export()
+
+        self.assertEqual([None] + WeaviateExporter.range_boundaries(4)[1:-1], self.collection.cursors)
+        self.assertEqual(40, len(store.vector_store))
+        self.assertEqual([7.0, 1.0], store.vector_store.set_index('chunk_id').loc['doc7_0', 'embedding'])
+        self.embedder.embed.assert_not_called()
+        self.embedder.embed_batch.assert_not_called()
+
+    def test_object_on_a_range_boundary_is_exported_once(self):
+        store = WeaviateExporter(self.retriever, num_ranges=40).export()
+
+        self.assertEqual(40, len(store.vector_store))
+        self.assertEqual(40, store.vector_store['chunk_id'].nunique())
+
+    def test_writes_a_backup_of_the_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "replica")
+            WeaviateExporter(self.retriever, num_ranges=3).export(path)
+            restored = InternalContentStore.load_from_backup(self.embedder, path)
+
+        self.assertEqual(40, len(restored.vector_store))
+        self.assertEqual("text 3", restored.get_chunk_by_id("doc3_0").chunk_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import threading
+import time
+import unittest
+from typing import List
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.indexing.splitters.semantic_splitter import SemanticSplitter
+from rag4p.rag.generation.knowledge.cached_knowledge_extractor import CachedKnowledgeExtractor
+from rag4p.rag.generation.knowledge.knowledge import Knowledge
+from rag4p.rag.generation.knowledge.knowledge_extractor import KnowledgeExtractor
+
+
+class SlowKnowledgeExtractor(KnowledgeExtractor):
+    def __init__(self, model: str = "test-model"):
+        self.model = model
+        self.contexts = []
+        self.max_concurrent = 0
+        self.__running = 0
+        self.__lock = threading.Lock()
+
+    def extract_knowledge(self, context: str) -> List[Knowledge]:
+        with self.__lock:
+            self.contexts.append(context)
+            self.__running += 1
+            self.max_concurrent = max(self.max_concurrent, self.__running)
+        time.sleep(0.05)
+        with self.__lock:
+            self.__running -= 1
+        return [Knowledge(word, f"The word {word}") for word in context.split()]
+
+    def model_name(self) -> str:
+        return self.model
+
+
+class TestCachedKnowledgeExtractor(unittest.TestCase):
+
+    def test_extracts_batch_concurrently_in_order(self):
+        extractor = SlowKnowledgeExtractor()
+        contexts = [f"context {i}" for i in range(8)]
+        results = extractor.extract_knowledge_batch(contexts, max_workers=3)
+
+        self.assertEqual(contexts, [f"{result[0].subject} {result[1].subject}" for result in results])
+        self.assertEqual(3, extractor.max_concurrent)
+
+    def test_cached_knowledge_is_not_extracted_again(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            extractor = SlowKnowledgeExtractor()
+            cached_extractor = CachedKnowledgeExtractor(extractor, cache_dir)
+            cached_extractor.extract_knowledge_batch(["one two", "three", "one two"])
+            self.assertEqual(["one two", "three"], sorted(extractor.contexts))
+
+            results = CachedKnowledgeExtractor(extractor, cache_dir).extract_knowledge_batch(["three", "four"])
+            self.assertEqual(["four", "one two", "three"], sorted(extractor.contexts))
+            self.assertEqual(["three", "four"], [result[0].subject for result in results])
+            self.assertEqual("The word three", results[0][0].description)
+
+    def test_cache_key_contains_model_and_prompt_version(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_extractor = CachedKnowledgeExtractor(SlowKnowledgeExtractor("model-a"), cache_dir)
+            other_model = CachedKnowledgeExtractor(SlowKnowledgeExtractor("model-b"), cache_dir)
+            other_prompt = CachedKnowledgeExtractor(SlowKnowledgeExtractor("model-a"), cache_dir)
+            other_prompt.prompt_version = "2"
+
+            key = cached_extractor.cache_key("text")
+            self.assertEqual(key, CachedKnowledgeExtractor(SlowKnowledgeExtractor("model-a"), cache_dir)
+                             .cache_key("text"))
+            self.assertNotEqual(key, other_model.cache_key("text"))
+            self.assertNotEqual(key, other_prompt.cache_key("text"))
+
+    def test_semantic_splitter_splits_batch(self):
+        splitter = SemanticSplitter(SlowKnowledgeExtractor(), max_workers=2)
+        documents = [InputDocument(document_id=f"doc{i}", text=f"alpha beta {i}", properties={}) for i in range(3)]
+        batch_chunks = splitter.split_batch(documents)
+
+        self.assertEqual([3, 3, 3], [len(chunks) for chunks in batch_chunks])
+        self.assertEqual("2: The word 2", batch_chunks[2][2].chunk_text)
+        self.assertEqual(["doc1_0", "doc1_1", "doc1_2"], [chunk.get_id() for chunk in batch_chunks[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
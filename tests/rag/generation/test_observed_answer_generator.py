@@ -0,0 +1,63 @@
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from rag4p.rag.generation.answer_generator import AnswerGenerator
+from rag4p.rag.generation.generation_metrics import GenerationMetrics, measure_stream
+from rag4p.rag.generation.observed_answer_generator import ObservedAnswerGenerator
+from rag4p.rag.tracker.rag_tracker import global_data
+
+
+class SlowStreamingAnswerGenerator(AnswerGenerator):
+    def generate_answer(self, question: str, context: str) -> str:
+        return "".join(self.generate_answer_stream(question, context))
+
+    def generate_answer_stream(self, question, context, metrics=None):
+        return measure_stream(self.__deltas(), metrics)
+
+    @staticmethod
+    def __deltas():
+        time.sleep(0.05)
+        yield "The answer"
+        yield " is"
+        yield " 42."
+
+
+class CompleteAnswerGenerator(AnswerGenerator):
+    def generate_answer(self, question: str, context: str) -> str:
+        return "The complete answer."
+
+
+class TestObservedAnswerGenerator(unittest.TestCase):
+    def setUp(self):
+        global_data["observer"] = MagicMock()
+
+    def test_observes_answer_when_stream_completes(self):
+        generator = ObservedAnswerGenerator(SlowStreamingAnswerGenerator())
+        metrics = GenerationMetrics()
+
+        stream = generator.generate_answer_stream("question", "context", metrics)
+        self.assertEqual("The answer", next(stream))
+        self.assertEqual(" is 42.", "".join(stream))
+
+        self.assertEqual("The answer is 42.", global_data["observer"].answer)
+        self.assertEqual(3, metrics.num_tokens)
+        self.assertGreaterEqual(metrics.time_to_first_token, 0.04)
+        self.assertGreaterEqual(metrics.total_time, metrics.time_to_first_token)
+
+    def test_async_stream_of_generator_without_streaming(self):
+        generator = ObservedAnswerGenerator(CompleteAnswerGenerator())
+        metrics = GenerationMetrics()
+
+        async def collect():
+            return [delta async for delta in generator.generate_answer_stream_async("question", "context", metrics)]
+
+        self.assertEqual(["The complete answer."], asyncio.run(collect()))
+        self.assertEqual("The complete answer.", global_data["observer"].answer)
+        self.assertEqual(1, metrics.num_tokens)
+        self.assertIsNotNone(metrics.time_to_first_token)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import csv
+import os
+import random
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from rag4p.rag.generation.question_generator import QuestionGenerator
+from rag4p.rag.generation.question_generator_service import QuestionGeneratorService
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.retrieval.retriever import Retriever
+
+
+class SlowQuestionGenerator(QuestionGenerator):
+    def __init__(self):
+        self.contexts = []
+
+    def generate_question(self, context: str) -> str:
+        # Random delays make the questions complete out of order
+        time.sleep(random.uniform(0.0, 0.02))
+        self.contexts.append(context)
+        return f"Question about {context}?"
+
+
+class TestQuestionGeneratorService(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.retriever = MagicMock(spec=Retriever)
+        self.retriever.loop_over_chunks.side_effect = lambda: iter(
+            [Chunk(f"doc{i // 2}", str(i % 2), 2, f"text {i}", {}) for i in range(10)])
+        self.question_generator = SlowQuestionGenerator()
+        self.service = QuestionGeneratorService(self.retriever, self.question_generator)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def read_rows(self, file_name):
+        with open(os.path.join(self.directory.name, file_name), newline='', encoding='utf-8') as file:
+            return list(csv.DictReader(file))
+
+    def test_generates_in_parallel_and_keeps_order(self):
+        num_questions = self.service.generate_question_answer_pairs("questions.csv", output_dir=self.directory.name,
+                                                                    max_workers=4, flush_every=3)
+
+        rows = self.read_rows("questions.csv")
+        self.assertEqual(10, num_questions)
+        self.assertEqual([f"text {i}" for i in range(10)], [row["text"] for row in rows])
+        self.assertEqual("Question about text 3?", rows[3]["question"])
+
+    def test_resume_skips_chunks_in_existing_file(self):
+        path = os.path.join(self.directory.name, "questions.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["document", "chunk", "text", "question"])
+            writer.writerow(["doc0", "0", "text 0", "Old question?"])
+            writer.writerow(["doc0", "1", "text 1", "Old question?"])
+
+        num_questions = self.service.generate_question_answer_pairs("questions.csv", output_dir=self.directory.name,
+                                                                    max_workers=2, resume=True)
+
+        rows = self.read_rows("questions.csv")
+        self.assertEqual(8, num_questions)
+        self.assertEqual(10, len(rows))
+        self.assertEqual("Old question?", rows[1]["question"])
+        self.assertNotIn("text 0", self.question_generator.contexts)
+
+    def test_resume_removes_partly_written_last_row(self):
+        path = os.path.join(self.directory.name, "questions.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["document", "chunk", "text", "question"])
+            writer.writerow(["doc0", "0", "text 0", "Old question?"])
+            file.write('doc0,1,"text 1\r\nmore text",Old ques')
+
+        num_questions = self.service.generate_question_answer_pairs("questions.csv", output_dir=self.directory.name,
+                                                                    resume=True)
+
+        rows = self.read_rows("questions.csv")
+        self.assertEqual(9, num_questions)
+        self.assertEqual([f"text {i}" for i in range(10)], [row["text"] for row in rows])
+        self.assertEqual("Question about text 1?", rows[1]["question"])
+
+    def test_resume_rewrites_partly_written_header(self):
+        path = os.path.join(self.directory.name, "questions.csv")
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            file.write("document,chu")
+
+        num_questions = self.service.generate_question_answer_pairs("questions.csv", output_dir=self.directory.name,
+                                                                    resume=True)
+
+        self.assertEqual(10, num_questions)
+        self.assertEqual(10, len(self.read_rows("questions.csv")))
+
+    def test_sample_is_repeatable_and_in_chunk_order(self):
+        self.service.generate_question_answer_pairs("first.csv", output_dir=self.directory.name, sample_size=4)
+        self.service.generate_question_answer_pairs("second.csv", output_dir=self.directory.name, sample_size=4)
+
+        first = [row["text"] for row in self.read_rows("first.csv")]
+        self.assertEqual(4, len(first))
+        self.assertEqual(first, [row["text"] for row in self.read_rows("second.csv")])
+        self.assertEqual(first, sorted(first, key=lambda text: int(text.split()[1])))
+
+
+if __name__ == '__main__':
+    unittest.main()
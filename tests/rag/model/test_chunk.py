@@ -0,0 +1,57 @@
+import copyreg
+import pickle
+import unittest
+
+from rag4p.indexing.input_document import InputDocument
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.relevant_chunk import RelevantChunk
+from rag4p.rag.model.span_chunk import SpanChunk
+from rag4p.rag.retrieval.retrieval_output import RetrievalOutputItem
+
+
+class LegacyChunk:
+    """
+    Pickles like a Chunk from before the model classes used slots, with the __dict__ as state.
+    """
+
+    def __init__(self, **state):
+        self.state = state
+
+    def __reduce_ex__(self, protocol):
+        return copyreg._reconstructor, (Chunk, object, None), self.state
+
+
+class TestChunk(unittest.TestCase):
+
+    def test_model_classes_have_no_instance_dict(self):
+        for instance in [Chunk("doc", "0", 1, "text", {}),
+                         RelevantChunk("doc", "0", 1, "text", {}, 0.5),
+                         SpanChunk("doc", "0", 1, "some text", 5, 9, {}),
+                         InputDocument("doc", "text", {}),
+                         RetrievalOutputItem("doc", "0", "text")]:
+            self.assertFalse(hasattr(instance, "__dict__"), instance.__class__.__name__)
+
+    def test_document_ids_are_interned(self):
+        first = Chunk("".join(["doc", "1"]), "0", 2, "text", {})
+        second = Chunk("".join(["doc", "1"]), "1", 2, "text", {})
+        self.assertIs(first.document_id, second.document_id)
+
+    def test_pickle_round_trip(self):
+        chunk = pickle.loads(pickle.dumps(RelevantChunk("doc", "0", 1, "text", {"a": 1}, 0.5)))
+        self.assertEqual(("doc_0", "text", {"a": 1}, 0.5),
+                         (chunk.get_id(), chunk.chunk_text, chunk.properties, chunk.score))
+
+        span_chunk = pickle.loads(pickle.dumps(SpanChunk("doc", "0", 1, "some text", 5, 9, {})))
+        self.assertEqual("text", span_chunk.chunk_text)
+
+    def test_reads_pickle_from_before_slots(self):
+        data = pickle.dumps(LegacyChunk(document_id="doc", chunk_id="3", total_chunks=4, chunk_text="text",
+                                        properties={"a": 1}))
+        chunk = pickle.loads(data)
+        self.assertIsInstance(chunk, Chunk)
+        self.assertEqual(("doc_3", 4, "text", {"a": 1}),
+                         (chunk.get_id(), chunk.total_chunks, chunk.chunk_text, chunk.properties))
+
+
+if __name__ == '__main__':
+    unittest.main()
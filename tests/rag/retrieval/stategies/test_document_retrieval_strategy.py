@@ -25,6 +25,10 @@ class TestDocumentRetrievalStrategy(unittest.TestCase):
 
         # Set the side_effect attribute of the get_chunk method to the mock_get_chunk function
         self.retriever.get_chunk.side_effect = mock_get_chunk
+        self.retriever.get_chunks.side_effect = lambda document_id, chunk_ids: [
+            mock_get_chunk(document_id, int(chunk_id)) for chunk_id in chunk_ids]
+        self.retriever.get_document_text.return_value = None
+        self.retriever.content_version.return_value = 1
 
     def test_retrieve_max_results_returns_unique_documents(self):
         # Mock the retriever's find_relevant_chunks method to return chunks with duplicate document_ids
@@ -56,6 +60,39 @@ class TestDocumentRetrievalStrategy(unittest.TestCase):
                          'This is the text for chunk 1 of 3 This is the text for chunk 2 of 3 This is the text '
                          'for chunk 3 of 3 \nprop1: value1 ')
 
+    def test_document_text_is_fetched_in_bulk_and_cached(self):
+        self.retriever.find_relevant_chunks.return_value = [
+            RelevantChunk('doc1', "1", 3, "This is the text for chunk 2 of 3", {'prop1': 'value1'}, 0.8),
+        ]
+        strategy = DocumentRetrievalStrategy(self.retriever)
+
+        first = strategy.retrieve_max_results('question', 1).construct_context()
+        second = strategy.retrieve_max_results('question', 1).construct_context()
+        self.assertEqual(first, second)
+        self.retriever.get_chunks.assert_called_once_with('doc1', ["0", "1", "2"])
+        self.retriever.get_chunk.assert_not_called()
+
+        self.retriever.content_version.return_value = 2
+        strategy.retrieve_max_results('question', 1)
+        self.assertEqual(2, self.retriever.get_chunks.call_count)
+
+    def test_cache_keeps_most_recently_used_documents(self):
+        strategy = DocumentRetrievalStrategy(self.retriever, cache_size=1)
+        for document_id, total_chunks in [('doc1', 3), ('doc2', 2), ('doc1', 3)]:
+            self.retriever.find_relevant_chunks.return_value = [
+                RelevantChunk(document_id, "0", total_chunks, "text", {}, 0.8)]
+            strategy.retrieve_max_results('question', 1)
+        self.assertEqual(3, self.retriever.get_chunks.call_count)
+
+    def test_uses_stored_document_text(self):
+        self.retriever.get_document_text.return_value = "The stored text of the document "
+        self.retriever.find_relevant_chunks.return_value = [
+            RelevantChunk('doc1', "0", 3, "This is the text for chunk 1 of 3", {'prop1': 'value1'}, 0.8),
+        ]
+        result = DocumentRetrievalStrategy(self.retriever).retrieve_max_results('question', 1)
+        self.assertEqual("The stored text of the document \nprop1: value1 ", result.construct_context())
+        self.retriever.get_chunks.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
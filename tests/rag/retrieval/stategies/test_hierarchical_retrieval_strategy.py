@@ -14,7 +14,7 @@ class TestHierarchicalRetrievalStrategy(unittest.TestCase):
         self.retriever.find_relevant_chunks.return_value = [
             RelevantChunk(document_id="doc1", chunk_id="1_3_2", total_chunks=4, text="text1", properties={}, score=0.7)
         ]
-        self.retriever.get_chunk.side_effect = self.mock_get_chunk
+        self.retriever.get_chunks.side_effect = self.mock_get_chunks
         self.strategy = HierarchicalRetrievalStrategy(self.retriever, max_levels=1)
 
     def mock_get_chunk(self, document_id, chunk_id):
@@ -26,6 +26,9 @@ class TestHierarchicalRetrievalStrategy(unittest.TestCase):
         }
         return chunks.get(chunk_id)
 
+    def mock_get_chunks(self, document_id, chunk_ids):
+        return [self.mock_get_chunk(document_id, chunk_id) for chunk_id in chunk_ids]
+
 
     def test_retrieve_max_results_max_levels_1(self):
 
@@ -64,7 +67,7 @@ class TestHierarchicalRetrievalStrategy(unittest.TestCase):
             RelevantChunk(document_id="doc1", chunk_id="1_3_2", total_chunks=4, text="text1", properties={}, score=0.7),
             RelevantChunk(document_id="doc1", chunk_id="1_3_3", total_chunks=4, text="text2", properties={}, score=0.6)
         ]
-        dedup_retriever.get_chunk.side_effect = self.mock_get_chunk
+        dedup_retriever.get_chunks.side_effect = self.mock_get_chunks
         dedup_strategy = HierarchicalRetrievalStrategy(dedup_retriever, max_levels=1)
 
         output = dedup_strategy.retrieve_max_results("question", 1)
@@ -74,6 +77,7 @@ class TestHierarchicalRetrievalStrategy(unittest.TestCase):
         self.assertEqual("doc1", output.items[0].document_id)
         self.assertEqual("1_3_2", output.items[0].chunk_id)
         self.assertEqual("hierarchical_text layer 2", output.items[0].text)
+        dedup_retriever.get_chunks.assert_called_once_with("doc1", ["1_3"])
 
 
 if __name__ == '__main__':
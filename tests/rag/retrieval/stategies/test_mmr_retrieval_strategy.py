@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import MagicMock
+
+from rag4p.rag.embedding.embedder import Embedder
+from rag4p.rag.retrieval.retrieval_output import RetrievalOutput, RetrievalOutputItem
+from rag4p.rag.retrieval.retrieval_strategy import RetrievalStrategy
+from rag4p.rag.retrieval.strategies.mmr_retrieval_strategy import MaximalMarginalRelevanceStrategy
+
+
+class TestMaximalMarginalRelevanceStrategy(unittest.TestCase):
+    def setUp(self):
+        self.strategy = MagicMock(spec=RetrievalStrategy)
+        self.strategy.retrieve_max_results.return_value = RetrievalOutput([
+            RetrievalOutputItem("doc1", "0", "first", 0.1, embedding=[0.9, 0.4]),
+            RetrievalOutputItem("doc1", "1", "copy of first", 0.1, embedding=[0.9, 0.4]),
+            RetrievalOutputItem("doc2", "0", "other", 0.5, embedding=[0.9, -0.5]),
+        ])
+        self.embedder = MagicMock(spec=Embedder)
+        self.embedder.embed.return_value = [1.0, 0.0]
+
+    def test_skips_near_duplicate_items(self):
+        output = MaximalMarginalRelevanceStrategy(self.strategy, self.embedder).retrieve_max_results("question", 2)
+
+        self.strategy.retrieve_max_results.assert_called_once_with("question", 8)
+        self.assertEqual([("doc1", "0"), ("doc2", "0")], [(item.document_id, item.chunk_id) for item in output.items])
+        self.embedder.embed_batch.assert_not_called()
+
+    def test_only_relevance_keeps_original_order(self):
+        strategy = MaximalMarginalRelevanceStrategy(self.strategy, self.embedder, lambda_mult=1.0)
+        output = strategy.retrieve_max_results("question", 2)
+
+        self.assertEqual(["first", "copy of first"], [item.text for item in output.items])
+
+    def test_embeds_items_without_embedding_in_one_batch(self):
+        self.strategy.retrieve_max_results.return_value = RetrievalOutput([
+            RetrievalOutputItem("doc1", "0", "first", 0.1, embedding=[0.9, 0.4]),
+            RetrievalOutputItem("doc1", "1", "copy of first", 0.1),
+            RetrievalOutputItem("doc2", "0", "other", 0.5),
+        ])
+        self.embedder.embed_batch.return_value = [[0.9, 0.4], [0.9, -0.5]]
+        output = MaximalMarginalRelevanceStrategy(self.strategy, self.embedder).retrieve_max_results("question", 2)
+
+        self.embedder.embed_batch.assert_called_once_with(["copy of first", "other"])
+        self.assertEqual(["first", "other"], [item.text for item in output.items])
+
+
+if __name__ == '__main__':
+    unittest.main()
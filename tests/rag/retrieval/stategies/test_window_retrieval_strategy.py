@@ -22,7 +22,7 @@ class TestWindowRetrievalStrategy(unittest.TestCase):
         retriever.find_relevant_chunks.return_value = [
             RelevantChunk(document_id="doc1", chunk_id="0", text="text1", total_chunks=3, properties={}, score=0.8),
         ]
-        retriever.get_chunk.side_effect = [
+        retriever.get_chunks.return_value = [
             Chunk(document_id="doc1", chunk_id="0", chunk_text="text1", total_chunks=3, properties={}),
             Chunk(document_id="doc1", chunk_id="1", chunk_text="text2", total_chunks=3, properties={}),
         ]
@@ -37,7 +37,7 @@ class TestWindowRetrievalStrategy(unittest.TestCase):
         retriever.find_relevant_chunks.return_value = [
             RelevantChunk(document_id="doc1", chunk_id="1", text="text1", total_chunks=2, properties={}, score=0.8),
         ]
-        retriever.get_chunk.side_effect = [
+        retriever.get_chunks.return_value = [
             Chunk(document_id="doc1", chunk_id="0", chunk_text="text1", total_chunks=2, properties={}),
             Chunk(document_id="doc1", chunk_id="1", chunk_text="text2", total_chunks=2, properties={}),
         ]
@@ -52,7 +52,7 @@ class TestWindowRetrievalStrategy(unittest.TestCase):
         retriever.find_relevant_chunks.return_value = [
             RelevantChunk(document_id="doc1", chunk_id="1", text="text1", total_chunks=3, properties={}, score=0.8),
         ]
-        retriever.get_chunk.side_effect = [
+        retriever.get_chunks.return_value = [
             Chunk(document_id="doc1", chunk_id="0", chunk_text="text1", total_chunks=3, properties={}),
             Chunk(document_id="doc1", chunk_id="1", chunk_text="text2", total_chunks=3, properties={}),
             Chunk(document_id="doc1", chunk_id="2", chunk_text="text3", total_chunks=3, properties={}),
@@ -68,7 +68,7 @@ class TestWindowRetrievalStrategy(unittest.TestCase):
         retriever.find_relevant_chunks.return_value = [
             RelevantChunk(document_id="doc1", chunk_id="0", text="text1", total_chunks=3, properties={}, score=0.8),
         ]
-        retriever.get_chunk.side_effect = [
+        retriever.get_chunks.return_value = [
             Chunk(document_id="doc1", chunk_id="0", chunk_text="text1", total_chunks=3, properties={}),
             Chunk(document_id="doc1", chunk_id="1", chunk_text="text2", total_chunks=3, properties={}),
         ]
@@ -77,6 +77,43 @@ class TestWindowRetrievalStrategy(unittest.TestCase):
         strategy.retrieve_max_results_observed("question", 1)
         global_data["observer"].add_relevant_chunk.assert_called_once_with("doc1_0", "text1 text2 ")
 
+    def test_windowRetrievalStrategy_merges_overlapping_windows(self):
+        retriever = MagicMock(spec=Retriever)
+        retriever.find_relevant_chunks.return_value = [
+            RelevantChunk(document_id="doc1", chunk_id="2", text="c2", total_chunks=10, properties={}, score=0.9),
+            RelevantChunk(document_id="doc1", chunk_id="3", text="c3", total_chunks=10, properties={}, score=0.8),
+            RelevantChunk(document_id="doc2", chunk_id="0", text="c0", total_chunks=2, properties={}, score=0.7),
+            RelevantChunk(document_id="doc1", chunk_id="8", text="c8", total_chunks=10, properties={}, score=0.6),
+        ]
+        retriever.get_chunks.side_effect = lambda document_id, chunk_ids: [
+            Chunk(document_id=document_id, chunk_id=chunk_id, chunk_text=f"{document_id}-{chunk_id}", total_chunks=10,
+                  properties={}) for chunk_id in chunk_ids]
+        global_data["observer"] = MagicMock()
+        strategy = WindowRetrievalStrategy(retriever, window_size=1, merge_windows=True)
+        output = strategy.retrieve_max_results_observed("question", 4)
+
+        self.assertEqual(2, retriever.get_chunks.call_count)
+        retriever.get_chunks.assert_any_call("doc1", ["1", "2", "3", "4", "7", "8", "9"])
+        self.assertEqual([("doc1", "2"), ("doc2", "0"), ("doc1", "8")],
+                         [(item.document_id, item.chunk_id) for item in output.items])
+        self.assertEqual("doc1-1 doc1-2 doc1-3 doc1-4 ", output.items[0].text)
+        self.assertEqual("doc2-0 doc2-1 ", output.items[1].text)
+        global_data["observer"].add_relevant_chunk.assert_any_call("doc1_3", "doc1-1 doc1-2 doc1-3 doc1-4 ")
+
+    def test_windowRetrievalStrategy_merges_windows_within_parent_chunk(self):
+        retriever = MagicMock(spec=Retriever)
+        retriever.find_relevant_chunks.return_value = [
+            RelevantChunk(document_id="doc1", chunk_id="0_1", text="a", total_chunks=3, properties={}, score=0.9),
+            RelevantChunk(document_id="doc1", chunk_id="1_0", text="b", total_chunks=2, properties={}, score=0.8),
+        ]
+        retriever.get_chunks.side_effect = lambda document_id, chunk_ids: [
+            Chunk(document_id=document_id, chunk_id=chunk_id, chunk_text=chunk_id, total_chunks=3, properties={})
+            for chunk_id in chunk_ids]
+        strategy = WindowRetrievalStrategy(retriever, window_size=1, merge_windows=True)
+        output = strategy.retrieve_max_results("question", 2)
+
+        self.assertEqual(["0_0 0_1 0_2 ", "1_0 1_1 "], [item.text for item in output.items])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+from rag4p.rag.retrieval.context_builder import ContextBuilder
+from rag4p.rag.retrieval.retrieval_output import RetrievalOutput, RetrievalOutputItem
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+class TestContextBuilder(unittest.TestCase):
+
+    def test_context_within_budget_is_unchanged(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "One two three.", 0.1),
+                                  RetrievalOutputItem("doc2", "0", "Four five.", 0.2)])
+        context = ContextBuilder(10, count_words).build(output)
+
+        self.assertEqual("One two three. Four five.", context.text)
+        self.assertEqual(5, context.num_tokens)
+        self.assertEqual(0, context.num_dropped_tokens)
+
+    def test_truncates_at_sentence_boundary_and_drops_items_that_do_not_fit(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "One two three. Four five six.", 0.1),
+                                  RetrievalOutputItem("doc2", "0", "Seven eight nine ten.", 0.2)])
+        context = ContextBuilder(5, count_words).build(output)
+
+        self.assertEqual("One two three.", context.text)
+        self.assertEqual(3, context.num_tokens)
+        self.assertEqual(7, context.num_dropped_tokens)
+        self.assertEqual(1, context.num_truncated_items)
+        self.assertEqual(1, context.num_dropped_items)
+        self.assertEqual("One two three.", output.construct_context(ContextBuilder(5, count_words)))
+
+    def test_rest_of_budget_is_used_by_later_items(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "One two three. Four five six seven.", 0.1),
+                                  RetrievalOutputItem("doc2", "0", "Eight nine ten eleven.", 0.2),
+                                  RetrievalOutputItem("doc3", "0", "Twelve thirteen. Fourteen.", 0.3)])
+        context = ContextBuilder(6, count_words).build(output)
+
+        self.assertEqual("One two three. Twelve thirteen. Fourteen.", context.text)
+        self.assertEqual(["doc1", "doc3"], [item.document_id for item in context.items])
+        self.assertEqual(6, context.num_tokens)
+        self.assertEqual(8, context.num_dropped_tokens)
+        self.assertEqual(1, context.num_truncated_items)
+        self.assertEqual(1, context.num_dropped_items)
+
+    def test_skips_duplicate_sentences(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "Shared sentence. First only.", 0.1),
+                                  RetrievalOutputItem("doc1", "1", "shared  sentence. Second only.", 0.2)])
+        context = ContextBuilder(100, count_words).build(output)
+
+        self.assertEqual("Shared sentence. First only. Second only.", context.text)
+        self.assertEqual(["Shared sentence. First only.", "Second only."], [item.text for item in context.items])
+        self.assertEqual(0, context.num_dropped_items)
+
+    def test_drops_items_with_only_duplicate_sentences(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "Shared sentence. First only.", 0.1),
+                                  RetrievalOutputItem("doc1", "1", "First only. Shared sentence.", 0.2)])
+        context = ContextBuilder(100, count_words).build(output)
+
+        self.assertEqual(["doc1"], [item.document_id for item in context.items])
+        self.assertEqual(1, context.num_dropped_items)
+        self.assertEqual(0, context.num_truncated_items)
+
+    def test_separators_count_towards_the_budget(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "One. Two.", 0.1),
+                                  RetrievalOutputItem("doc2", "0", "Six.", 0.2)])
+        context = ContextBuilder(9, len).build(output)
+
+        self.assertEqual("One. Two.", context.text)
+        self.assertEqual(len(context.text), context.num_tokens)
+        self.assertEqual(4, context.num_dropped_tokens)
+        self.assertEqual(1, context.num_dropped_items)
+
+    def test_sorts_items_by_score(self):
+        output = RetrievalOutput([RetrievalOutputItem("doc1", "0", "Far away.", 0.9),
+                                  RetrievalOutputItem("doc2", "0", "Close by.", 0.1)])
+
+        self.assertEqual("Close by. Far away.", ContextBuilder(10, count_words, False).build(output).text)
+        self.assertEqual("Far away. Close by.", ContextBuilder(10, count_words, True).build(output).text)
+        self.assertEqual("Far away. Close by.", ContextBuilder(10, count_words).build(output).text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from rag4p.rag.model.chunk import Chunk
+from rag4p.rag.model.relevant_chunk import RelevantChunk
+from rag4p.rag.retrieval.federated_retriever import FederatedBackend, FederatedRetriever, SCORE_FUSION
+from rag4p.rag.retrieval.retriever import Retriever
+
+
+def relevant_chunk(document_id, chunk_id, score):
+    return RelevantChunk(document_id, chunk_id, 2, f"{document_id}-{chunk_id}", {}, score)
+
+
+class TestFederatedRetriever(unittest.TestCase):
+    def setUp(self):
+        self.local = MagicMock(spec=Retriever)
+        self.local.find_relevant_chunks.return_value = [relevant_chunk("local", "0", 0.2),
+                                                        relevant_chunk("shared", "0", 0.4),
+                                                        relevant_chunk("local", "1", 1.4)]
+        self.remote = MagicMock(spec=Retriever)
+        self.remote.find_relevant_chunks.return_value = [relevant_chunk("shared", "0", 0.9),
+                                                         relevant_chunk("remote", "0", 0.5)]
+
+    def test_reciprocal_rank_fusion_merges_results(self):
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote, higher_score_is_better=True)])
+        chunks = retriever.find_relevant_chunks("question", 3)
+
+        self.assertEqual(["shared_0", "local_0", "remote_0"], [chunk.get_id() for chunk in chunks])
+        self.assertAlmostEqual(1 / 62 + 1 / 61, chunks[0].score)
+
+    def test_score_fusion_normalises_distances_and_similarities(self):
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote, higher_score_is_better=True)],
+                                       fusion=SCORE_FUSION)
+        chunks = retriever.find_relevant_chunks("question", 4)
+
+        self.assertEqual(["shared_0", "local_0", "local_1", "remote_0"], [chunk.get_id() for chunk in chunks])
+        self.assertAlmostEqual(1.0 / 1.2 + 1.0, chunks[0].score)
+        self.assertEqual(0.0, chunks[3].score)
+
+    def test_slow_backend_is_skipped(self):
+        release = threading.Event()
+        self.remote.find_relevant_chunks.side_effect = lambda question, max_results: release.wait(5) and []
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote, timeout=0.1)])
+        start = time.monotonic()
+        chunks = retriever.find_relevant_chunks("question", 3)
+        release.set()
+        retriever.close()
+
+        self.assertLess(time.monotonic() - start, 2.0)
+        self.assertEqual(["local_0", "shared_0", "local_1"], [chunk.get_id() for chunk in chunks])
+
+    def test_failing_backend_is_skipped(self):
+        self.remote.find_relevant_chunks.side_effect = Exception("Connection refused")
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote)])
+
+        self.assertEqual(3, len(retriever.find_relevant_chunks("question", 4)))
+
+    def test_get_chunk_uses_backend_that_returned_the_document(self):
+        self.remote.get_chunk.return_value = Chunk("remote", "1", 2, "remote-1", {})
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote, higher_score_is_better=True)])
+        retriever.find_relevant_chunks("question", 4)
+
+        self.assertEqual("remote-1", retriever.get_chunk("remote", "1").chunk_text)
+        self.local.get_chunk.assert_not_called()
+
+    def test_saturated_backend_is_skipped_without_delaying_other_backends(self):
+        release = threading.Event()
+        self.remote.find_relevant_chunks.side_effect = lambda question, max_results: release.wait(5) and []
+        retriever = FederatedRetriever([FederatedBackend("local", self.local),
+                                        FederatedBackend("remote", self.remote, timeout=0.05, max_in_flight=1)])
+        try:
+            for _ in range(5):
+                start = time.monotonic()
+                chunks = retriever.find_relevant_chunks("question", 3)
+                self.assertLess(time.monotonic() - start, 1.0)
+                self.assertEqual(["local_0", "shared_0", "local_1"], [chunk.get_id() for chunk in chunks])
+
+            self.assertEqual(1, self.remote.find_relevant_chunks.call_count)
+            self.assertEqual(5, self.local.find_relevant_chunks.call_count)
+        finally:
+            release.set()
+            retriever.close()
+
+    def test_backend_of_documents_is_remembered_for_recent_documents_only(self):
+        self.local.get_chunk.return_value = Chunk("local", "1", 2, "local-1", {})
+        self.remote.get_chunk.return_value = Chunk("local", "1", 2, "remote-1", {})
+        retriever = FederatedRetriever([FederatedBackend("remote", self.remote),
+                                        FederatedBackend("local", self.local)], max_documents=1)
+
+        # The most recent backend that returned the document is used
+        self.remote.find_relevant_chunks.return_value = []
+        self.local.find_relevant_chunks.return_value = [relevant_chunk("local", "0", 0.1)]
+        retriever.find_relevant_chunks("question", 4)
+        self.assertEqual("local-1", retriever.get_chunk("local", "1").chunk_text)
+        self.remote.get_chunk.assert_not_called()
+
+        # A document that is not remembered anymore is fetched from the backends in order
+        self.local.find_relevant_chunks.return_value = [relevant_chunk("other", "0", 0.1)]
+        retriever.find_relevant_chunks("question", 4)
+        self.assertEqual("remote-1", retriever.get_chunk("local", "1").chunk_text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,6 +21,18 @@ class TestInternalContentStore(unittest.TestCase):
         self.assertEqual('This is a chunk.', store.vector_store.iloc[0]['chunk'].chunk_text)
         self.assertEqual([0.1, 0.2, 0.3], store.vector_store.iloc[0]['embedding'])
 
+    @patch.object(Embedder, 'embed')
+    def test_stores_embedded_chunks_in_bulk(self, mock_embed):
+        store = InternalContentStore(mock_embed)
+        chunk1 = Chunk(document_id='1', chunk_id=0, chunk_text='This is the first chunk.', total_chunks=2, properties={})
+        chunk2 = Chunk(document_id='1', chunk_id=1, chunk_text='This is the second chunk.', total_chunks=2, properties={})
+        store.store_embedded([chunk1], [[0.1, 0.2, 0.3]])
+        store.store_embedded([chunk2], [[0.4, 0.5, 0.6]])
+        self.assertEqual(2, len(store.vector_store))
+        self.assertEqual('1_1', store.vector_store.iloc[1]['chunk_id'])
+        self.assertEqual([0.4, 0.5, 0.6], store.vector_store.iloc[1]['embedding'])
+        self.assertEqual('This is the first chunk.', store.get_chunk_by_id('1_0').chunk_text)
+
     @patch.object(Embedder, 'embed')
     def test_finds_relevant_chunks(self, mock_embed):
         mock_embed.embed.return_value = [0.1, 0.2, 0.3]
@@ -50,6 +62,18 @@ class TestInternalContentStore(unittest.TestCase):
         with self.assertRaises(Exception):
             store.get_chunk_by_id('1_2')
 
+    @patch.object(Embedder, 'embed')
+    def test_gets_multiple_chunks_in_requested_order(self, mock_embed):
+        store = InternalContentStore(mock_embed)
+        chunks = [Chunk(document_id='1', chunk_id=str(i), chunk_text=f'Chunk {i}.', total_chunks=3, properties={})
+                  for i in range(3)]
+        store.store_embedded(chunks, [[0.1, 0.2, 0.3]] * 3)
+
+        found = store.get_chunks('1', ['2', '0'])
+        self.assertEqual(['Chunk 2.', 'Chunk 0.'], [chunk.chunk_text for chunk in found])
+        with self.assertRaises(Exception):
+            store.get_chunks('1', ['0', '3'])
+
     @patch.object(Embedder, 'embed')
     def test_backup_restore(self, mock_embed):
         mock_embed.embed.return_value = [0.1, 0.2, 0.3]
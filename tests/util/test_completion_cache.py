@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from rag4p.util.completion_cache import CompletionCache
+
+MESSAGES = [{"role": "user", "content": "What is RAG?"}]
+
+
+class TestCompletionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "completions.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_request_is_created_once(self):
+        cache = CompletionCache()
+        create = MagicMock(return_value="An answer")
+
+        self.assertEqual("An answer", cache.complete("openai", "gpt", MESSAGES, {}, create))
+        self.assertEqual("An answer", cache.complete("openai", "gpt", MESSAGES, {}, create))
+        cache.complete("openai", "gpt", MESSAGES, {"response_format": {"type": "json_object"}}, create)
+        cache.complete("ollama", "gpt", MESSAGES, {}, create)
+        self.assertEqual(3, create.call_count)
+
+    def test_completions_are_persisted(self):
+        cache = CompletionCache(self.path)
+        cache.complete("openai", "gpt", MESSAGES, {}, lambda: "An answer")
+        cache.close()
+
+        reopened = CompletionCache(self.path)
+        create = MagicMock(return_value="Another answer")
+        self.assertEqual("An answer", reopened.complete("openai", "gpt", MESSAGES, {}, create))
+        create.assert_not_called()
+        reopened.close()
+
+    def test_least_recently_used_entries_leave_memory(self):
+        cache = CompletionCache(max_entries=1)
+        cache.put("first", "1")
+        cache.put("second", "2")
+
+        self.assertIsNone(cache.get("first"))
+        self.assertEqual("2", cache.get("second"))
+
+    def test_expired_completions_are_not_used(self):
+        cache = CompletionCache(self.path, ttl_seconds=60)
+        with patch("rag4p.util.completion_cache.time.time", return_value=1000.0):
+            cache.put("key", "old")
+        with patch("rag4p.util.completion_cache.time.time", return_value=1030.0):
+            self.assertEqual("old", cache.get("key"))
+        with patch("rag4p.util.completion_cache.time.time", return_value=1100.0):
+            self.assertIsNone(cache.get("key"))
+        cache.close()
+
+    def test_bypass_flags(self):
+        cache = CompletionCache(read=False)
+        cache.complete("openai", "gpt", MESSAGES, {}, lambda: "First")
+        self.assertEqual("Second", cache.complete("openai", "gpt", MESSAGES, {}, lambda: "Second"))
+
+        cache.read = True
+        cache.write = False
+        self.assertEqual("Second", cache.complete("openai", "gpt", MESSAGES, {}, lambda: "Third"))
+        self.assertEqual("Fourth", cache.complete("openai", "other", MESSAGES, {}, lambda: "Fourth"))
+        self.assertEqual("Fifth", cache.complete("openai", "other", MESSAGES, {}, lambda: "Fifth"))
+
+
+if __name__ == '__main__':
+    unittest.main()